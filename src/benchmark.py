@@ -0,0 +1,340 @@
+import sys, os, json, time, argparse, functools, platform, statistics, tempfile, tracemalloc
+from dataclasses import asdict
+from types import SimpleNamespace
+from typing import Callable, List
+
+from PySide6.QtCore import *
+from PySide6.QtWidgets import QApplication
+
+from core.exponentialnumber import ExponentialNumber
+from core.tasksetdata import TaskSetData
+from core.taskdata import TaskData
+from core.procedureresult import ProcedureResult
+
+from lib.stm import STM
+from lib.taskworker import TaskWorker
+from lib.simulator import STMSimulator, SimulatorConfig
+
+from ui.app import Ui_MainWindow
+
+class BenchmarkWorker(TaskWorker):
+    """
+        TaskWorker that records the CPU time spent on its thread and the result of its procedure.
+
+        Attributes:
+            cpu_time (float): The CPU time in seconds used by the worker thread while running the task.
+    """
+
+    def __init__(self, task: TaskData, stm: STM, next_task: Callable[[], TaskData] = None, cpu_times: list = None,
+                 results: list = None):
+        """
+            Initializes the BenchmarkWorker.
+
+            Args:
+                task (TaskData): The STM task to be executed.
+                stm (STM): The STM instance used to communicate with the STM device.
+                next_task (Callable[[], TaskData]): Looks up the task to run after this one, if any.
+                cpu_times (list): The list the worker appends its CPU time to when it is done.
+                results (list): The list the worker appends the ProcedureResult of its task to, before it reports
+                the task finished.
+        """
+        super().__init__(task, stm, next_task)
+        self.cpu_time = None
+        self._cpu_times = cpu_times
+        self._results = results
+
+    def start_procedure(self) -> ProcedureResult:
+        """
+            Starts the procedure of the task and records its result.
+
+            Returns:
+                ProcedureResult: The result of the procedure.
+        """
+        result = super().start_procedure()
+        self._results.append(result)
+        return result
+
+    def run(self) -> None:
+        """
+            Runs the STM task and records the CPU time used.
+        """
+        start = time.thread_time()
+        super().run()
+        self.cpu_time = time.thread_time() - start
+        self._cpu_times.append(self.cpu_time)
+
+class BenchmarkWindow(Ui_MainWindow):
+    """
+        A main window, never shown, that runs its queue of task sets against an STM device and records timings along
+        the way.
+
+        The run goes through the scheduling of the main window itself: 'play_clicked' starts it and every finished task
+        is handled by 'Ui_MainWindow.restart_task_worker', which pulls the next task with 'TaskSet.next_task', updates
+        the task bar, dispatches the next worker and hands the image over to the preview. Only the workers are replaced,
+        by BenchmarkWorkers, and the previews read the synthetic images of the simulator.
+
+        Attributes:
+            records (List[dict]): The timings of every finished task.
+            worker_cpu (list): The CPU time in seconds used by each worker thread.
+            gui_cpu (float): The CPU time in seconds used by the GUI thread in 'restart_task_worker'.
+            errors (list): The errors reported by workers.
+    """
+
+    def __init__(self, stm: STM, frame_store_path: str):
+        """
+            Initializes the BenchmarkWindow.
+
+            Args:
+                stm (STM): The STM instance shared by all workers.
+                frame_store_path (str): The directory to keep the frame store of the run in.
+        """
+        super().__init__(frame_store_path=frame_store_path, load_image=STMSimulator.load_topography,
+                         image_complete=STMSimulator.image_complete)
+        self.stm = stm
+        self.records = list()
+        self.worker_cpu = list()
+        self.gui_cpu = 0.0
+        self.errors = list()
+        self._results = list()
+        self._loop = QEventLoop()
+        self.worker_type = functools.partial(BenchmarkWorker, cpu_times=self.worker_cpu, results=self._results)
+
+    def run(self, task_sets: List[TaskSetData]):
+        """
+            Runs task sets and returns once the last one has finished or a worker reported an error.
+
+            Args:
+                task_sets (List[TaskSetData]): The task sets to queue and run.
+        """
+        for data in task_sets:
+            self.task_set_list.add_task_set(data)
+        QTimer.singleShot(0, self.start)
+        self._loop.exec()
+        QThreadPool.globalInstance().waitForDone()
+        self.preview_pool.waitForDone()
+        self.stm.drop()
+
+    def start(self):
+        """
+            Starts the run as the play button does.
+        """
+        self.play_clicked()
+        if not self.running:
+            self._loop.quit()
+
+    def restart_task_worker(self, save_path: str):
+        """
+            Records the timings of the finished task and handles it as the main window does.
+
+            Args:
+                save_path (str): The save path reported by the worker.
+        """
+        start = time.thread_time()
+        result = self._results[-1]
+        self.records.append({'dispatched': self.task_dispatched,
+                             'started': result.started,
+                             'finished': result.finished,
+                             'handled': time.time()})
+        super().restart_task_worker(save_path)
+        self.gui_cpu += time.thread_time() - start
+        if not self.running:
+            self._loop.quit()
+
+    def task_error(self, error: tuple):
+        """
+            Records a worker error and stops the run as the main window does.
+
+            Args:
+                error (tuple): The (exception type, exception, traceback) emitted by the worker.
+        """
+        self.errors.append(str(error[1]))
+        super().task_error(error)
+        self._loop.quit()
+
+def summarize(values: list) -> dict:
+    """
+        Summarizes a list of measurements.
+
+        Args:
+            values (list): The measurements.
+
+        Returns:
+            dict: The mean, median and maximum of the measurements, or None for each if there are none.
+    """
+    if not values:
+        return {'mean': None, 'median': None, 'max': None}
+    return {'mean': statistics.fmean(values), 'median': statistics.median(values), 'max': max(values)}
+
+def workload(name: str, n: int) -> List[TaskSetData]:
+    """
+        Builds the task sets of a benchmark workload.
+
+        Args:
+            name (str): The workload, one of 'single', 'bias_sweep' or 'size_sweep'.
+            n (int): The number of images in the workload.
+
+        Returns:
+            List[TaskSetData]: The task sets of the workload, n sets of one image for 'single' and one sweep of n images
+            otherwise.
+    """
+    def data(sweep_parameter, start, stop, step, total_tasks):
+        return TaskSetData(name=name,
+                           size=ExponentialNumber(100, -9),
+                           x_offset=ExponentialNumber(0, -9),
+                           y_offset=ExponentialNumber(0, -9),
+                           bias=ExponentialNumber(300, -3),
+                           set_point=ExponentialNumber(100, -12),
+                           line_time=ExponentialNumber(100, -3),
+                           lines_per_frame=64,
+                           repetitions=1,
+                           sweep_parameter=sweep_parameter,
+                           sweep_start=start,
+                           sweep_stop=stop,
+                           sweep_step=step,
+                           total_tasks=total_tasks,
+                           time_to_finish='')
+
+    match name:
+        case 'single':
+            return [data(TaskSetData.SweepParameter.none, *[ExponentialNumber.default()] * 3, 1) for _ in range(n)]
+        case 'bias_sweep':
+            return [data(TaskSetData.SweepParameter.bias, ExponentialNumber(10, -3), ExponentialNumber(10 * n, -3),
+                         ExponentialNumber(10, -3), n)]
+        case 'size_sweep':
+            return [data(TaskSetData.SweepParameter.size, ExponentialNumber(10, -9), ExponentialNumber(10 * n, -9),
+                         ExponentialNumber(10, -9), n)]
+        case _:
+            raise ValueError(f'unknown workload {name}')
+
+def run_workload(name: str, n: int, simulator: STMSimulator, commands: SimpleNamespace, frame_store_path: str) -> dict:
+    """
+        Runs a workload against the simulator and measures it.
+
+        Args:
+            name (str): The workload, see 'workload'.
+            n (int): The number of images in the workload.
+            simulator (STMSimulator): The running simulator.
+            commands (SimpleNamespace): The command table loaded from 'stm_commands.json'.
+            frame_store_path (str): The directory to keep the frame store of the workload in.
+
+        Returns:
+            dict: The measurements of the workload.
+    """
+    task_sets = workload(name, n)
+    stm = STM(port=simulator.port, commands=commands, persistent=True)
+    bench = BenchmarkWindow(stm, frame_store_path)
+
+    commands_before = simulator.commands
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    bench.run(task_sets)
+    elapsed = time.perf_counter() - start
+    memory_growth = tracemalloc.get_traced_memory()[0] - memory_before
+    tracemalloc.stop()
+    bench.setAttribute(Qt.WA_DeleteOnClose)
+    bench.close()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+    records = bench.records
+    commands_sent = simulator.commands - commands_before
+    dead_times = [b['started'] - a['finished'] for (a, b) in zip(records, records[1:])]
+    return {'tasks': len(records),
+            'errors': bench.errors,
+            'elapsed_s': elapsed,
+            'commands': commands_sent,
+            'commands_per_s': commands_sent / elapsed,
+            'setup_latency_s': summarize([r['started'] - r['dispatched'] for r in records]),
+            'dead_time_s': summarize(dead_times),
+            'worker_cpu_s': sum(bench.worker_cpu),
+            'worker_cpu_per_task_s': sum(bench.worker_cpu) / max(len(records), 1),
+            'gui_cpu_s': bench.gui_cpu,
+            'memory_growth_bytes': memory_growth,
+            'memory_growth_per_task_bytes': memory_growth / max(len(records), 1)}
+
+_lower_is_better = ['elapsed_s', 'setup_latency_s.mean', 'dead_time_s.mean', 'worker_cpu_per_task_s', 'gui_cpu_s',
+                    'memory_growth_per_task_bytes']
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """
+        Prints how the results compare with a saved baseline.
+
+        Args:
+            results (dict): The results of this run.
+            baseline (dict): The results of a previous run, as saved by this script.
+            tolerance (float): The relative increase of a lower-is-better metric that counts as a regression.
+
+        Returns:
+            bool: True if no metric regressed by more than 'tolerance'.
+    """
+    ok = True
+    if results['meta']['tasks'] != baseline['meta']['tasks']:
+        print(f'Warning: baseline ran {baseline["meta"]["tasks"]} images per workload, this run {results["meta"]["tasks"]}')
+    for (name, metrics) in results['workloads'].items():
+        if name not in baseline['workloads']:
+            continue
+        for key in _lower_is_better:
+            (new, old) = (metrics, baseline['workloads'][name])
+            for part in key.split('.'):
+                (new, old) = (new[part], old[part])
+            if new is None or old is None or old <= 0:
+                continue
+            change = (new - old) / old
+            regressed = change > tolerance
+            ok &= not regressed
+            print(f'{name:12s} {key:30s} {old:12.6g} -> {new:12.6g} ({change:+.1%}){"  REGRESSION" if regressed else ""}')
+    return ok
+
+def main(argv: list = None) -> int:
+    """
+        Runs the acquisition benchmark from the command line.
+
+        Args:
+            argv (list): The command line arguments. Defaults to 'sys.argv'.
+
+        Returns:
+            int: The exit code, 1 if a metric regressed against the baseline and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='End-to-end acquisition throughput benchmark against the STM simulator.')
+    parser.add_argument('-n', '--tasks', type=int, default=20, help='images per workload')
+    parser.add_argument('-w', '--workloads', nargs='+', default=['single', 'bias_sweep', 'size_sweep'])
+    parser.add_argument('--latency', type=float, default=0.002, help='simulated reply latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.001, help='simulated reply jitter in seconds')
+    parser.add_argument('--procedure-time', type=float, default=0.05, help='simulated frame time in seconds')
+    parser.add_argument('--save', help='write the results as a JSON baseline to this path')
+    parser.add_argument('--baseline', help='compare the results with a JSON baseline saved earlier')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    with open(os.path.join(os.path.dirname(__file__), 'stm_commands.json')) as f:
+        commands = json.load(f, object_hook=lambda d: SimpleNamespace(**d))
+
+    with tempfile.TemporaryDirectory() as save_path, tempfile.TemporaryDirectory() as frame_store_path:
+        config = SimulatorConfig(latency=args.latency, jitter=args.jitter, procedure_time=args.procedure_time,
+                                 max_pixels=64, save_path=save_path)
+        simulator = STMSimulator(port=0, config=config).start()
+        try:
+            results = {'meta': {'python': platform.python_version(),
+                                'platform': platform.platform(),
+                                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                                'tasks': args.tasks,
+                                'simulator': {k: v for (k, v) in asdict(config).items() if k != 'save_path'}},
+                       'workloads': {name: run_workload(name, args.tasks, simulator, commands, frame_store_path)
+                                     for name in args.workloads}}
+        finally:
+            simulator.stop()
+
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            return 0 if compare(results, json.load(f), args.tolerance) else 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -63,6 +63,15 @@ class ExponentialNumber:
         """
         return ExponentialNumber(self.sig, self.exp)
 
+    def __neg__(self) -> ExponentialNumber:
+        """
+        Negate the ExponentialNumber.
+
+        Returns:
+            ExponentialNumber: A new ExponentialNumber object with the opposite sig and the same exp.
+        """
+        return ExponentialNumber(-self.sig, self.exp)
+
     def prefix(self) -> str:
         """
         Get the SI prefix corresponding to the exponent.
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+@dataclass
+class FrameSummary:
+    """
+    Represents the outcome of reprocessing one '.sm4' file in a batch.
+
+    Attributes:
+        fname (str): The path of the '.sm4' file.
+        thumbnail (str): The path of the thumbnail written for the file, or None if it could not be processed.
+        width (int): The number of pixels per line of the topography.
+        height (int): The number of lines of the topography.
+        channels (int): The number of topography channels levelled, 2 if the backward channel was present.
+        minimum (float): The lowest value of the levelled forward topography.
+        maximum (float): The highest value of the levelled forward topography.
+        rms (float): The root mean square roughness of the levelled forward topography.
+        error (str): The reason the file could not be processed, or None.
+    """
+    fname: str
+    thumbnail: str = None
+    width: int = 0
+    height: int = 0
+    channels: int = 0
+    minimum: float = None
+    maximum: float = None
+    rms: float = None
+    error: str = None
@@ -0,0 +1,55 @@
+from core.exponentialnumber import ExponentialNumber
+
+def _parameter(name: str, doc: str) -> property:
+    """
+    Makes a read-only property reading an image parameter from the task table.
+
+    Args:
+        name (str): The column of the parameter.
+        doc (str): The docstring of the property.
+
+    Returns:
+        property: The property.
+    """
+    return property(lambda self: self._table.value(name, self._index), doc=doc)
+
+class ImageRow():
+    """
+    View of the image parameters of one row of a TaskTable.
+
+    ImageRow exposes the attributes of an ImageData, read from the columns of the table when accessed, so no
+    parameters are copied per task.
+
+    Attributes:
+        size (ExponentialNumber): The size of the image in meters.
+        x_offset (ExponentialNumber): The offset of the image in the x-axis direction in meters.
+        y_offset (ExponentialNumber): The offset of the image in the y-axis direction in meters.
+        bias (ExponentialNumber): The bias voltage.
+        set_point (ExponentialNumber): The set point current.
+        line_time (ExponentialNumber): The time taken to scan a single line.
+        lines_per_frame (int): The number of lines in a frame.
+        repetitions (int): The number of times the image is repeated.
+    """
+
+    size: ExponentialNumber = _parameter('size', 'The size of the image in meters.')
+    x_offset: ExponentialNumber = _parameter('x_offset', 'The offset of the image in the x-axis direction in meters.')
+    y_offset: ExponentialNumber = _parameter('y_offset', 'The offset of the image in the y-axis direction in meters.')
+    bias: ExponentialNumber = _parameter('bias', 'The bias voltage.')
+    set_point: ExponentialNumber = _parameter('set_point', 'The set point current.')
+    line_time: ExponentialNumber = _parameter('line_time', 'The time taken to scan a single line.')
+    lines_per_frame: int = _parameter('lines_per_frame', 'The number of lines in a frame.')
+    repetitions: int = _parameter('repetitions', 'The number of times the image is repeated.')
+
+    def __init__(self, table, index: int):
+        """
+        Initialize the ImageRow.
+
+        Args:
+            table (TaskTable): The table holding the row.
+            index (int): The row.
+        """
+        self._table = table
+        self._index = index
+
+    def __repr__(self) -> str:
+        return f'ImageRow(size={self.size}, bias={self.bias}, set_point={self.set_point})'
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+@dataclass
+class ProcedureResult:
+    """
+    Represents the completion of an STM procedure.
+
+    This class holds the reply the STM controller sent when a procedure finished, together with the times at which the
+    procedure was started and finished. Times are taken from 'time.time()'.
+
+    Attributes:
+        name (str): The name of the procedure.
+        result (str): The reply from the STM controller when the procedure finished.
+        started (float): The time at which the procedure was started, in seconds since the epoch.
+        finished (float): The time at which the procedure finished, in seconds since the epoch.
+    """
+    name: str
+    result: str
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        """
+        The time taken by the procedure.
+
+        Returns:
+            float: The duration of the procedure in seconds.
+        """
+        return self.finished - self.started
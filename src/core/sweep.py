@@ -0,0 +1,94 @@
+import numpy as np
+from typing import Dict, List
+
+from core.sweepaxis import SweepAxis
+from core.tasksetdata import TaskSetData
+
+class Sweep():
+    """
+    The points of a multi-parameter sweep, computed on demand.
+
+    A sweep only holds the values of each of its axes. The parameters of a point are computed from its index, so the
+    points of any block of a sweep can be produced with a few array operations, without creating anything per point:
+    a 50 x 50 x 10 grid is described by 110 numbers.
+
+    With nested order, the points are every combination of the axis values, the last axis changing fastest, as in
+    nested loops. With zipped order, the axes advance together and the sweep ends with the shortest axis.
+
+    Attributes:
+        axes (List[SweepAxis]): The swept parameters.
+        order (SweepOrder): How the axes are combined (from the TaskSetData.SweepOrder enum).
+        shape (tuple): The number of values of every axis.
+
+    Methods:
+        from_data(data: TaskSetData) -> Sweep: Makes the sweep of a task set.
+        names() -> List[str]: The parameters swept.
+        columns(indices: np.ndarray) -> Dict[str, np.ndarray]: Computes the swept parameters of points.
+    """
+
+    def __init__(self, axes: List[SweepAxis], order: TaskSetData.SweepOrder = TaskSetData.SweepOrder.nested):
+        """
+        Initialize the Sweep.
+
+        Args:
+            axes (List[SweepAxis]): The swept parameters.
+            order (SweepOrder): How the axes are combined. Default is nested.
+
+        Raises:
+            ValueError: If a parameter is swept by more than one axis, or the step of an axis is zero.
+        """
+        names = [axis.parameter.name for axis in axes]
+        if len(set(names)) != len(names):
+            raise ValueError(f'A parameter can only be swept once, got {", ".join(names)}')
+        self.axes = list(axes)
+        self.order = order
+        self._values = [axis.values() for axis in self.axes]
+        self.shape = tuple(len(values) for values in self._values)
+
+    @staticmethod
+    def from_data(data: TaskSetData) -> 'Sweep':
+        """
+        Makes the sweep of a task set.
+
+        Args:
+            data (TaskSetData): The task set.
+
+        Returns:
+            Sweep: The sweep of its axes, in its order.
+        """
+        return Sweep(data.axes(), data.sweep_order)
+
+    def __len__(self) -> int:
+        if not self.shape:
+            return 1
+        if self.order is TaskSetData.SweepOrder.zipped:
+            return min(self.shape)
+        return int(np.prod(self.shape))
+
+    def names(self) -> List[str]:
+        """
+        The parameters swept.
+
+        Returns:
+            List[str]: The names of the parameters, in axis order, as used by the columns of a TaskTable.
+        """
+        return [axis.parameter.name for axis in self.axes]
+
+    def columns(self, indices: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Computes the swept parameters of points of the sweep.
+
+        Args:
+            indices (np.ndarray): The indices of the points.
+
+        Returns:
+            Dict[str, np.ndarray]: The values in SI units of every swept parameter, one per point, keyed by name.
+        """
+        indices = np.asarray(indices)
+        if not self.shape:
+            return dict()
+        if self.order is TaskSetData.SweepOrder.zipped:
+            positions = (indices,) * len(self.shape)
+        else:
+            positions = np.unravel_index(indices, self.shape)
+        return {name: values[position] for (name, values, position) in zip(self.names(), self._values, positions)}
@@ -0,0 +1,41 @@
+import numpy as np
+from dataclasses import dataclass
+from enum import Enum
+
+from core.exponentialnumber import ExponentialNumber
+
+@dataclass
+class SweepAxis:
+    """
+    Represents one swept parameter of a task set.
+
+    Attributes:
+        parameter (SweepParameter): The parameter to sweep (from the TaskSetData.SweepParameter enum).
+        start (ExponentialNumber): The starting value of the sweep.
+        stop (ExponentialNumber): The stopping value of the sweep, included if it falls on a step.
+        step (ExponentialNumber): The step size of the sweep. Only its magnitude is used, the sweep always runs from
+            'start' towards 'stop'.
+    """
+
+    parameter: Enum
+    start: ExponentialNumber
+    stop: ExponentialNumber
+    step: ExponentialNumber
+
+    def values(self) -> np.ndarray:
+        """
+        Computes the values of the sweep.
+
+        Returns:
+            np.ndarray: The values in SI units, from 'start' to 'stop' by the magnitude of 'step'. Always holds 'start'.
+
+        Raises:
+            ValueError: If the step is zero.
+        """
+        (start, stop, step) = (self.start.to_float(), self.stop.to_float(), self.step.to_float())
+        if step == 0:
+            raise ValueError(f'The step of the {self.parameter.name} sweep must not be zero')
+        step = np.copysign(step, stop - start)
+        # Count the steps with a small tolerance, so rounding errors neither drop nor add the final value
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return start + step * np.arange(count)
@@ -18,6 +18,7 @@ class TaskData:
         inner (Union[ImageData, SpecData]): The inner data object containing the specific parameters for the task.
         completed (bool): A flag indicating whether the task has been completed (True) or not (False).
         index (int): The index of the task in a task set or a list of tasks.
+        fname (str): The path of the image acquired by the task, once it has been saved.
         procedure (Callable): A callable representing the procedure to be executed for the task.
 
     """
@@ -33,4 +34,5 @@ class TaskData:
     inner: Union[ImageData, SpecData]
     completed: bool
     index: int
+    fname: str = None
     # procedure: Callable
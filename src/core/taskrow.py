@@ -0,0 +1,90 @@
+from core.taskdata import TaskData
+from core.imagerow import ImageRow
+
+class TaskRow():
+    """
+    View of one task in a TaskTable.
+
+    TaskRow exposes the attributes of a TaskData, reading and writing the columns of the table, so it can be passed to
+    code written for TaskData. Views are made on demand and hold no state of their own: two views of the same row see
+    the same task.
+
+    Attributes:
+        table (TaskTable): The table holding the task.
+        index (int): The row of the task, which is also its index in the task set.
+        dtype (TaskType): The type of the task.
+        inner (ImageRow): The image parameters of the task.
+        completed (bool): Whether the task has been completed.
+        status (TaskTable.Status): The status of the task.
+        started (float): The time the task was started, in seconds since the epoch, or NaN.
+        finished (float): The time the task was finished, in seconds since the epoch, or NaN.
+        fname (str): The path of the image acquired by the task, once it has been saved.
+    """
+
+    def __init__(self, table, index: int):
+        """
+        Initialize the TaskRow.
+
+        Args:
+            table (TaskTable): The table holding the task.
+            index (int): The row of the task.
+        """
+        self.table = table
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f'TaskRow(index={self.index}, status={self.status.name}, inner={self.inner})'
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TaskRow) and self.table is other.table and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.index))
+
+    @property
+    def dtype(self) -> TaskData.TaskType:
+        return TaskData.TaskType(int(self.table.get('task_type', self.index)))
+
+    @property
+    def inner(self) -> ImageRow:
+        return ImageRow(self.table, self.index)
+
+    @property
+    def status(self):
+        return self.table.status(self.index)
+
+    @status.setter
+    def status(self, status):
+        self.table.set('status', self.index, status.value)
+
+    @property
+    def completed(self) -> bool:
+        return self.status is self.table.Status.completed
+
+    @completed.setter
+    def completed(self, completed: bool):
+        self.status = self.table.Status.completed if completed else self.table.Status.todo
+
+    @property
+    def started(self) -> float:
+        return float(self.table.get('started', self.index))
+
+    @started.setter
+    def started(self, t: float):
+        self.table.set('started', self.index, t)
+
+    @property
+    def finished(self) -> float:
+        return float(self.table.get('finished', self.index))
+
+    @finished.setter
+    def finished(self, t: float):
+        self.table.set('finished', self.index, t)
+
+    @property
+    def fname(self) -> str:
+        return self.table.fnames.get(self.index)
+
+    @fname.setter
+    def fname(self, fname: str):
+        self.table.fnames[self.index] = fname
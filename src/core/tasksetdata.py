@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import List
 
 from core.exponentialnumber import ExponentialNumber
+from core.sweepaxis import SweepAxis
 
 @dataclass
 class TaskSetData:
@@ -28,6 +30,9 @@ class TaskSetData:
             sweep_step (ExponentialNumber): The step size for the parameter sweep.
             total_tasks (int): The total number of tasks in the set.
             time_to_finish (str): The estimated time required to finish the entire task set as a formatted string.
+            sweep_axes (List[SweepAxis]): The swept parameters of a multi-parameter sweep. When empty, the single
+            parameter given by 'sweep_parameter', 'sweep_start', 'sweep_stop' and 'sweep_step' is swept.
+            sweep_order (SweepOrder): How the values of several swept parameters are combined (from the SweepOrder enum).
     """
     
     SweepParameter = Enum("SweepParameter", ["none", "bias", "set_point", "size", "x_offset", "y_offset"])
@@ -38,6 +43,14 @@ class TaskSetData:
         It includes options such as none (no parameter sweep), bias, set_point, size, x_offset, and y_offset.
     """
 
+    SweepOrder = Enum("SweepOrder", ["nested", "zipped"])
+    """
+        Enumeration for specifying how the values of several swept parameters are combined.
+
+        With nested, every combination of values is acquired, the last parameter changing fastest, as in nested loops.
+        With zipped, the parameters advance together, one value of each per task, until the shortest sweep ends.
+    """
+
     name: str
     size: ExponentialNumber
     x_offset: ExponentialNumber
@@ -53,3 +66,18 @@ class TaskSetData:
     sweep_step: ExponentialNumber
     total_tasks: int
     time_to_finish: str
+    sweep_axes: List[SweepAxis] = field(default_factory=list)
+    sweep_order: SweepOrder = SweepOrder.nested
+
+    def axes(self) -> List[SweepAxis]:
+        """
+            The swept parameters of the task set.
+
+            Returns:
+                List[SweepAxis]: 'sweep_axes' or, if it is empty, the axis of 'sweep_parameter'. Empty if nothing is swept.
+        """
+        if self.sweep_axes:
+            return list(self.sweep_axes)
+        if self.sweep_parameter is TaskSetData.SweepParameter.none:
+            return list()
+        return [SweepAxis(self.sweep_parameter, self.sweep_start, self.sweep_stop, self.sweep_step)]
@@ -0,0 +1,227 @@
+import numpy as np
+from enum import Enum
+from typing import Dict, Iterator, List, Union
+
+from core.exponentialnumber import ExponentialNumber
+from core.tasksetdata import TaskSetData
+from core.taskdata import TaskData
+from core.taskrow import TaskRow
+from core.sweep import Sweep
+
+class TaskTable():
+    """
+    Column-oriented table of the tasks of a task set, materialized lazily from its sweep.
+
+    Every task is one row holding its type, image parameters, status and timestamps, so a sweep of tens of thousands
+    of points can be counted or queried with array operations. Parameters are stored in SI units as floats. Indexing
+    the table gives a TaskRow, a light view exposing the same attributes as a TaskData, so code written against
+    TaskData keeps working.
+
+    The table only holds the sweep of its task set. Reading a row computes its parameters from the sweep; rows are
+    stored, as structured NumPy arrays of 'block_size' rows, only once a task in their block is written to, e.g. when
+    it is started or completed. A new table therefore costs the same whatever the length of its sweep, and memory
+    grows with the tasks that have been run.
+
+    The parameters that are not swept keep the ExponentialNumber given in the TaskSetData, so the rows show them exactly
+    as the user entered them; swept parameters are converted back with 'ExponentialNumber.from_float'.
+
+    The number of completed tasks is kept up to date as statuses are written, so progress is read without a scan.
+
+    Attributes:
+        Status (Enum): The status of a task: todo, completed or error.
+        parameters (tuple): The names of the ExponentialNumber image parameters.
+        dtype (np.dtype): The columns of a row.
+        block_size (int): The number of rows stored together.
+        sweep (Sweep): The sweep giving the parameters of every row.
+        fnames (dict): The path of the image acquired by a task, keyed by its row. Tasks without an image are absent.
+
+    Methods:
+        get(name: str, i: int) -> object: Reads a column of a row.
+        set(name: str, i: int, value: object): Writes a column of a row.
+        value(name: str, i: int) -> Union[ExponentialNumber, int]: Gets a parameter of a row.
+        column(name: str) -> np.ndarray: Gets a column.
+        status(i: int) -> Status: Gets the status of a row.
+        completed_count() -> int: Counts the completed tasks.
+        rects() -> np.ndarray: Computes the scan area covered by every task.
+    """
+
+    Status = Enum('Status', ['todo', 'completed', 'error'])
+
+    parameters = ('size', 'x_offset', 'y_offset', 'bias', 'set_point', 'line_time')
+
+    dtype = np.dtype([('task_type', 'i1'),
+                      ('size', 'f8'),
+                      ('x_offset', 'f8'),
+                      ('y_offset', 'f8'),
+                      ('bias', 'f8'),
+                      ('set_point', 'f8'),
+                      ('line_time', 'f8'),
+                      ('lines_per_frame', 'i4'),
+                      ('repetitions', 'i4'),
+                      ('status', 'i1'),
+                      ('started', 'f8'),
+                      ('finished', 'f8')])
+
+    block_size = 1024
+
+    def __init__(self, data: TaskSetData, sweep: Sweep = None, task_type: Enum = None):
+        """
+        Initialize the TaskTable. No rows are computed until they are read.
+
+        Args:
+            data (TaskSetData): The parameters shared by the tasks.
+            sweep (Sweep): The sweep giving one task per point. Default is None, for a single task.
+            task_type (TaskType): The type of the tasks. Default is TaskData.TaskType.Image.
+        """
+        self.sweep = sweep if sweep is not None else Sweep([])
+        self.fnames = dict()
+        self._length = len(self.sweep)
+        self._blocks: Dict[int, np.ndarray] = dict()
+        self._completed = 0
+        self._constants = {name: getattr(data, name) for name in TaskTable.parameters
+                           if name not in self.sweep.names()}
+
+        # The row every block starts from, before the swept parameters are filled in
+        self._template = np.zeros((), dtype=TaskTable.dtype)
+        self._template['task_type'] = (task_type or TaskData.TaskType.Image).value
+        for name in TaskTable.parameters:
+            self._template[name] = getattr(data, name).to_float()
+        self._template['lines_per_frame'] = data.lines_per_frame
+        self._template['repetitions'] = data.repetitions
+        self._template['status'] = TaskTable.Status.todo.value
+        self._template['started'] = np.nan
+        self._template['finished'] = np.nan
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[TaskRow, List[TaskRow]]:
+        if isinstance(i, slice):
+            return [TaskRow(self, j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f'task {i} out of range for {len(self)} tasks')
+        return TaskRow(self, i)
+
+    def __iter__(self) -> Iterator[TaskRow]:
+        return (TaskRow(self, i) for i in range(len(self)))
+
+    def _block(self, b: int) -> np.ndarray:
+        """
+        Gets a block of rows, computing and storing it if needed.
+
+        Args:
+            b (int): The number of the block.
+
+        Returns:
+            np.ndarray: The structured array of the rows of the block.
+        """
+        block = self._blocks.get(b)
+        if block is None:
+            (start, stop) = (b * TaskTable.block_size, min((b + 1) * TaskTable.block_size, len(self)))
+            block = np.full(stop - start, self._template, dtype=TaskTable.dtype)
+            for (name, values) in self.sweep.columns(np.arange(start, stop)).items():
+                block[name] = values
+            self._blocks[b] = block
+        return block
+
+    def get(self, name: str, i: int) -> object:
+        """
+        Reads a column of a row, without storing the row.
+
+        Args:
+            name (str): The column, one of the fields of 'dtype'.
+            i (int): The row.
+
+        Returns:
+            object: The value, as a NumPy scalar.
+        """
+        block = self._blocks.get(i // TaskTable.block_size)
+        if block is not None:
+            return block[name][i % TaskTable.block_size]
+        if name in self.sweep.names():
+            return self.sweep.columns(np.array([i]))[name][0]
+        return self._template[name][()]
+
+    def set(self, name: str, i: int, value: object):
+        """
+        Writes a column of a row, storing its block. Writing a status updates the count of completed tasks.
+
+        Args:
+            name (str): The column, one of the fields of 'dtype'.
+            i (int): The row.
+            value (object): The value.
+        """
+        column = self._block(i // TaskTable.block_size)[name]
+        if name == 'status':
+            completed = TaskTable.Status.completed.value
+            self._completed += int(value == completed) - int(column[i % TaskTable.block_size] == completed)
+        column[i % TaskTable.block_size] = value
+
+    def value(self, name: str, i: int) -> Union[ExponentialNumber, int]:
+        """
+        Gets an image parameter of a row.
+
+        Args:
+            name (str): The parameter, one of 'parameters', 'lines_per_frame' or 'repetitions'.
+            i (int): The row.
+
+        Returns:
+            Union[ExponentialNumber, int]: The parameter, an int for 'lines_per_frame' and 'repetitions'.
+        """
+        if name in self._constants:
+            return self._constants[name]
+        if name in TaskTable.parameters:
+            return ExponentialNumber.from_float(float(self.get(name, i)))
+        return int(self.get(name, i))
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Gets a column. The column is computed for the call and no rows are stored.
+
+        Args:
+            name (str): The column, one of the fields of 'dtype'.
+
+        Returns:
+            np.ndarray: The value of every row.
+        """
+        if name in self.sweep.names():
+            return self.sweep.columns(np.arange(len(self)))[name]
+        column = np.full(len(self), self._template[name])
+        for (b, block) in self._blocks.items():
+            column[b * TaskTable.block_size:b * TaskTable.block_size + len(block)] = block[name]
+        return column
+
+    def status(self, i: int) -> Status:
+        """
+        Gets the status of a row.
+
+        Args:
+            i (int): The row.
+
+        Returns:
+            Status: The status.
+        """
+        return TaskTable.Status(int(self.get('status', i)))
+
+    def completed_count(self) -> int:
+        """
+        Counts the completed tasks. The count is updated as statuses are written, so this takes constant time.
+
+        Returns:
+            int: The number of rows whose status is completed.
+        """
+        return self._completed
+
+    def rects(self) -> np.ndarray:
+        """
+        Computes the scan area covered by every task, in nanometres, as drawn in the scan area.
+
+        Returns:
+            np.ndarray: One (x, y, size) row per task, (x, y) being the top left corner.
+        """
+        size = self.column('size') * 1e9
+        return np.stack([self.column('x_offset') * 1e9 - size / 2,
+                         self.column('y_offset') * 1e9 - size / 2,
+                         size], axis=1)
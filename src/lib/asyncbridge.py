@@ -0,0 +1,121 @@
+import asyncio, threading, traceback
+from typing import Coroutine
+
+from PySide6.QtCore import *
+
+class AsyncSignals(QObject):
+    """
+        Defines the signals available from a coroutine submitted to an AsyncBridge.
+
+        Attributes:
+            finished: Signal emitted with the return value of the coroutine.
+            error: Signal emitted with (exception type, exception, traceback) if the coroutine raised an exception.
+            cancelled: Signal emitted if the coroutine was cancelled.
+    """
+
+    finished = Signal(object)
+    error = Signal(tuple)
+    cancelled = Signal()
+
+class AsyncBridge(QObject):
+    """
+        Runs asyncio coroutines on behalf of the Qt GUI thread.
+
+        Coroutines submitted to the bridge run on a single asyncio event loop, and their outcome is delivered back to
+        the GUI thread through Qt signals. If the application was started on a qasync event loop, that loop is used
+        and coroutines run on the GUI thread itself. Otherwise the bridge starts one background thread running its
+        own event loop, shared by every coroutine, so no thread is needed per task.
+
+        The outcome is always emitted from the event loop of the bridge's thread, after the call that submitted the
+        coroutine has returned, so signals connected right after 'submit' never miss it.
+
+        Attributes:
+            loop (asyncio.AbstractEventLoop): The event loop the coroutines run on.
+
+        Methods:
+            submit(coro: Coroutine) -> AsyncSignals: Schedules a coroutine and returns the signals reporting its outcome.
+            shutdown(cleanup: Coroutine): Runs a last coroutine and stops the background event loop, if the bridge started one.
+    """
+
+    _completed = Signal(object, object)
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None, *args, **kwargs):
+        """
+            Initializes the AsyncBridge.
+
+            Args:
+                loop (asyncio.AbstractEventLoop): The event loop to run coroutines on, e.g. a qasync QEventLoop. Default is
+                None, which starts a background thread with its own event loop.
+        """
+        super().__init__(*args, **kwargs)
+        self._thread = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name='AsyncBridge', daemon=True)
+            self._thread.start()
+        self.loop = loop
+        self._futures = set()
+        self._completed.connect(self._done, Qt.QueuedConnection)
+
+    def submit(self, coro: Coroutine) -> AsyncSignals:
+        """
+            Schedules a coroutine on the bridge's event loop.
+
+            Connect to the returned signals to receive the outcome. The signals are delivered on the thread the bridge
+            lives in, which is normally the GUI thread.
+
+            Args:
+                coro (Coroutine): The coroutine to run.
+
+            Returns:
+                AsyncSignals: The signals reporting the outcome of the coroutine.
+        """
+        signals = AsyncSignals()
+        signals.moveToThread(self.thread())
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self._futures.add(future)
+        future.add_done_callback(lambda f: self._completed.emit(f, signals))
+        signals.future = future
+        return signals
+
+    def _done(self, future, signals: AsyncSignals):
+        """
+            Emits the outcome of a finished coroutine.
+
+            Args:
+                future (concurrent.futures.Future): The future of the coroutine.
+                signals (AsyncSignals): The signals reporting the outcome.
+        """
+        self._futures.discard(future)
+        if future.cancelled():
+            signals.cancelled.emit()
+            return
+        e = future.exception()
+        if e is not None:
+            signals.error.emit((type(e), e, ''.join(traceback.format_exception(e))))
+        else:
+            signals.finished.emit(future.result())
+
+    def shutdown(self, cleanup: Coroutine = None, timeout: float = 5.0):
+        """
+            Cancels the coroutines still running and stops the background event loop, if the bridge started one.
+
+            Args:
+                cleanup (Coroutine): A coroutine to run once the others are cancelled, e.g. closing a connection. On a
+                background event loop it is waited for, up to 'timeout' seconds; on the application's loop it is only
+                scheduled. Default is None.
+                timeout (float): The maximum time in seconds to wait for 'cleanup'. Default is 5.0.
+        """
+        for future in list(self._futures):
+            future.cancel()
+        if cleanup is not None:
+            future = asyncio.run_coroutine_threadsafe(cleanup, self.loop)
+            if self._thread is not None:
+                try:
+                    future.result(timeout)
+                except Exception as e:
+                    print(f'Shutting down the event loop: {e}')
+        if self._thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,338 @@
+import asyncio, os, time
+from collections import deque
+from types import SimpleNamespace
+
+from core.vector2 import Vector2
+from core.procedureresult import ProcedureResult
+from lib.stm import STM, STMError
+
+class AsyncSTM():
+    """
+    Represents an STM (Scanning Tunneling Microscope) controller driven from an asyncio event loop.
+
+    This class offers the same commands as STM over a single persistent asyncio connection. Commands may be issued
+    concurrently: each one is written as soon as it is called and its reply is matched to it in send order, since the
+    controller answers commands in the order it receives them. Every command can be given its own timeout, and a
+    cancelled or timed out command does not desynchronise later ones; its reply is read and discarded when it arrives.
+
+    Attributes:
+        _timeout (float): The default time in seconds to wait for the reply to a command.
+        ip (str): The IP address of the STM device.
+        port (int): The port number for the TCP/IP connection to the STM device.
+        commands (SimpleNamespace): The command table loaded from 'stm_commands.json', if any.
+
+    Methods:
+        __init__(self, ip: str = '127.0.0.1', port: int = 12600, commands: SimpleNamespace = None): Initializes the AsyncSTM instance.
+        connect(self): Opens the connection to the STM device.
+        close(self): Closes the connection to the STM device and fails every pending command.
+        send(self, msg: str, out_dtype: type = str, timeout: float = ...): Sends a message and waits for its response.
+        start_procedure(self, procedure_name: str, timeout: float = None): Starts an STM procedure and waits for it to finish.
+        set_bias(self, bias: float): Sets the STM bias value.
+        set_setpoint(self, setpoint: float): Sets the STM set point value.
+        set_scan_size(self, size: float): Sets the scan area size.
+        set_scan_pos(self, pos: Vector2): Sets the scan area position.
+        set_line_time(self, line_time: float): Sets the line time for scanning.
+        set_lines_per_frame(self, lines_per_frame: int): Sets the number of lines per frame.
+        set_scan_count(self, scan_count: int): Sets the number of scans to be performed.
+        get_save_path(self): Retrieves the save path for the measurement data from the STM device.
+    """
+
+    _timeout = 10.0
+
+    def __init__(self, ip: str = '127.0.0.1', port: int = 12600, commands: SimpleNamespace = None):
+        """
+        Initializes the AsyncSTM instance.
+
+        Args:
+            ip (str): The IP address of the STM device. Default is '127.0.0.1'.
+            port (int): The port number for the TCP/IP connection to the STM device. Default is 12600.
+            commands (SimpleNamespace): The command table loaded from 'stm_commands.json'. Default is None.
+        """
+        self.ip = ip
+        self.port = port
+        self.commands = commands
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = deque()
+        self._connecting = None
+
+    @property
+    def connected(self) -> bool:
+        """
+        Whether the connection to the STM device is open.
+
+        Returns:
+            bool: True if the connection is open, False otherwise.
+        """
+        return self._writer is not None and not self._writer.is_closing()
+
+    def command(self, key: str) -> str:
+        """
+        Looks up the command prefix for a parameter.
+
+        Args:
+            key (str): The name of the command, as used in 'stm_commands.json'.
+
+        Returns:
+            str: The command from the loaded command table, or the built-in default if it is not listed there.
+        """
+        return getattr(self.commands, key, STM._default_commands[key])
+
+    async def connect(self):
+        """
+        Opens the connection to the STM device and starts reading replies.
+
+        Concurrent callers share a single connection attempt.
+        """
+        if self.connected:
+            return
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._open())
+        try:
+            await asyncio.shield(self._connecting)
+        finally:
+            if self._connecting is not None and self._connecting.done():
+                self._connecting = None
+
+    async def _open(self):
+        """
+        Opens the streams to the STM device and starts the reply reader.
+        """
+        (self._reader, self._writer) = await asyncio.open_connection(self.ip, self.port)
+        self._reader_task = asyncio.ensure_future(self._read_replies())
+
+    async def close(self):
+        """
+        Closes the connection to the STM device.
+
+        Commands still waiting for a reply fail with ConnectionResetError.
+        """
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._reader = None
+        self._writer = None
+        self._fail_pending(ConnectionResetError('STM connection closed'))
+
+    async def _read_replies(self):
+        """
+        Reads replies from the STM device and hands each one to the oldest command still waiting for a reply.
+
+        Replies to commands that were cancelled or timed out are discarded. If the connection fails, or a reply is longer
+        than the stream buffer, the commands still waiting fail with that error and the connection is closed; the next
+        command reconnects.
+        """
+        try:
+            while True:
+                line = await self._reader.readuntil(STM._terminator)
+                reply = line[:-len(STM._terminator)].decode().rstrip('\r')
+                if not self._pending:
+                    continue
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except asyncio.IncompleteReadError:
+            self._fail_pending(ConnectionResetError('STM closed the connection'))
+        except (asyncio.LimitOverrunError, OSError) as e:
+            self._fail_pending(e)
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+
+    def _fail_pending(self, exc: Exception):
+        """
+        Fails every command still waiting for a reply.
+
+        Args:
+            exc (Exception): The exception raised in each waiting command.
+        """
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(exc)
+
+    async def send(self, msg: str, out_dtype: type = str, timeout: float = ...):
+        """
+        Sends a message to the STM device and waits for its response.
+
+        Args:
+            msg (str): The message to be sent to the STM device.
+            out_dtype (type): The data type of the expected output. Default is 'str'.
+            timeout (float): The maximum time in seconds to wait for the response. Defaults to '_timeout'; None waits
+            indefinitely.
+
+        Returns:
+            out_dtype: The response from the STM device with the specified data type.
+
+        Raises:
+            TimeoutError: If no response arrived within 'timeout' seconds.
+            ConnectionResetError: If the connection was lost before the response arrived.
+            STMError: If the STM device reported an error or the reply could not be converted to 'out_dtype'.
+        """
+        if timeout is ...:
+            timeout = AsyncSTM._timeout
+        await self.connect()
+
+        future = asyncio.get_running_loop().create_future()
+        self._writer.write(STM._encode(msg))
+        self._pending.append(future)
+        await self._writer.drain()
+
+        reply = await asyncio.wait_for(future, timeout)
+        return STM._convert(msg, reply, out_dtype)
+
+    async def start_procedure(self, procedure_name: str, timeout: float = None) -> ProcedureResult:
+        """
+        Starts an STM procedure by its name and waits for it to finish.
+
+        As with STM.start_procedure, 'procedure_completion' in 'stm_commands.json' tells whether the procedure is
+        finished with the reply to StartProcedure ('acknowledgement', the default) or with a second line the STM device
+        sends once it has finished ('reply'). The replies are queued for when the command is written, so other commands
+        may be sent while the procedure runs.
+
+        Args:
+            procedure_name (str): The name of the procedure to be started.
+            timeout (float): The maximum time in seconds to wait for the procedure to finish. Default is None, which
+            waits indefinitely.
+
+        Returns:
+            ProcedureResult: The last reply of the STM device together with the times the procedure was started, or
+            acknowledged with 'reply', and finished.
+
+        Raises:
+            TimeoutError: If the procedure did not finish within 'timeout' seconds.
+            STMError: If the STM device refused to start the procedure or reported an error when it finished.
+            ValueError: If 'procedure_completion' is not a known way to detect the end of a procedure.
+        """
+        cmd = f'{self.command("start_scan_of_type")}{procedure_name}'
+        completion = self.command('procedure_completion')
+        if completion not in STM._completions:
+            raise ValueError(f'unknown procedure completion {completion!r}, expected one of {STM._completions}')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        await self.connect()
+
+        loop = asyncio.get_running_loop()
+        replies = [loop.create_future() for _ in range(2 if completion == 'reply' else 1)]
+        started = time.time()
+        self._writer.write(STM._encode(cmd))
+        self._pending.extend(replies)
+        await self._writer.drain()
+
+        reply = await asyncio.wait_for(replies[0], timeout)
+        if completion == 'reply':
+            try:
+                STM._convert(cmd, reply, str)
+            except STMError:
+                # A refused procedure is not followed by a completion reply, which must not take the reply of a later
+                # command
+                if replies[1] in self._pending:
+                    self._pending.remove(replies[1])
+                raise
+            started = time.time()
+            reply = await asyncio.wait_for(replies[1], None if deadline is None else max(deadline - time.monotonic(), 0))
+        return ProcedureResult(procedure_name, STM._convert(cmd, reply, str), started, time.time())
+
+    async def set_bias(self, bias: float):
+        """
+        Sets the STM bias value.
+
+        Args:
+            bias (float): The bias value to be set.
+
+        Returns:
+            str: The response from the STM device after setting the bias value.
+        """
+        return await self.send(f'{self.command("set_bias")}{bias}')
+
+    async def set_setpoint(self, setpoint: float):
+        """
+        Sets the STM set point value.
+
+        Args:
+            setpoint (float): The set point value to be set.
+
+        Returns:
+            str: The response from the STM device after setting the set point value.
+        """
+        return await self.send(f'{self.command("set_setpoint")}{setpoint}')
+
+    async def set_scan_size(self, size: float):
+        """
+        Sets the scan area size.
+
+        Args:
+            size (float): The size of the scan area to be set.
+
+        Returns:
+            str: The response from the STM device after setting the scan area size.
+        """
+        return await self.send(f'{self.command("set_scan_size")}{size}')
+
+    async def set_scan_pos(self, pos: Vector2):
+        """
+        Sets the scan area position.
+
+        Both offsets are sent before either reply is awaited.
+
+        Args:
+            pos (Vector2): The position of the scan area to be set.
+
+        Returns:
+            str: The response from the STM device after setting the scan area position.
+        """
+        (_, result) = await asyncio.gather(self.send(f'{self.command("set_scan_pos_x")}{pos.x}'),
+                                           self.send(f'{self.command("set_scan_pos_y")}{pos.y}'))
+        return result
+
+    async def set_line_time(self, line_time: float):
+        """
+        Sets the line time for scanning.
+
+        Args:
+            line_time (float): The time taken for each line scan.
+
+        Returns:
+            str: The response from the STM device after setting the line time.
+        """
+        return await self.send(f'{self.command("set_line_time")}{line_time}')
+
+    async def set_lines_per_frame(self, lines_per_frame: int):
+        """
+        Sets the number of lines per frame.
+
+        Args:
+            lines_per_frame (int): The number of lines to be scanned in each frame.
+
+        Returns:
+            str: The response from the STM device after setting the lines per frame.
+        """
+        return await self.send(f'{self.command("set_resolution")}{lines_per_frame}')
+
+    async def set_scan_count(self, scan_count: int):
+        """
+        Sets the number of scans to be performed.
+
+        Args:
+            scan_count (int): The number of scans to be set.
+
+        Returns:
+            str: The response from the STM device after setting the scan count.
+        """
+        return await self.send(f'{self.command("set_scan_count")}{scan_count}')
+
+    async def get_save_path(self):
+        """
+        Retrieves the save path for the measurement data from the STM device.
+
+        Returns:
+            str: The save path for the measurement data.
+        """
+        return os.path.normpath(await self.send(self.command('get_save_path'), str))
@@ -0,0 +1,244 @@
+import os, glob, json, math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from multiprocessing import shared_memory
+from typing import Callable, List
+
+from core.framesummary import FrameSummary
+from lib import levelling
+from lib.previewrenderer import PreviewRenderer
+
+def load_topography(fname: str) -> np.ndarray:
+    """
+    Loads the topography channels of an '.sm4' file with spym.
+
+    This is the default loader of the previews and of BatchProcessor. Files of another format, e.g. the synthetic images
+    of the STM simulator, are read by passing their own loader instead.
+
+    Args:
+        fname (str): The path of the file.
+
+    Returns:
+        np.ndarray: The forward topography, stacked with the backward topography if the file has one, as a float32
+        array of shape (channels, lines, pixels).
+
+    Raises:
+        ValueError: If the file holds no topography image, e.g. if it is a current image.
+    """
+    import spym
+    sm4 = spym.load(fname)
+    if 'Current' in sm4.data_vars or 'Topography_Forward' not in sm4.data_vars:
+        raise ValueError(f'{fname} holds no topography image')
+    channels = [sm4.Topography_Forward.data]
+    if 'Topography_Backward' in sm4.data_vars and sm4.Topography_Backward.shape == sm4.Topography_Forward.shape:
+        channels.append(sm4.Topography_Backward.data)
+    return levelling.as_frames(np.stack(channels))
+
+def thumbnail(nd_img: np.ndarray, size: int) -> np.ndarray:
+    """
+    Shrinks a frame to a square thumbnail, averaging blocks of pixels where the frame is large enough.
+
+    Args:
+        nd_img (np.ndarray): The frame.
+        size (int): The width and height of the thumbnail in pixels.
+
+    Returns:
+        np.ndarray: The thumbnail as a float32 array of shape (size, size).
+    """
+    (height, width) = nd_img.shape
+    (fy, fx) = (max(height // size, 1), max(width // size, 1))
+    if fy > 1 or fx > 1:
+        (height, width) = (height // fy, width // fx)
+        nd_img = nd_img[:height * fy, :width * fx].reshape(height, fy, width, fx).mean(axis=(1, 3))
+    rows = np.arange(size) * height // size
+    cols = np.arange(size) * width // size
+    return nd_img[np.ix_(rows, cols)].astype(np.float32)
+
+def process_chunk(fnames: List[str], shm_name: str, offset: int, size: int, recipe: tuple,
+                  load: Callable[[str], np.ndarray] = load_topography) -> List[FrameSummary]:
+    """
+    Loads, levels and shrinks a chunk of files in a worker process.
+
+    The thumbnails are written straight into the shared memory block at their index in the batch, so only the small
+    summaries are sent back to the parent process.
+
+    Args:
+        fnames (List[str]): The paths of the files in the chunk.
+        shm_name (str): The name of the shared memory block holding the thumbnails of the whole batch.
+        offset (int): The index in the batch of the first file of the chunk.
+        size (int): The width and height of the thumbnails in pixels.
+        recipe (tuple): The levelling steps, see 'levelling.level'.
+        load (Callable[[str], np.ndarray]): Loads the topography channels of a file. Default is 'load_topography'.
+
+    Returns:
+        List[FrameSummary]: The summary of each file, without its thumbnail path.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        thumbnails = np.ndarray((offset + len(fnames), size, size), dtype=np.float32, buffer=shm.buf)
+        summaries = list()
+        for (i, fname) in enumerate(fnames):
+            try:
+                frames = levelling.level(load(fname), recipe)
+            except Exception as e:
+                summaries.append(FrameSummary(fname, error=f'{type(e).__name__}: {e}'))
+                continue
+            forward = frames[0]
+            thumbnails[offset + i] = thumbnail(forward, size)
+            finite = forward[np.isfinite(forward)]
+            summaries.append(FrameSummary(fname, width=forward.shape[1], height=forward.shape[0],
+                                          channels=frames.shape[0],
+                                          minimum=float(finite.min()) if finite.size else None,
+                                          maximum=float(finite.max()) if finite.size else None,
+                                          rms=float(np.sqrt(np.mean((finite - finite.mean())**2))) if finite.size else None))
+        del thumbnails
+        return summaries
+    finally:
+        shm.close()
+
+class BatchProcessor():
+    """
+    Reprocesses the '.sm4' files of a session in a pool of worker processes.
+
+    Every file is loaded and levelled, with its backward channel if it has one, and shrunk to a thumbnail. Files are
+    handed to the workers in chunks, and the workers write the thumbnails into one shared memory block instead of
+    sending them back through pipes. The parent renders the thumbnails to PNG files and writes a summary index,
+    'index.json', listing a FrameSummary per file. The thumbnails keep the paths of their files relative to the deepest
+    directory holding all of them, so files of the same name in different directories get thumbnails of their own.
+
+    Attributes:
+        out_dir (str): The directory the thumbnails and the index are written to.
+        size (int): The width and height of the thumbnails in pixels.
+        workers (int): The number of worker processes.
+        recipe (tuple): The levelling steps, see 'levelling.level'.
+        load (Callable[[str], np.ndarray]): Loads the topography channels of a file.
+
+    Methods:
+        find_files(paths: List[str]) -> List[str]: Lists the '.sm4' files in directories and file paths.
+        task_set_files(task_set) -> List[str]: Lists the images acquired by a task set.
+        run(fnames: List[str]) -> List[FrameSummary]: Reprocesses files and writes the thumbnails and the index.
+    """
+
+    _chunks_per_worker = 4
+
+    def __init__(self, out_dir: str, size: int = 128, workers: int = None, recipe: tuple = ('align', 'plane', 'align'),
+                 load: Callable[[str], np.ndarray] = load_topography):
+        """
+        Initializes the BatchProcessor.
+
+        Args:
+            out_dir (str): The directory the thumbnails and the index are written to.
+            size (int): The width and height of the thumbnails in pixels. Default is 128.
+            workers (int): The number of worker processes. Defaults to the number of CPUs.
+            recipe (tuple): The levelling steps. Default is ('align', 'plane', 'align'), as used for previews.
+            load (Callable[[str], np.ndarray]): Loads the topography channels of a file, in a worker process, so it
+            must be a module level function or static method. Default is 'load_topography', for '.sm4' files.
+        """
+        self.out_dir = out_dir
+        self.size = size
+        self.workers = workers or os.cpu_count() or 1
+        self.recipe = recipe
+        self.load = load
+
+    @staticmethod
+    def find_files(paths: List[str]) -> List[str]:
+        """
+        Lists the '.sm4' files in directories and file paths.
+
+        Args:
+            paths (List[str]): Directories, whose '.sm4' files are listed, and files, which are listed as they are.
+
+        Returns:
+            List[str]: The sorted paths of the files.
+        """
+        fnames = list()
+        for path in paths:
+            if os.path.isdir(path):
+                fnames.extend(glob.glob(os.path.join(path, '*.sm4')))
+            else:
+                fnames.append(path)
+        return sorted(fnames)
+
+    @staticmethod
+    def task_set_files(task_set) -> List[str]:
+        """
+        Lists the images acquired by a task set.
+
+        Args:
+            task_set (TaskSet): The task set.
+
+        Returns:
+            List[str]: The paths of the images of its tasks, in task order, for the tasks whose image is known.
+        """
+        fnames = task_set.tasks.fnames
+        return [fnames[i] for i in sorted(fnames) if fnames[i] is not None]
+
+    def run(self, fnames: List[str]) -> List[FrameSummary]:
+        """
+        Reprocesses files and writes their thumbnails and the summary index to 'out_dir'.
+
+        Args:
+            fnames (List[str]): The paths of the files.
+
+        Returns:
+            List[FrameSummary]: The summary of each file, in the order of 'fnames'.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        if not fnames:
+            self.write_index(list())
+            return list()
+
+        chunk = max(1, math.ceil(len(fnames) / (self.workers * BatchProcessor._chunks_per_worker)))
+        shm = shared_memory.SharedMemory(create=True, size=len(fnames) * self.size * self.size * 4)
+        try:
+            summaries = list()
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(process_chunk, fnames[i:i + chunk], shm.name, i, self.size, self.recipe,
+                                           self.load)
+                           for i in range(0, len(fnames), chunk)]
+                for future in futures:
+                    summaries.extend(future.result())
+
+            root = os.path.commonpath([os.path.dirname(os.path.abspath(fname)) for fname in fnames])
+            thumbnails = np.ndarray((len(fnames), self.size, self.size), dtype=np.float32, buffer=shm.buf)
+            for (i, summary) in enumerate(summaries):
+                if summary.error is None:
+                    summary.thumbnail = self.write_thumbnail(summary.fname, thumbnails[i], root)
+            del thumbnails
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.write_index(summaries)
+        return summaries
+
+    def write_thumbnail(self, fname: str, nd_img: np.ndarray, root: str) -> str:
+        """
+        Renders a thumbnail with the preview colormap and saves it as a PNG file.
+
+        Args:
+            fname (str): The path of the '.sm4' file the thumbnail belongs to.
+            nd_img (np.ndarray): The thumbnail.
+            root (str): A directory holding the file. The PNG file is saved at the path of the file relative to it.
+
+        Returns:
+            str: The path of the PNG file.
+        """
+        relative = os.path.relpath(os.path.abspath(fname), root)
+        path = os.path.join(self.out_dir, os.path.splitext(relative)[0] + '.png')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        PreviewRenderer(self.size).render(nd_img).save(path)
+        return path
+
+    def write_index(self, summaries: List[FrameSummary]):
+        """
+        Writes the summary index, 'index.json', to 'out_dir'.
+
+        Args:
+            summaries (List[FrameSummary]): The summaries of the processed files.
+        """
+        with open(os.path.join(self.out_dir, 'index.json'), 'w') as f:
+            json.dump({'recipe': list(self.recipe),
+                       'size': self.size,
+                       'frames': [asdict(summary) for summary in summaries]}, f, indent=2)
@@ -0,0 +1,152 @@
+import os, threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+class FrameCache():
+    """
+        A memory-bounded least recently used cache of loaded and processed image frames.
+
+        Entries are keyed by the path of the image file, its modification time and a processing recipe, so a frame is
+        recomputed if the file changes on disk or is processed differently. Values are typically levelled NumPy arrays
+        or rendered QImages; their size is taken from 'nbytes' or 'sizeInBytes()'. When the total size exceeds the
+        byte budget, the least recently used entries are evicted. The cache may be shared between threads.
+
+        Attributes:
+            budget (int): The maximum total size in bytes of the cached values.
+            size (int): The current total size in bytes of the cached values.
+            hits (int): The number of lookups that found their entry.
+            misses (int): The number of lookups that did not.
+
+        Methods:
+            get(path: str, recipe: Hashable): Looks up a cached frame.
+            put(path: str, recipe: Hashable, value): Caches a frame.
+            get_or_compute(path: str, recipe: Hashable, compute: Callable): Looks up a frame, computing it on a miss.
+            clear(): Removes every entry.
+    """
+
+    def __init__(self, budget: int = 256 * 2**20):
+        """
+            Initializes the FrameCache.
+
+            Args:
+                budget (int): The maximum total size in bytes of the cached values. Default is 256 MiB.
+        """
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(path: str, recipe: Hashable) -> tuple:
+        """
+            Builds the key of a frame.
+
+            Args:
+                path (str): The path of the image file.
+                recipe (Hashable): The processing recipe.
+
+            Returns:
+                tuple: The normalized path, its modification time in nanoseconds and the recipe.
+
+            Raises:
+                OSError: If the file does not exist.
+        """
+        path = os.path.normpath(path)
+        return (path, os.stat(path).st_mtime_ns, recipe)
+
+    @staticmethod
+    def nbytes(value) -> int:
+        """
+            Estimates the memory used by a cached value.
+
+            Args:
+                value: The value, e.g. a NumPy array, a QImage or a tuple or list of them.
+
+            Returns:
+                int: The size in bytes.
+        """
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+        if hasattr(value, 'sizeInBytes'):
+            return int(value.sizeInBytes())
+        if isinstance(value, (tuple, list)):
+            return sum(FrameCache.nbytes(v) for v in value)
+        return 0
+
+    def get(self, path: str, recipe: Hashable):
+        """
+            Looks up a cached frame and marks it as recently used.
+
+            Args:
+                path (str): The path of the image file.
+                recipe (Hashable): The processing recipe.
+
+            Returns:
+                The cached value, or None if it is not cached.
+        """
+        key = FrameCache.key(path, recipe)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, path: str, recipe: Hashable, value):
+        """
+            Caches a frame, evicting the least recently used frames if the budget is exceeded.
+
+            A value larger than the whole budget is not cached.
+
+            Args:
+                path (str): The path of the image file.
+                recipe (Hashable): The processing recipe.
+                value: The frame.
+        """
+        key = FrameCache.key(path, recipe)
+        nbytes = FrameCache.nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            if nbytes > self.budget:
+                return
+            self._entries[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.budget:
+                (_, (_, evicted)) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def get_or_compute(self, path: str, recipe: Hashable, compute: Callable):
+        """
+            Looks up a frame and computes and caches it if it is not cached.
+
+            Args:
+                path (str): The path of the image file.
+                recipe (Hashable): The processing recipe.
+                compute (Callable): Called without arguments to compute the frame on a miss.
+
+            Returns:
+                The cached or computed value. None is returned but not cached.
+        """
+        value = self.get(path, recipe)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(path, recipe, value)
+        return value
+
+    def clear(self):
+        """
+            Removes every entry. The hit and miss counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
@@ -0,0 +1,141 @@
+import os, json, threading
+import numpy as np
+from typing import List
+
+class FrameStore():
+    """
+    An append-only, memory-mapped store of levelled topography frames for a session.
+
+    Frames are appended as raw C-ordered arrays to 'frames.bin', each starting at a 64 byte aligned offset, and
+    described by one JSON line in 'index.jsonl' giving the offset, shape and dtype of the frame together with free-form
+    metadata such as the source file and the task parameters. Reading a frame maps it from the data file, so thousands
+    of frames can be reached without loading them into memory. A store can be reopened, and keeps appending to the
+    existing files. Appends and reads may come from different threads.
+
+    Attributes:
+        path (str): The directory holding the store.
+        index (List[dict]): The entry of every frame, in the order they were appended.
+
+    Methods:
+        append(frames: np.ndarray, meta: dict) -> int: Appends a frame.
+        frame(i: int) -> np.ndarray: Maps a frame read-only.
+        find(fname: str) -> int: Finds the frame of a source file.
+    """
+
+    _alignment = 64
+    _data_name = 'frames.bin'
+    _index_name = 'index.jsonl'
+
+    def __init__(self, path: str):
+        """
+        Opens the store in a directory, creating it if needed.
+
+        Args:
+            path (str): The directory holding the store.
+        """
+        self.path = path
+        self.index: List[dict] = list()
+        self._by_fname = dict()
+        self._lock = threading.Lock()
+        self._map = None
+
+        os.makedirs(path, exist_ok=True)
+        self._data_path = os.path.join(path, FrameStore._data_name)
+        self._index_path = os.path.join(path, FrameStore._index_name)
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                for line in f:
+                    if line.strip():
+                        self._add_entry(json.loads(line))
+        # Drop data appended after the last indexed frame, e.g. by an interrupted append
+        end = self.index[-1]['offset'] + self.index[-1]['nbytes'] if self.index else 0
+        with open(self._data_path, 'ab') as f:
+            f.truncate(end)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _add_entry(self, entry: dict):
+        """
+        Adds an entry to the in-memory index.
+
+        Args:
+            entry (dict): The entry of a frame.
+        """
+        self.index.append(entry)
+        fname = entry['meta'].get('fname')
+        if fname is not None:
+            self._by_fname[os.path.normpath(fname)] = len(self.index) - 1
+
+    def append(self, frames: np.ndarray, meta: dict = None) -> int:
+        """
+        Appends a frame, e.g. the levelled forward and backward channels of an image stacked together.
+
+        The data is written before its index entry, so an interrupted append leaves no entry pointing at missing data.
+
+        Args:
+            frames (np.ndarray): The frame.
+            meta (dict): JSON serializable metadata stored with the frame, e.g. 'fname' for the source file. Default is
+            None.
+
+        Returns:
+            int: The number of the frame in the store.
+        """
+        frames = np.ascontiguousarray(frames)
+        with self._lock:
+            with open(self._data_path, 'ab') as f:
+                offset = f.tell()
+                padding = -offset % FrameStore._alignment
+                f.write(b'\0' * padding)
+                f.write(frames.tobytes())
+            entry = {'offset': offset + padding,
+                     'nbytes': frames.nbytes,
+                     'shape': list(frames.shape),
+                     'dtype': frames.dtype.str,
+                     'meta': meta or dict()}
+            with open(self._index_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._add_entry(entry)
+            self._map = None
+            return len(self.index) - 1
+
+    def frame(self, i: int) -> np.ndarray:
+        """
+        Maps a frame read-only, without copying it.
+
+        Args:
+            i (int): The number of the frame.
+
+        Returns:
+            np.ndarray: A read-only view of the frame in the memory-mapped data file.
+        """
+        with self._lock:
+            entry = self.index[i]
+            if self._map is None:
+                self._map = np.memmap(self._data_path, dtype=np.uint8, mode='r')
+            data = self._map[entry['offset']:entry['offset'] + entry['nbytes']]
+        return data.view(np.dtype(entry['dtype'])).reshape(entry['shape'])
+
+    def meta(self, i: int) -> dict:
+        """
+        The metadata of a frame.
+
+        Args:
+            i (int): The number of the frame.
+
+        Returns:
+            dict: The metadata given when the frame was appended.
+        """
+        return self.index[i]['meta']
+
+    def find(self, fname: str) -> int:
+        """
+        Finds the most recent frame appended for a source file.
+
+        Args:
+            fname (str): The path of the source file, as given in the 'fname' metadata.
+
+        Returns:
+            int: The number of the frame, or None if there is none.
+        """
+        return self._by_fname.get(os.path.normpath(fname))
@@ -0,0 +1,143 @@
+import numpy as np
+from typing import List
+
+from PySide6.QtGui import QImage
+from qimage2ndarray import raw_view
+
+def afmhot_table() -> list:
+    """
+        Computes the 'afmhot' colormap as a QImage color table.
+
+        The colormap is the one matplotlib uses, with red, green and blue rising linearly as 2x, 2x - 0.5 and 2x - 1
+        and clipped to [0, 1].
+
+        Returns:
+            list: The 256 colors of the colormap as QRgb values.
+    """
+    x = np.linspace(0., 1., 256)
+    rgb = np.clip(np.stack([2 * x, 2 * x - 0.5, 2 * x - 1]), 0., 1.)
+    rgb = np.round(rgb * 255).astype(np.uint32)
+    return [int(color) for color in 0xff000000 | (rgb[0] << 16) | (rgb[1] << 8) | rgb[2]]
+
+class PreviewRenderer():
+    """
+        Renders topography arrays into QImages with the 'afmhot' colormap.
+
+        The array is resampled to a fixed resolution, scaled to 8 bit between its minimum and maximum and handed to Qt
+        as an indexed image whose color table is the precomputed 'afmhot' colormap, so each frame costs a single
+        resolution-sized copy and no matplotlib figure.
+
+        Attributes:
+            resolution (int): The width and height in pixels of the rendered images.
+
+        Methods:
+            render(nd_img: np.ndarray) -> QImage: Renders a topography array into a QImage.
+            render_pyramid(nd_img: np.ndarray, min_size: int) -> List[QImage]: Renders a topography array into a
+            level-of-detail pyramid.
+            normalize(nd_img: np.ndarray) -> np.ndarray: Resamples and scales a topography array for rendering.
+            resample(nd_img: np.ndarray) -> np.ndarray: Resamples a topography array to the output resolution.
+    """
+
+    _color_table = afmhot_table()
+
+    def __init__(self, resolution: int = 512):
+        """
+            Initializes the PreviewRenderer.
+
+            Args:
+                resolution (int): The width and height in pixels of the rendered images. Default is 512.
+        """
+        self.resolution = resolution
+
+    def render(self, nd_img: np.ndarray) -> QImage:
+        """
+            Renders a topography array into a QImage.
+
+            Values that are not finite, e.g. of lines the scan did not reach, are drawn with the lowest color.
+
+            Args:
+                nd_img (np.ndarray): The topography to render.
+
+            Returns:
+                QImage: The rendered image, of 'resolution' x 'resolution' pixels in 'Format_Indexed8'.
+        """
+        return PreviewRenderer.to_image(self.normalize(nd_img))
+
+    def render_pyramid(self, nd_img: np.ndarray, min_size: int = 32) -> List[QImage]:
+        """
+            Renders a topography array into a level-of-detail pyramid.
+
+            The first level is the image 'render' makes; every following level averages 2x2 pixels of the previous
+            one, down to 'min_size'. All levels share the color scale of the first.
+
+            Args:
+                nd_img (np.ndarray): The topography to render.
+                min_size (int): The width and height in pixels of the smallest level. Default is 32.
+
+            Returns:
+                List[QImage]: The levels, largest first.
+        """
+        img = self.normalize(nd_img)
+        pyramid = [PreviewRenderer.to_image(img)]
+        while min(img.shape) >= 2 * min_size:
+            (height, width) = (img.shape[0] // 2 * 2, img.shape[1] // 2 * 2)
+            img = 0.25 * (img[0:height:2, 0:width:2] + img[1:height:2, 0:width:2]
+                          + img[0:height:2, 1:width:2] + img[1:height:2, 1:width:2])
+            pyramid.append(PreviewRenderer.to_image(img))
+        return pyramid
+
+    def normalize(self, nd_img: np.ndarray) -> np.ndarray:
+        """
+            Resamples a topography array to the output resolution and scales it to the range of the color table.
+
+            Values that are not finite are set to the lowest value.
+
+            Args:
+                nd_img (np.ndarray): The topography.
+
+            Returns:
+                np.ndarray: The scaled topography as float32 values in [0, 255].
+        """
+        img = self.resample(nd_img).astype(np.float32)
+        finite = np.isfinite(img)
+        if not finite.any():
+            img[:] = 0.
+        else:
+            (low, high) = (img[finite].min(), img[finite].max())
+            img[~finite] = low
+            img -= low
+            if high > low:
+                img *= 255. / (high - low)
+        return img
+
+    @staticmethod
+    def to_image(img: np.ndarray) -> QImage:
+        """
+            Wraps values scaled by 'normalize' into an indexed QImage with the 'afmhot' color table.
+
+            Args:
+                img (np.ndarray): The values in [0, 255].
+
+            Returns:
+                QImage: The image in 'Format_Indexed8'.
+        """
+        (height, width) = img.shape
+        image = QImage(width, height, QImage.Format.Format_Indexed8)
+        image.setColorTable(PreviewRenderer._color_table)
+        raw_view(image)[:] = img
+        return image
+
+    def resample(self, nd_img: np.ndarray) -> np.ndarray:
+        """
+            Resamples a topography array to the output resolution by nearest neighbour.
+
+            Args:
+                nd_img (np.ndarray): The topography to resample.
+
+            Returns:
+                np.ndarray: The resampled topography.
+        """
+        (height, width) = nd_img.shape
+        rows = np.arange(self.resolution) * height // self.resolution
+        cols = np.arange(self.resolution) * width // self.resolution
+        return nd_img[np.ix_(rows, cols)]
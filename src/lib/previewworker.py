@@ -0,0 +1,159 @@
+import traceback
+import numpy as np
+from typing import Callable, List
+
+from PySide6.QtCore import *
+from PySide6.QtGui import QImage
+
+from core.taskdata import TaskData
+from lib.previewrenderer import PreviewRenderer
+from lib.framecache import FrameCache
+from lib import levelling
+from lib.framestore import FrameStore
+from lib.batchprocessor import load_topography
+
+class PreviewSignals(QObject):
+    """
+        Defines the signals available from a running preview worker.
+
+        Attributes:
+            finished: Signal emitted with the rendered pyramid, a list of QImages largest first, and the TaskData that
+            acquired it.
+            error: Signal emitted with (exception type, exception, traceback) if the preview could not be made.
+    """
+
+    finished = Signal(list, object)
+    error = Signal(tuple)
+
+class PreviewWorker(QRunnable):
+    """
+        Worker thread for image previews.
+
+        This class loads an '.sm4' file, levels its forward topography and renders it into a level-of-detail
+        pyramid of QImages with a PreviewRenderer, all off the GUI thread. Only the QImages are handed back; turning them
+        into pixmaps in the scan area is left to the GUI thread, since QPixmap may only be used there.
+
+        The levelled topography and the rendered pyramid are kept in a FrameCache, so showing a frame again does not load
+        or level it again.
+
+        Attributes:
+            fname (str): The path of the image file.
+            task (TaskData): The task that acquired the image.
+            renderer (PreviewRenderer): The renderer turning the topography into QImages.
+            cache (FrameCache): The cache of levelled topographies and rendered pyramids, or None.
+            store (FrameStore): The session store the levelled channels are appended to, or None.
+            load_topography (Callable[[str], np.ndarray]): Loads the topography channels of the image file.
+            signals (PreviewSignals): A QObject that defines signals to communicate with the main thread.
+
+        Methods:
+            run(): The main method of the worker thread that makes the preview.
+            render() -> List[QImage]: Renders the levelled topography of the file into a pyramid.
+            load(fname: str) -> np.ndarray: Loads the levelled forward topography of an '.sm4' file.
+            meta(fname: str) -> dict: The metadata stored with the frame of a file.
+    """
+
+    _recipe = ('align', 'plane', 'align')
+
+    def __init__(self, fname: str, task: TaskData, renderer: PreviewRenderer, cache: FrameCache = None,
+                 store: FrameStore = None, load_topography: Callable[[str], np.ndarray] = load_topography):
+        """
+            Initializes the PreviewWorker.
+
+            Args:
+                fname (str): The path of the image file.
+                task (TaskData): The task that acquired the image.
+                renderer (PreviewRenderer): The renderer turning the topography into QImages.
+                cache (FrameCache): The cache of levelled topographies and rendered pyramids. Default is None, which
+                caches nothing.
+                store (FrameStore): The session store the levelled channels are appended to. Default is None, which
+                stores nothing.
+                load_topography (Callable[[str], np.ndarray]): Loads the topography channels of the image file. Default
+                is 'batchprocessor.load_topography', for '.sm4' files.
+        """
+        super().__init__()
+        self.fname = fname
+        self.task = task
+        self.renderer = renderer
+        self.cache = cache
+        self.store = store
+        self.load_topography = load_topography
+        self.signals = PreviewSignals()
+
+    @Slot()
+    def run(self) -> None:
+        """
+            Makes the preview and emits it through 'finished'.
+
+            Nothing is emitted if the file holds no topography, e.g. a current image. Any failure is emitted through
+            'error'.
+        """
+        try:
+            if self.cache is None:
+                pyramid = self.render()
+            else:
+                recipe = ('pyramid', self.renderer.resolution, PreviewWorker._recipe)
+                pyramid = self.cache.get_or_compute(self.fname, recipe, self.render)
+            if pyramid is None:
+                return
+        except Exception as e:
+            self.signals.error.emit((type(e), e, traceback.format_exc()))
+            return
+
+        self.signals.finished.emit(pyramid, self.task)
+
+    def render(self) -> List[QImage]:
+        """
+            Renders the levelled topography of the file into a level-of-detail pyramid, using the cached topography if
+            any.
+
+            Returns:
+                List[QImage]: The levels of the pyramid, largest first, or None if the file holds no topography.
+        """
+        if self.cache is None:
+            nd_img = self.load(self.fname)
+        else:
+            nd_img = self.cache.get_or_compute(self.fname, PreviewWorker._recipe, lambda: self.load(self.fname))
+        return self.renderer.render_pyramid(nd_img) if nd_img is not None else None
+
+    def load(self, fname: str) -> np.ndarray:
+        """
+            Loads the levelled forward topography of an '.sm4' file.
+
+            If the frame store already holds the file, the topography is mapped from it. Otherwise the file is loaded
+            and its topography channels levelled together, and appended to the store along with the task parameters.
+
+            Args:
+                fname (str): The path of the file.
+
+            Returns:
+                np.ndarray: The levelled forward topography, or None if the file holds no topography.
+        """
+        if self.store is not None and (i := self.store.find(fname)) is not None:
+            return self.store.frame(i)[0]
+        try:
+            frames = levelling.level(self.load_topography(fname), PreviewWorker._recipe)
+        except ValueError:
+            return None
+        if self.store is not None:
+            self.store.append(frames, self.meta(fname))
+        return frames[0]
+
+    def meta(self, fname: str) -> dict:
+        """
+            The metadata stored with the frame of a file.
+
+            Args:
+                fname (str): The path of the file.
+
+            Returns:
+                dict: The path of the file, the levelling recipe, and the index and image parameters of the task.
+        """
+        meta = {'fname': fname, 'recipe': list(PreviewWorker._recipe), 'index': self.task.index}
+        inner = self.task.inner
+        for name in ('size', 'x_offset', 'y_offset', 'bias', 'set_point', 'line_time'):
+            if hasattr(inner, name):
+                meta[name] = getattr(inner, name).to_float()
+        for name in ('lines_per_frame', 'repetitions'):
+            if hasattr(inner, name):
+                meta[name] = int(getattr(inner, name))
+        return meta
@@ -0,0 +1,153 @@
+import os, time
+from typing import Callable
+
+from PySide6.QtCore import *
+
+class SaveWatcher(QObject):
+    """
+        Watches the save directory of the STM device and reports new '.sm4' files once they are completely written.
+
+        The directory is watched with a QFileSystemWatcher. If the directory cannot be watched, or 'polling' is set for
+        file systems that do not report changes (e.g. network shares), it is listed on a timer instead. Either way the
+        watcher keeps an index of the files it has seen, so a change only costs a directory listing and a stat of the
+        new files rather than a stat of every file.
+
+        New files are checked every '_settle_interval' milliseconds. A new file is considered complete once its size and
+        modification time have stayed the same and non-zero for 'settle_time' milliseconds, so a writer pausing for a
+        shorter time between rows is waited for, and once 'complete' accepts it, e.g. because it has the size given by
+        its header. A file that never passes 'complete' is never reported.
+
+        Attributes:
+            file_ready: Signal emitted with the path of a new, completely written '.sm4' file.
+            path (str): The watched directory, or None.
+            known (dict): The (size, modification time) of every file seen in the directory, keyed by path.
+            polling (bool): Whether the directory is listed on a timer instead of watched.
+            settle_time (int): How long a new file must stay unchanged before it is reported, in milliseconds.
+            complete (Callable[[str], bool]): Tells whether a file that stopped changing is completely written, or None
+            to only rely on 'settle_time'.
+
+        Methods:
+            watch(path: str, since: float): Starts watching a directory.
+            scan(): Lists the watched directory and picks up new files.
+            settle(): Checks whether new files have finished being written.
+    """
+
+    file_ready = Signal(str)
+
+    _extension = '.sm4'
+    _poll_interval = 1000
+    _settle_interval = 250
+
+    def __init__(self, polling: bool = False, settle_time: int = 1000, complete: Callable[[str], bool] = None,
+                 *args, **kwargs):
+        """
+            Initializes the SaveWatcher.
+
+            Args:
+                polling (bool): Whether to list the directory on a timer instead of watching it. Default is False.
+                settle_time (int): How long a new file must stay unchanged before it is reported, in milliseconds.
+                Default is 1000.
+                complete (Callable[[str], bool]): Tells whether a file that stopped changing is completely written.
+                Default is None, which takes every such file as complete.
+        """
+        super().__init__(*args, **kwargs)
+        self.path = None
+        self.known = dict()
+        self.polling = polling
+        self.settle_time = settle_time
+        self.complete = complete
+        self._pending = dict()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.scan)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(SaveWatcher._poll_interval)
+        self._poll_timer.timeout.connect(self.scan)
+
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setInterval(SaveWatcher._settle_interval)
+        self._settle_timer.timeout.connect(self.settle)
+
+    def watch(self, path: str, since: float = None):
+        """
+            Starts watching a directory. Watching the directory already watched has no effect.
+
+            Files already in the directory are indexed as known, except those modified at or after 'since', which are
+            reported like new files once they are complete.
+
+            Args:
+                path (str): The directory to watch.
+                since (float): The time from which existing files count as new. Default is None, which counts no
+                existing file as new.
+        """
+        path = os.path.normpath(path)
+        if path == self.path:
+            return
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        self.path = path
+        self.known = dict()
+        self._pending = dict()
+
+        for entry in self._entries():
+            stat = entry.stat()
+            if since is not None and stat.st_mtime >= since:
+                self._pending[entry.path] = (None, time.monotonic())
+            else:
+                self.known[entry.path] = (stat.st_size, stat.st_mtime)
+
+        if self.polling or not self._watcher.addPath(path):
+            self._poll_timer.start()
+        else:
+            self._poll_timer.stop()
+        if self._pending:
+            self._settle_timer.start()
+
+    def _entries(self):
+        """
+            Lists the '.sm4' files in the watched directory.
+
+            Returns:
+                list: The os.DirEntry of every '.sm4' file, or an empty list if the directory cannot be read.
+        """
+        try:
+            with os.scandir(self.path) as it:
+                return [entry for entry in it if entry.name.lower().endswith(SaveWatcher._extension) and entry.is_file()]
+        except OSError as e:
+            print(e)
+            return list()
+
+    def scan(self):
+        """
+            Lists the watched directory and starts settling the files that are not in the index yet.
+        """
+        if self.path is None:
+            return
+        for entry in self._entries():
+            if entry.path not in self.known and entry.path not in self._pending:
+                self._pending[entry.path] = (None, time.monotonic())
+        if self._pending and not self._settle_timer.isActive():
+            self._settle_timer.start()
+
+    def settle(self):
+        """
+            Checks the files being written and reports those that have stopped changing for 'settle_time' and are
+            complete.
+        """
+        now = time.monotonic()
+        for (path, (last, changed)) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (stat.st_size, stat.st_mtime)
+            if current != last or stat.st_size == 0:
+                self._pending[path] = (current, now)
+            elif (now - changed) * 1000 >= self.settle_time and (self.complete is None or self.complete(path)):
+                del self._pending[path]
+                self.known[path] = current
+                self.file_ready.emit(path)
+        if not self._pending:
+            self._settle_timer.stop()
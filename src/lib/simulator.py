@@ -0,0 +1,431 @@
+import os, sys, json, math, time, random, struct, argparse, threading, socketserver
+import numpy as np
+from array import array
+from dataclasses import dataclass, field, asdict
+from typing import Callable
+
+@dataclass
+class SimulatorConfig:
+    """
+    Timing and fault settings for the STM controller simulator.
+
+    Attributes:
+        latency (float): The time in seconds before each reply is sent.
+        jitter (float): The maximum random deviation in seconds added to 'latency'.
+        drop_rate (float): The probability that the connection is closed instead of replying to a command.
+        split_rate (float): The probability that a reply is sent in two packets.
+        merge_rate (float): The probability that replies to commands received together are sent in one packet.
+        split_delay (float): The time in seconds between the two packets of a split reply.
+        procedure_time (float): The fixed duration in seconds of every procedure, or None to derive it from the scan
+            settings as 2 * line time * lines per frame * scan count * 'time_scale'.
+        time_scale (float): The factor applied to the scan time when 'procedure_time' is None.
+        max_pixels (int): The largest number of pixels per side written to a synthetic image.
+        procedure_replies (str): How StartProcedure is answered: 'finished' replies once, when the procedure has
+            finished; 'started' replies once, as soon as it has started, and runs it in the background; 'both'
+            acknowledges it when it starts and replies again when it has finished.
+        save_path (str): The initial save path reported to clients and used for synthetic images.
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    drop_rate: float = 0.0
+    split_rate: float = 0.0
+    merge_rate: float = 0.0
+    split_delay: float = 0.001
+    procedure_time: float = None
+    time_scale: float = 0.01
+    max_pixels: int = 512
+    procedure_replies: str = 'finished'
+    save_path: str = field(default_factory=lambda: os.path.join(os.getcwd(), 'sim_data'))
+
+class SimulatorHandler(socketserver.BaseRequestHandler):
+    """
+    Serves one client connection of the STM controller simulator.
+
+    Commands are split on newlines. All commands that arrived together are answered before more input is read, which
+    allows replies to be merged into a single packet.
+    """
+
+    def handle(self):
+        """
+        Reads commands from the client and answers them until the client or a simulated fault closes the connection.
+        """
+        server: STMSimulator = self.server
+        server.connections += 1
+        config = server.config
+        rx = bytearray()
+        while True:
+            try:
+                chunk = self.request.recv(4096)
+            except OSError:
+                return
+            if not chunk:
+                return
+            rx += chunk
+
+            replies = list()
+
+            def acknowledge(reply: str):
+                # Replies already due go out first, then the acknowledgement, before the procedure runs
+                replies.append((reply + '\n').encode())
+                self.send_replies(replies)
+                replies.clear()
+
+            try:
+                while (end := rx.find(b'\n')) >= 0:
+                    line = bytes(rx[:end]).decode().strip()
+                    del rx[:end + 1]
+                    if not line:
+                        continue
+                    if random.random() < config.drop_rate:
+                        self.request.close()
+                        return
+                    self.delay()
+                    replies.append((server.execute(line, acknowledge) + '\n').encode())
+                self.send_replies(replies)
+            except OSError:
+                return
+
+    def send_replies(self, replies: list):
+        """
+        Sends replies, merged into one packet with the configured probability.
+
+        Args:
+            replies (list): The encoded replies, in order.
+        """
+        if len(replies) > 1 and random.random() < self.server.config.merge_rate:
+            self.request.sendall(b''.join(replies))
+        else:
+            for reply in replies:
+                self.reply(reply)
+
+    def delay(self):
+        """
+        Waits for the configured latency, with random jitter.
+        """
+        config = self.server.config
+        wait = config.latency + random.uniform(-config.jitter, config.jitter)
+        if wait > 0:
+            time.sleep(wait)
+
+    def reply(self, data: bytes):
+        """
+        Sends a reply, split into two packets with the configured probability.
+
+        Args:
+            data (bytes): The encoded reply.
+        """
+        config = self.server.config
+        if len(data) > 1 and random.random() < config.split_rate:
+            cut = random.randint(1, len(data) - 1)
+            self.request.sendall(data[:cut])
+            time.sleep(config.split_delay)
+            self.request.sendall(data[cut:])
+        else:
+            self.request.sendall(data)
+
+class STMSimulator(socketserver.ThreadingTCPServer):
+    """
+    A local stand-in for the STM controller that speaks the line protocol of 'stm_commands.json'.
+
+    The simulator understands SetSWParameter, SetSWSubItemParameter, GetSWSubItemParameter and StartProcedure. Set
+    parameters are remembered and reported back by GetSWSubItemParameter. StartProcedure writes a synthetic image to the
+    save path over the procedure time, and is answered as set by 'SimulatorConfig.procedure_replies'; procedures never
+    overlap. Latency, jitter, dropped connections, split and merged replies and procedure durations are set through a
+    SimulatorConfig.
+
+    Synthetic images are written with the '.sm4' extension but are not RHK files. They hold a header identifying the
+    format, see 'read_image', followed by the topography as little-endian float32 rows.
+
+    Attributes:
+        config (SimulatorConfig): The timing and fault settings.
+        parameters (dict): The parameters set by clients, keyed by the comma separated parameter path.
+        connections (int): The number of connections accepted so far.
+        commands (int): The number of commands answered so far.
+        images (int): The number of synthetic images written so far.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+    magic = b'PYXMSIM1'
+
+    def __init__(self, ip: str = '127.0.0.1', port: int = 12600, config: SimulatorConfig = None):
+        """
+        Initializes the simulator and binds its socket. Call 'serve_forever' or 'start' to accept connections.
+
+        Args:
+            ip (str): The address to listen on. Default is '127.0.0.1'.
+            port (int): The port to listen on, or 0 to pick a free one. Default is 12600.
+            config (SimulatorConfig): The timing and fault settings. Defaults to a SimulatorConfig without faults.
+        """
+        super().__init__((ip, port), SimulatorHandler)
+        self.config = config if config is not None else SimulatorConfig()
+        self.parameters = {'Scan Area Window, MeasureSave, Save Path': self.config.save_path}
+        self.connections = 0
+        self.commands = 0
+        self.images = 0
+        self._lock = threading.Lock()
+        self._procedure_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        """
+        The port the simulator listens on.
+
+        Returns:
+            int: The port number.
+        """
+        return self.server_address[1]
+
+    def start(self) -> 'STMSimulator':
+        """
+        Serves connections from a background thread.
+
+        Returns:
+            STMSimulator: This simulator.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name='STMSimulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving connections and closes the listening socket.
+        """
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def execute(self, line: str, acknowledge: Callable[[str], None] = None) -> str:
+        """
+        Executes one command.
+
+        Args:
+            line (str): The command without its line terminator.
+            acknowledge (Callable[[str], None]): Sends the acknowledgement of a procedure as soon as it starts. Default is
+            None, which sends none.
+
+        Returns:
+            str: The reply to the command. For a procedure, the reply sent once it has finished, or once it has started
+            if 'procedure_replies' is 'started'.
+        """
+        (name, *args) = [arg.strip() for arg in line.split(',')]
+        with self._lock:
+            self.commands += 1
+        match name:
+            case 'SetSWParameter' | 'SetSWSubItemParameter':
+                if len(args) < 2:
+                    return f'ERROR: {name} needs a parameter and a value'
+                with self._lock:
+                    self.parameters[', '.join(args[:-1])] = args[-1]
+                return 'Done'
+            case 'GetSWSubItemParameter':
+                key = ', '.join(args)
+                with self._lock:
+                    if key not in self.parameters:
+                        return f'ERROR: unknown parameter {key}'
+                    return self.parameters[key]
+            case 'StartProcedure':
+                if not args:
+                    return 'ERROR: StartProcedure needs a procedure name'
+                match self.config.procedure_replies:
+                    case 'started':
+                        threading.Thread(target=self.run_procedure, args=(args[0],), daemon=True).start()
+                        return 'Started'
+                    case 'both' if acknowledge is not None:
+                        acknowledge('Started')
+                self.run_procedure(args[0])
+                return 'Done'
+            case _:
+                return f'ERROR: unknown command {name}'
+
+    def parameter(self, key: str, default: float) -> float:
+        """
+        Looks up a numeric parameter set by a client.
+
+        Args:
+            key (str): The comma separated parameter path, without the command name.
+            default (float): The value returned if the parameter was never set or is not a number.
+
+        Returns:
+            float: The value of the parameter.
+        """
+        with self._lock:
+            try:
+                return float(self.parameters[key])
+            except (KeyError, ValueError):
+                return default
+
+    def procedure_time(self) -> float:
+        """
+        The duration of the next procedure.
+
+        Returns:
+            float: The duration in seconds.
+        """
+        if self.config.procedure_time is not None:
+            return self.config.procedure_time
+        line_time = self.parameter('Scan Area Window, Line Time', 1.0)
+        lines = self.parameter('Scan Area Window, Scan Settings, Lines Per Frame', 256)
+        count = self.parameter('Scan Area Window, Scan Settings, Scan Count', 1)
+        return 2 * line_time * lines * count * self.config.time_scale
+
+    def run_procedure(self, name: str):
+        """
+        Simulates a procedure, writing a synthetic image row by row over the procedure time. A procedure started while
+        another one runs waits for it to finish.
+
+        Args:
+            name (str): The name of the procedure.
+        """
+        with self._procedure_lock:
+            self._run_procedure(name)
+
+    def _run_procedure(self, name: str):
+        """
+        Writes the synthetic image of a procedure, see 'run_procedure'.
+
+        Args:
+            name (str): The name of the procedure.
+        """
+        duration = self.procedure_time()
+        pixels = int(min(self.parameter('Scan Area Window, Scan Settings, Lines Per Frame', 256), self.config.max_pixels))
+        with self._lock:
+            self.images += 1
+            index = self.images
+            save_path = self.parameters['Scan Area Window, MeasureSave, Save Path']
+            header = {'procedure': name, 'index': index, 'width': pixels, 'height': pixels,
+                      'parameters': dict(self.parameters)}
+
+        os.makedirs(save_path, exist_ok=True)
+        fname = os.path.join(save_path, f'sim_{os.getpid()}_{index:05d}.sm4')
+        (tilt_x, tilt_y) = (random.uniform(-1, 1), random.uniform(-1, 1))
+        start = time.monotonic()
+        with open(fname, 'wb') as f:
+            meta = json.dumps(header).encode()
+            f.write(STMSimulator.magic + struct.pack('<I', len(meta)) + meta)
+            for row in range(pixels):
+                values = array('f', (1e-9 * (tilt_x * col / pixels + tilt_y * row / pixels
+                                             + 0.1 * math.sin(col / 4) * math.cos(row / 4)
+                                             + 0.02 * random.random()) for col in range(pixels)))
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                f.write(values.tobytes())
+                f.flush()
+                wait = start + duration * (row + 1) / pixels - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+    @staticmethod
+    def read_image(fname: str) -> tuple:
+        """
+        Reads a synthetic image written by the simulator.
+
+        Args:
+            fname (str): The path of the image.
+
+        Returns:
+            tuple: The header as a dict and the topography in metres as a list of rows.
+
+        Raises:
+            ValueError: If the file was not written by the simulator.
+        """
+        with open(fname, 'rb') as f:
+            if f.read(len(STMSimulator.magic)) != STMSimulator.magic:
+                raise ValueError(f'{fname} is not a simulator image')
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+            values = array('f')
+            values.frombytes(f.read())
+        if sys.byteorder != 'little':
+            values.byteswap()
+        width = header['width']
+        return header, [values[i:i + width] for i in range(0, len(values), width)]
+
+    @staticmethod
+    def expected_size(fname: str) -> int:
+        """
+        Reads the size a synthetic image written by the simulator has once it is completely written.
+
+        Args:
+            fname (str): The path of the image.
+
+        Returns:
+            int: The size of the complete file in bytes.
+
+        Raises:
+            ValueError: If the file was not written by the simulator or its header is not completely written yet.
+        """
+        with open(fname, 'rb') as f:
+            if f.read(len(STMSimulator.magic)) != STMSimulator.magic:
+                raise ValueError(f'{fname} is not a simulator image')
+            prefix = f.read(4)
+            if len(prefix) < 4:
+                raise ValueError(f'the header of {fname} is incomplete')
+            (length,) = struct.unpack('<I', prefix)
+            header = json.loads(f.read(length))
+        return len(STMSimulator.magic) + 4 + length + 4 * header['width'] * header['height']
+
+    @staticmethod
+    def load_topography(fname: str) -> np.ndarray:
+        """
+        Loads the topography of a synthetic image, in place of the '.sm4' loader of pyxm, e.g. to preview or reprocess
+        the images of the simulator.
+
+        Args:
+            fname (str): The path of the image.
+
+        Returns:
+            np.ndarray: The topography as a float32 array of shape (1, lines, pixels).
+
+        Raises:
+            ValueError: If the file was not written by the simulator.
+        """
+        (_, rows) = STMSimulator.read_image(fname)
+        return np.ascontiguousarray(np.array(rows, dtype=np.float32)[np.newaxis])
+
+    @staticmethod
+    def image_complete(fname: str) -> bool:
+        """
+        Tells whether a synthetic image is completely written, i.e. has the size given by its header.
+
+        Args:
+            fname (str): The path of the image.
+
+        Returns:
+            bool: Whether the image is complete. False if it is not a synthetic image or cannot be read.
+        """
+        try:
+            return os.path.getsize(fname) >= STMSimulator.expected_size(fname)
+        except (OSError, ValueError):
+            return False
+
+def main(argv: list = None):
+    """
+    Runs the simulator from the command line until interrupted.
+
+    Args:
+        argv (list): The command line arguments. Defaults to 'sys.argv'.
+    """
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description='Local STM controller simulator for pyxm.')
+    parser.add_argument('--ip', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12600)
+    for (name, value) in asdict(defaults).items():
+        kind = type(value) if value is not None else float
+        parser.add_argument(f'--{name.replace("_", "-")}', type=kind, default=value)
+    args = parser.parse_args(argv)
+
+    config = SimulatorConfig(**{name: getattr(args, name) for name in asdict(defaults)})
+    server = STMSimulator(args.ip, args.port, config)
+    print(f'STM simulator listening on {args.ip}:{server.port} with {config}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,60 @@
 import time, os
 import socket
+import selectors
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
 
 from core.vector2 import Vector2
+from core.procedureresult import ProcedureResult
+
+class STMError(Exception):
+    """
+    Raised when the STM device rejects a command or returns a reply that cannot be used.
+
+    Attributes:
+        command (str): The command that failed.
+        reply (str): The reply received from the STM device.
+        detail (str): A description of what went wrong.
+        index (int): The position of the command within a batch, or None for a single command.
+    """
+
+    def __init__(self, command: str, reply: str, detail: str = None):
+        """
+        Initializes the STMError.
+
+        Args:
+            command (str): The command that failed.
+            reply (str): The reply received from the STM device.
+            detail (str): A description of what went wrong. Defaults to the reply itself.
+        """
+        self.command = command.strip()
+        self.reply = reply
+        self.detail = detail if detail is not None else reply
+        self.index = None
+        super().__init__(f'{self.command!r}: {self.detail}')
+
+class STMBatchError(STMError):
+    """
+    Raised when one or more commands of a batch failed.
+
+    Attributes:
+        results (list): The converted replies of the batch, with None in place of every failed command.
+        failures (List[STMError]): The errors of the failed commands, in batch order.
+    """
+
+    def __init__(self, results: list, failures: List[STMError]):
+        """
+        Initializes the STMBatchError.
+
+        Args:
+            results (list): The converted replies of the batch, with None in place of every failed command.
+            failures (List[STMError]): The errors of the failed commands, in batch order.
+        """
+        self.results = results
+        self.failures = failures
+        Exception.__init__(self, f'{len(failures)} of {len(results)} commands failed: ' + '; '.join(str(e) for e in failures))
 
 class STM():
     """
@@ -10,18 +63,45 @@ class STM():
     This class provides an interface to control an STM device over a TCP/IP connection.
     It allows communication with the STM device to execute various procedures and set parameters.
 
+    Parameter setters skip writes of values the STM device has already confirmed, see 'state' and 'refresh'.
+
+    By default every command opens and closes its own socket. In persistent mode a single socket is kept open
+    between commands and is only re-established, with exponential backoff, when the controller drops it.
+
     Attributes:
         _buffer_size (int): The buffer size used for receiving data from the STM device over the socket.
+        _terminator (bytes): The line terminator that ends every command and every reply.
+        _error_prefix (str): Replies starting with this prefix, in any case, are treated as failed commands.
+        _connect_delay (float): Delay in seconds after connecting before a command is sent in per-command mode.
+        _max_retries (int): The number of reconnect attempts made in persistent mode before giving up.
+        _backoff (float): The initial delay in seconds between reconnect attempts.
+        _max_backoff (float): The upper limit in seconds for the delay between reconnect attempts.
+        _timeout (float): The time in seconds to wait for the reply to a command, procedures excepted.
+        _default_commands (dict): The commands used for parameters missing from the loaded command table.
+        _completions (tuple): The ways the end of a procedure can be detected, see 'start_procedure'.
         ip (str): The IP address of the STM device.
         port (int): The port number for the TCP/IP connection to the STM device.
+        commands (SimpleNamespace): The command table loaded from 'stm_commands.json', if any.
+        persistent (bool): Whether the socket is kept open between commands.
+        paused (bool): Flag set by the UI when task execution is paused.
+        stopped (bool): Flag set by the UI when task execution is stopped.
+        state (dict): Mirror of the last value the STM device confirmed for each parameter, keyed by command name.
         socket (socket.socket): The socket object used for communication with the STM device.
 
     Methods:
-        __init__(self, ip: str = '127.0.0.1', port: int = 12600): Initializes the STM instance.
+        __init__(self, ip: str = '127.0.0.1', port: int = 12600, commands: SimpleNamespace = None, persistent: bool = False): Initializes the STM instance.
         connect(self): Establishes a TCP/IP connection with the STM device.
         drop(self): Closes the TCP/IP connection with the STM device.
+        reconnect(self): Re-establishes a dropped connection, backing off between attempts.
+        session(self): Context manager that keeps one connection open for its duration.
+        refresh(self): Invalidates the mirror of confirmed parameter values.
+        command(self, key: str): Looks up the command prefix for a parameter.
+        set_params(self, params: List[Tuple[str, object]]): Sets several parameters in one batch, skipping unchanged ones.
+        batch(self): Context manager that sends the commands issued inside it in a single round trip.
         send(self, msg: str, out_dtype: type = str): Sends a message to the STM device and receives the response.
-        start_procedure(self, procedure_name: str): Starts an STM procedure by its name.
+        send_many(self, msgs: List[Tuple[str, type]]): Sends several messages at once and collects their responses.
+        read_reply(self, timeout: float = None): Reads the next complete reply from the STM device.
+        start_procedure(self, procedure_name: str, timeout: float = None): Starts an STM procedure and waits for it to finish.
         set_bias(self, bias: float): Sets the STM bias value.
         set_setpoint(self, setpoint: float): Sets the STM set point value.
         set_scan_size(self, size: float): Sets the scan area size.
@@ -32,34 +112,251 @@ class STM():
         get_save_path(self): Retrieves the save path for the measurement data from the STM device.
     """
 
-    _buffer_size = 1024
-
-    def __init__(self, ip: str = '127.0.0.1', port: int = 12600):
+    _buffer_size = 4096
+    _terminator = b'\n'
+    _error_prefix = 'ERROR'
+    _connect_delay = 0.1
+    _max_retries = 5
+    _backoff = 0.1
+    _max_backoff = 2.0
+    _timeout = 10.0
+    _default_commands = {
+        'start_scan_of_type': 'StartProcedure, ',
+        'set_bias': 'SetSWParameter, STM Bias, Value, ',
+        'set_setpoint': 'SetSWParameter, STM Set Point, Value, ',
+        'set_scan_size': 'SetSWParameter, Scan Area Window, Scan Area Size, ',
+        'set_scan_pos_x': 'SetSWParameter, Scan Area Window, X Offset, ',
+        'set_scan_pos_y': 'SetSWParameter, Scan Area Window, Y Offset, ',
+        'set_line_time': 'SetSWParameter, Scan Area Window, Line Time, ',
+        'set_resolution': 'SetSWParameter, Scan Area Window, Scan Settings, Lines Per Frame, ',
+        'set_scan_count': 'SetSWSubItemParameter, Scan Area Window, Scan Settings, Scan Count, ',
+        'get_save_path': 'GetSWSubItemParameter, Scan Area Window, MeasureSave, Save Path\n',
+        'procedure_completion': 'acknowledgement',
+    }
+    _completions = ('acknowledgement', 'reply')
+
+    def __init__(self, ip: str = '127.0.0.1', port: int = 12600, commands: SimpleNamespace = None, persistent: bool = False):
         """
         Initializes the STM instance.
 
         Args:
             ip (str): The IP address of the STM device. Default is '127.0.0.1'.
             port (int): The port number for the TCP/IP connection to the STM device. Default is 12600.
+            commands (SimpleNamespace): The command table loaded from 'stm_commands.json'. Default is None.
+            persistent (bool): Keep one socket open between commands instead of connecting per command. Default is False.
         """
         self.ip = ip
         self.port = port
+        self.commands = commands
+        self.persistent = persistent
+        self.paused = False
+        self.stopped = False
         self.socket = None
+        self._rx = bytearray()
+        self._batch = None
+        self._batch_params = None
+        self.state = dict()
+        self._lock = threading.RLock()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Whether a socket to the STM device is currently open.
+
+        Returns:
+            bool: True if a socket is open, False otherwise.
+        """
+        return self.socket is not None
 
     def connect(self):
         """
         Establishes a TCP/IP connection with the STM device.
         """
+        self._rx.clear()
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.socket.connect((self.ip, self.port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         self.socket.setblocking(True)
 
     def drop(self):
         """
         Closes the TCP/IP connection with the STM device.
         """
-        self.socket.close()
+        if self.socket is not None:
+            self.socket.close()
         self.socket = None
+        self._rx.clear()
+
+    def reconnect(self):
+        """
+        Re-establishes the TCP/IP connection with the STM device.
+
+        The connection is retried up to '_max_retries' times, doubling the delay between attempts from '_backoff'
+        up to '_max_backoff' seconds.
+
+        The parameter mirror is invalidated, since the controller may have changed while it was unreachable.
+
+        Raises:
+            OSError: If the STM device cannot be reached after all attempts.
+        """
+        self.drop()
+        self.refresh()
+        delay = STM._backoff
+        for attempt in range(STM._max_retries):
+            try:
+                self.connect()
+                return
+            except OSError:
+                self.drop()
+                if attempt == STM._max_retries - 1:
+                    raise
+                time.sleep(delay)
+                delay = min(2 * delay, STM._max_backoff)
+
+    @contextmanager
+    def session(self):
+        """
+        Keeps a single connection to the STM device open for the duration of the 'with' block.
+
+        The previous connection mode is restored and the socket is closed when the block exits.
+
+        Yields:
+            STM: This STM instance.
+        """
+        persistent = self.persistent
+        self.persistent = True
+        try:
+            yield self
+        finally:
+            self.persistent = persistent
+            with self._lock:
+                self.drop()
+
+    def refresh(self):
+        """
+        Invalidates the mirror of parameter values last confirmed by the STM device.
+
+        Call this whenever the controller may have been changed by something other than this instance, e.g. by hand
+        in the controller software. The next setter call for every parameter is then sent again.
+        """
+        with self._lock:
+            self.state.clear()
+
+    def command(self, key: str) -> str:
+        """
+        Looks up the command prefix for a parameter.
+
+        Args:
+            key (str): The name of the command, as used in 'stm_commands.json'.
+
+        Returns:
+            str: The command from the loaded command table, or the built-in default if it is not listed there.
+        """
+        return getattr(self.commands, key, STM._default_commands[key])
+
+    def _set(self, key: str, value):
+        """
+        Sets a parameter on the STM device unless the mirror shows it already has this value.
+
+        Args:
+            key (str): The name of the command setting the parameter, as used in 'stm_commands.json'.
+            value: The value to be set.
+
+        Returns:
+            str: The response from the STM device, or None if the write was skipped or queued by an active 'batch'.
+        """
+        with self._lock:
+            if key in self.state and self.state[key] == value:
+                return None
+
+            msg = f'{self.command(key)}{value}\n'
+            if self._batch is not None:
+                self._batch.append((msg, str))
+                self._batch_params.append((key, value))
+                return None
+
+            try:
+                reply = self.send(msg)
+            except:
+                self.state.pop(key, None)
+                raise
+            self.state[key] = value
+            return reply
+
+    def set_params(self, params: List[Tuple[str, object]]) -> list:
+        """
+        Sets several parameters on the STM device in one batch.
+
+        Parameters the mirror shows the STM device already has are skipped; if none are left nothing is sent.
+
+        Args:
+            params (List[Tuple[str, object]]): The value of every parameter, keyed by its command name in 'stm_commands.json'.
+
+        Returns:
+            list: The responses from the STM device to the parameters that were sent.
+
+        Raises:
+            STMBatchError: If one or more of the parameters could not be set.
+        """
+        with self.batch() as results:
+            for (key, value) in params:
+                self._set(key, value)
+        return results
+
+    def _confirm(self, params: list, failed: set = frozenset()):
+        """
+        Records the parameter values of a sent batch in the mirror.
+
+        Args:
+            params (list): The (key, value) pair of every batched command, or None for commands that set no parameter.
+            failed (set): The batch indices of commands that failed. Their parameters are removed from the mirror.
+        """
+        for (i, param) in enumerate(params):
+            if param is None:
+                continue
+            (key, value) = param
+            if i in failed:
+                self.state.pop(key, None)
+            else:
+                self.state[key] = value
+
+    @contextmanager
+    def batch(self):
+        """
+        Collects the commands sent inside the 'with' block and sends them to the STM device in one go.
+
+        While the block is active 'send' only queues its message and returns None. When the block exits the queued
+        commands are written back to back and their replies are collected and checked together, see 'send_many'.
+        The yielded list is filled with the converted replies once the batch has been sent.
+
+        Yields:
+            list: The replies of the batched commands, in the order they were queued.
+
+        Raises:
+            STMBatchError: If one or more of the batched commands failed.
+        """
+        with self._lock:
+            self._batch = list()
+            self._batch_params = list()
+            results = list()
+            try:
+                yield results
+                (queued, params) = (self._batch, self._batch_params)
+            finally:
+                self._batch = None
+                self._batch_params = None
+            if not queued:
+                return
+
+            try:
+                results.extend(self.send_many(queued))
+            except STMBatchError as e:
+                self._confirm(params, failed={failure.index for failure in e.failures})
+                raise
+            except:
+                self.state.clear()
+                raise
+            self._confirm(params)
 
     def send(self, msg: str, out_dtype: type = str):
         """
@@ -70,21 +367,219 @@ class STM():
             out_dtype (type): The data type of the expected output. Default is 'str'.
 
         Returns:
-            out_dtype: The response from the STM device with the specified data type.
+            out_dtype: The response from the STM device with the specified data type, or None if the message was
+            queued by an active 'batch'.
+
+        Raises:
+            STMError: If the STM device reported an error, did not reply within '_timeout' seconds or the reply could
+            not be converted to 'out_dtype'.
+
+        Note:
+            In persistent mode a connection found dead before the command was written is re-established and the
+            command is sent on the new one. Once the command has been written it is never sent again, see '_transact'.
+        """
+        with self._lock:
+            if self._batch is not None:
+                self._batch.append((msg, out_dtype))
+                self._batch_params.append(None)
+                return None
+            return self._transact([msg], lambda: self._convert(msg, self.read_reply(STM._timeout), out_dtype))
+
+    def send_many(self, msgs: List[Tuple[str, type]]) -> list:
+        """
+        Sends several messages to the STM device in one write and collects their responses.
+
+        All messages are written before any reply is read, so the whole batch costs a single round trip. Every
+        reply is checked, and a failure in one command does not stop the remaining replies from being read.
+
+        Args:
+            msgs (List[Tuple[str, type]]): The messages to be sent, each paired with the data type of its expected output.
+
+        Returns:
+            list: The responses from the STM device, in the order the messages were given.
+
+        Raises:
+            STMBatchError: If one or more commands failed. The error holds the per-command details.
+            STMError: If the STM device did not reply within '_timeout' seconds.
+        """
+        with self._lock:
+            return self._transact([msg for (msg, _) in msgs], lambda: self._read_many(msgs))
+
+    def _transact(self, msgs: List[str], read: Callable):
+        """
+        Writes messages to the STM device using the current connection mode and reads their replies.
+
+        In per-command mode a socket is opened for the exchange and closed afterwards. In persistent mode the open
+        socket is reused. Replies left unread on it are discarded first, and if this finds the connection closed by
+        the controller, or the write fails outright, it is re-established and the messages are written once more.
+        Nothing has reached the controller in these cases.
+
+        Once the messages have been written they are never sent again, since the controller may already have run
+        them. If the replies do not arrive the connection is closed instead, so a late reply cannot be taken for the
+        reply to a later command, and the next command opens a new one.
+
+        Args:
+            msgs (List[str]): The messages to be sent to the STM device.
+            read (Callable): The function reading and converting the replies from the open socket.
+
+        Returns:
+            The return value of 'read'.
+
+        Raises:
+            STMError: If no reply arrived within '_timeout' seconds.
+            ConnectionResetError: If the STM device closed the connection after the messages were written.
         """
-        self.connect()
-        time.sleep(0.1)
-        self.socket.send(msg.encode())
-        result = self.socket.recv(STM._buffer_size).decode()
+        data = b''.join(self._encode(msg) for msg in msgs)
+        if not self.persistent:
+            self.connect()
+            time.sleep(STM._connect_delay)
+        elif not self.connected:
+            self.reconnect()
+        else:
+            try:
+                self._discard_pending()
+                self.socket.sendall(data)
+                data = None
+            except ConnectionError:
+                self.reconnect()
 
         try:
-            out = out_dtype(result)
-        except:
-            result = self.socket.recv(STM._buffer_size).decode()
-            out = out_dtype(result)
+            if data is not None:
+                self.socket.sendall(data)
+            return read()
+        except TimeoutError as e:
+            self.drop()
+            raise STMError('; '.join(msg.strip() for msg in msgs), '', f'{e}; the command may still have been applied') from e
+        except ConnectionError:
+            self.drop()
+            raise
+        finally:
+            if not self.persistent:
+                self.drop()
 
-        self.drop()
-        return out
+    def _read_many(self, msgs: List[Tuple[str, type]]) -> list:
+        """
+        Reads the responses to several messages written to the open socket.
+
+        Args:
+            msgs (List[Tuple[str, type]]): The messages that were sent, each paired with the data type of its expected output.
+
+        Returns:
+            list: The responses from the STM device with their specified data types.
+
+        Raises:
+            ConnectionResetError: If the STM device closed the connection.
+            TimeoutError: If a reply did not arrive within '_timeout' seconds.
+            STMBatchError: If one or more commands failed.
+        """
+        results = list()
+        failures = list()
+        for (i, (msg, out_dtype)) in enumerate(msgs):
+            reply = self.read_reply(STM._timeout)
+            try:
+                results.append(self._convert(msg, reply, out_dtype))
+            except STMError as e:
+                e.index = i
+                results.append(None)
+                failures.append(e)
+
+        if failures:
+            raise STMBatchError(results, failures)
+        return results
+
+    @staticmethod
+    def _convert(msg: str, reply: str, out_dtype: type):
+        """
+        Checks a reply from the STM device and converts it to the expected data type.
+
+        Args:
+            msg (str): The message the reply belongs to.
+            reply (str): The reply from the STM device.
+            out_dtype (type): The data type of the expected output.
+
+        Returns:
+            out_dtype: The converted reply.
+
+        Raises:
+            STMError: If the reply is an error message or cannot be converted to 'out_dtype'.
+        """
+        if reply.upper().startswith(STM._error_prefix):
+            raise STMError(msg, reply)
+        try:
+            return out_dtype(reply)
+        except (TypeError, ValueError) as e:
+            raise STMError(msg, reply, f'cannot convert reply to {out_dtype.__name__}: {e}')
+
+    @staticmethod
+    def _encode(msg: str) -> bytes:
+        """
+        Encodes a message for the STM device, appending the line terminator if it is missing.
+
+        Args:
+            msg (str): The message to be encoded.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        data = msg.encode()
+        if not data.endswith(STM._terminator):
+            data += STM._terminator
+        return data
+
+    def read_reply(self, timeout: float = None) -> str:
+        """
+        Reads the next complete reply from the STM device.
+
+        Bytes are read from the socket until a line terminator is found. Anything received after the terminator is
+        kept for the next call, so replies are returned in the order they were sent regardless of how the controller
+        splits or merges them into packets.
+
+        Args:
+            timeout (float): The maximum time in seconds to wait for a complete reply. Default is None, which waits
+            indefinitely.
+
+        Returns:
+            str: The reply without its line terminator.
+
+        Raises:
+            ConnectionResetError: If the STM device closed the connection before a complete reply was received.
+            TimeoutError: If no complete reply was received within 'timeout' seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while (end := self._rx.find(STM._terminator)) < 0:
+            if deadline is not None and not self._wait_readable(deadline - time.monotonic()):
+                raise TimeoutError(f'STM did not reply within {timeout} s')
+            chunk = self.socket.recv(STM._buffer_size)
+            if not chunk:
+                raise ConnectionResetError('STM closed the connection')
+            self._rx += chunk
+
+        reply = bytes(self._rx[:end])
+        del self._rx[:end + len(STM._terminator)]
+        return reply.decode().rstrip('\r')
+
+    def _wait_readable(self, timeout: float) -> bool:
+        """
+        Blocks until the socket has data to read, without polling.
+
+        Args:
+            timeout (float): The maximum time in seconds to wait.
+
+        Returns:
+            bool: True if data is ready to be read, False if the timeout expired first.
+        """
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.socket, selectors.EVENT_READ)
+            return len(selector.select(max(timeout, 0))) > 0
+
+    def _discard_pending(self):
+        """
+        Discards replies that arrived without being read, so the next reply read belongs to the next command sent.
+        """
+        self._rx.clear()
+        while self._wait_readable(0):
+            if not self.socket.recv(STM._buffer_size):
+                raise ConnectionResetError('STM closed the connection')
     
     def peek(self) -> bool:
         """
@@ -93,34 +588,89 @@ class STM():
             Returns:
                 bool: True if the buffer is empty, False otherwise.
         """
-        self.connect()
-        self.socket.setblocking(False)
-        try:
-            data = self.socket.recv(1, socket.MSG_PEEK)
-            if data:
-                self.drop()
+        with self._lock:
+            if not self.persistent:
+                self.connect()
+            elif not self.connected:
+                self.reconnect()
+            if self._rx:
                 return False
-        except socket.error:
-            self.drop()
-            return True
+            self.socket.setblocking(False)
+            try:
+                data = self.socket.recv(1, socket.MSG_PEEK)
+                empty = not data
+            except socket.error:
+                empty = True
+            finally:
+                if self.persistent:
+                    self.socket.setblocking(True)
+                else:
+                    self.drop()
+            return empty
     
-    def start_procedure(self, procedure_name: str):
+    def start_procedure(self, procedure_name: str, timeout: float = None) -> ProcedureResult:
         """
-        Starts an STM procedure by its name.
+        Starts an STM procedure by its name and waits for it to finish.
+
+        How the end of the procedure is detected is set by 'procedure_completion' in 'stm_commands.json':
+
+        - 'acknowledgement' (default): the STM device answers StartProcedure once, and the procedure counts as finished
+          with that reply, as it always has.
+        - 'reply': the STM device acknowledges StartProcedure when the procedure starts and sends a second line once it
+          has finished. Only set this for a controller known to send the second line, or every procedure times out.
+
+        Unread replies left on the connection are discarded first, then the procedure is started and the calling thread
+        sleeps until the replies have arrived. The wait does not poll the controller.
 
         Args:
             procedure_name (str): The name of the procedure to be started.
+            timeout (float): The maximum time in seconds to wait for the procedure to finish. Default is None, which
+            waits indefinitely.
 
         Returns:
-            str: The result of the STM procedure.
+            ProcedureResult: The last reply of the STM device together with the times the procedure was started, or
+            acknowledged with 'reply', and finished.
+
+        Raises:
+            TimeoutError: If the procedure did not finish within 'timeout' seconds. The connection is closed, since a
+            late reply could otherwise be taken for the reply to a later command.
+            STMError: If the STM device refused to start the procedure or reported an error when it finished.
+            ValueError: If 'procedure_completion' is not one of '_completions'.
         """
-        cmd = f'StartProcedure, {procedure_name}\n'
-        buffer_empty = self.peek()
-        while not buffer_empty:
-            buffer_empty = self.peek()
-        print("Starting procedure")
-        result = self.send(cmd)  ###TODO: Why isn't this blocked?
-        print(result)
+        cmd = f'{self.command("start_scan_of_type")}{procedure_name}'
+        completion = self.command('procedure_completion')
+        if completion not in STM._completions:
+            raise ValueError(f'unknown procedure completion {completion!r}, expected one of {STM._completions}')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            if not self.persistent:
+                self.connect()
+            elif not self.connected:
+                self.reconnect()
+
+            try:
+                self._discard_pending()
+            except ConnectionError:
+                self.reconnect()
+
+            try:
+                started = time.time()
+                self.socket.sendall(self._encode(cmd))
+                reply = self.read_reply(timeout)
+                if completion == 'reply':
+                    # A refused procedure is not followed by a completion reply
+                    self._convert(cmd, reply, str)
+                    started = time.time()
+                    reply = self.read_reply(None if deadline is None else deadline - time.monotonic())
+                finished = time.time()
+            except (ConnectionError, TimeoutError):
+                self.drop()
+                raise
+            finally:
+                if not self.persistent:
+                    self.drop()
+
+            return ProcedureResult(procedure_name, self._convert(cmd, reply, str), started, finished)
 
     def set_bias(self, bias: float):
         """
@@ -130,10 +680,10 @@ class STM():
             bias (float): The bias value to be set.
 
         Returns:
-            str: The response from the STM device after setting the bias value.
+            str: The response from the STM device after setting the bias value,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWParameter, STM Bias, Value, {bias}\n'
-        return self.send(cmd)
+        return self._set('set_bias', bias)
 
     def set_setpoint(self, setpoint: float):
         """
@@ -143,10 +693,10 @@ class STM():
             setpoint (float): The set point value to be set.
 
         Returns:
-            str: The response from the STM device after setting the set point value.
+            str: The response from the STM device after setting the set point value,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWParameter, STM Set Point, Value, {setpoint}\n'
-        return self.send(cmd)
+        return self._set('set_setpoint', setpoint)
 
     def set_scan_size(self, size: float):
         """
@@ -156,10 +706,10 @@ class STM():
             size (float): The size of the scan area to be set.
 
         Returns:
-            str: The response from the STM device after setting the scan area size.
+            str: The response from the STM device after setting the scan area size,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWParameter, Scan Area Window, Scan Area Size, {size}'
-        return self.send(cmd)
+        return self._set('set_scan_size', size)
 
     def set_scan_pos(self, pos: Vector2):
         """
@@ -169,12 +719,11 @@ class STM():
             pos (Vector2): The position of the scan area to be set.
 
         Returns:
-            str: The response from the STM device after setting the scan area position.
+            str: The response from the STM device after setting the scan area position,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWParameter, Scan Area Window, X Offset, {pos.x}'
-        self.send(cmd)
-        cmd = f'SetSWParameter, Scan Area Window, Y Offset, {pos.y}'
-        return self.send(cmd)
+        self._set('set_scan_pos_x', pos.x)
+        return self._set('set_scan_pos_y', pos.y)
 
     def set_line_time(self, line_time: float):
         """
@@ -184,10 +733,10 @@ class STM():
             line_time (float): The time taken for each line scan.
 
         Returns:
-            str: The response from the STM device after setting the line time.
+            str: The response from the STM device after setting the line time,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWParameter, Scan Area Window, Line Time, {line_time}'
-        return self.send(cmd)
+        return self._set('set_line_time', line_time)
     
     def set_lines_per_frame(self, lines_per_frame: int):
         """
@@ -197,10 +746,10 @@ class STM():
             lines_per_frame (int): The number of lines to be scanned in each frame.
 
         Returns:
-            str: The response from the STM device after setting the lines per frame.
+            str: The response from the STM device after setting the lines per frame,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWParameter, Scan Area Window, Scan Settings, Lines Per Frame, {lines_per_frame}'
-        return self.send(cmd)
+        return self._set('set_resolution', lines_per_frame)
 
     def set_scan_count(self, scan_count:int):
         """
@@ -210,10 +759,10 @@ class STM():
             scan_count (int): The number of scans to be set.
 
         Returns:
-            str: The response from the STM device after setting the scan count.
+            str: The response from the STM device after setting the scan count,
+            or None if the value is unchanged or the command was queued by an active 'batch'.
         """
-        cmd = f'SetSWSubItemParameter, Scan Area Window, Scan Settings, Scan Count, {scan_count}\n'
-        return self.send(cmd)
+        return self._set('set_scan_count', scan_count)
     
     def get_save_path(self):
         """
@@ -222,5 +771,5 @@ class STM():
         Returns:
             str: The save path for the measurement data.
         """
-        cmd = "GetSWSubItemParameter, Scan Area Window, MeasureSave, Save Path\n"
+        cmd = self.command('get_save_path')
         return os.path.normpath(self.send(cmd, str))
@@ -1,11 +1,13 @@
-from typing import Union
+import traceback
+from typing import Callable, List, Optional, Tuple, Union
 from PySide6.QtCore import *
 
 from core.vector2 import Vector2
 from core.taskdata import TaskData
 from core.imagedata import ImageData
 from core.specdata import SpecData
-from lib.native.stm import STM
+from core.procedureresult import ProcedureResult
+from lib.stm import STM, STMError
 
 class WorkerSignals(QObject):
     """
@@ -14,11 +16,11 @@ class WorkerSignals(QObject):
         This class defines the signals emitted by the Worker thread when it is running a task. It provides two signals:
 
         Attributes:
-            finished: Signal emitted when the worker thread has finished its task.
-            error: Signal emitted if an error occurs during the execution of the worker thread.
+            finished: Signal emitted with the controller's save path when the worker thread has finished its task.
+            error: Signal emitted with (exception type, exception, traceback) if an error occurs during the execution of the worker thread.
     """
 
-    finished = Signal()
+    finished = Signal(str)
     error = Signal(tuple)
 
 class TaskWorker(QRunnable):
@@ -29,27 +31,42 @@ class TaskWorker(QRunnable):
         executed in a QThreadPool to perform time-consuming tasks without freezing the main GUI thread.
 
         Attributes:
+            _timeout_factor (float): Multiple of the expected frame time to wait for a procedure to finish.
+            _timeout_slack (float): Additional time in seconds to wait for a procedure to finish.
             task (TaskData): The STM task to be executed.
             signals (WorkerSignals): A QObject that defines signals to communicate with the main thread.
-            stm (STM): An instance of the STM class responsible for controlling the STM device.
+            stm (STM): The STM instance shared by all workers, responsible for controlling the STM device.
+            result (ProcedureResult): The completion of the task's procedure, once it has finished.
+            next_task (Callable[[], TaskData]): Looks up the task to run after this one, if any.
 
         Methods:
             run(): The main method of the worker thread that runs the task.
             set_stm_params(data: Union[ImageData, SpecData]) -> None: Sets STM parameters for the given data.
-            start_procedure() -> str: Starts the STM procedure based on the task type.
+            stm_params(data: ImageData) -> List[Tuple[str, object]]: Validates and converts the parameters of a task.
+            prefetch() -> None: Configures the STM device for the task to run next.
+            start_procedure() -> ProcedureResult: Starts the STM procedure based on the task type and waits for it to finish.
+            procedure_timeout(data: ImageData) -> float: Estimates how long to wait for an image procedure.
     """
 
-    def __init__(self, task: TaskData):
+    _timeout_factor = 1.5
+    _timeout_slack = 60.0
+
+    def __init__(self, task: TaskData, stm: STM, next_task: Callable[[], TaskData] = None):
         """
             Initializes the TaskWorker.
 
             Args:
                 task (TaskData): The STM task to be executed.
+                stm (STM): The STM instance used to communicate with the STM device.
+                next_task (Callable[[], TaskData]): Looks up the task to run after this one, returning None if there is
+                none. It is called once this task has finished, see 'prefetch'. Default is None, which prefetches nothing.
         """
         super().__init__()
         self.task = task
         self.signals = WorkerSignals()
-        self.stm = STM()
+        self.stm = stm
+        self.result = None
+        self.next_task = next_task
 
     @Slot()
     def run(self) -> None:
@@ -57,13 +74,23 @@ class TaskWorker(QRunnable):
             Runs the STM task.
 
             This method is the main entry point for the worker thread. It executes the STM task defined in the 'task' attribute.
+            Once the procedure has finished the 'finished' signal is emitted with the save path, and only then is the STM
+            device configured for the next task, see 'prefetch'. If a parameter is invalid, the STM device rejects a
+            command or cannot be reached, or the procedure does not finish in time, the 'error' signal is emitted with
+            (exception type, exception, traceback) instead of 'finished', so the run is always ended one way or the other.
         """
         print(f"Task started : {self.task.inner.bias}")
 
-        self.set_stm_params(self.task.inner)
-        result = self.start_procedure()
+        try:
+            self.set_stm_params(self.task.inner)
+            self.result = self.start_procedure()
+            save_path = self.stm.get_save_path()
+        except (STMError, OSError, ValueError) as e:
+            self.signals.error.emit((type(e), e, traceback.format_exc()))
+            return
 
-        self.signals.finished.emit()
+        self.signals.finished.emit(save_path)
+        self.prefetch()
 
     def set_stm_params(self, data: Union[ImageData, SpecData]) -> None:
         """
@@ -88,57 +115,99 @@ class TaskWorker(QRunnable):
             (Currently not implemented)
 
             Note: This method does not execute the STM procedure; it only configures the STM device for the task.
+            All parameters are sent as one batch, so configuring the STM device costs a single round trip, and
+            parameters the STM device already has, e.g. from 'prefetch', are not sent at all.
 
             Returns:
                 None
         """
-        pos = Vector2(data.x_offset.to_float(), -data.y_offset.to_float())
-
-        # Set Bias
-        self.stm.set_bias(data.bias.to_float())
+        self.stm.set_params(self.stm_params(data))
 
-        # Set Setpoint
-        self.stm.set_setpoint(data.set_point.to_float())
-
-        # Set Scan Size
-        self.stm.set_scan_size(data.size.to_float())
+    @staticmethod
+    def stm_params(data: ImageData) -> List[Tuple[str, object]]:
+        """
+            Validates the image parameters of a task and converts them to STM parameter values.
 
-        # Set Scan Position
-        self.stm.set_scan_pos(pos)
+            Args:
+                data (ImageData): The image parameters of the task.
 
-        # Set Line Time
-        self.stm.set_line_time(data.line_time.to_float())
+            Returns:
+                List[Tuple[str, object]]: The value of every STM parameter, keyed by its command name in 'stm_commands.json'.
 
-        # Set Lines Per Frame
-        self.stm.set_lines_per_frame(data.lines_per_frame)
+            Raises:
+                ValueError: If a parameter is out of range.
+        """
+        if data.size.to_float() <= 0 or data.line_time.to_float() <= 0:
+            raise ValueError(f'Scan size and line time must be positive, got {data.size}m and {data.line_time}s')
+        if data.lines_per_frame < 1 or data.repetitions < 1:
+            raise ValueError(f'Lines per frame and repetitions must be at least 1, got {data.lines_per_frame} and {data.repetitions}')
 
-        # Set Repetitions
-        self.stm.set_scan_count(data.repetitions)
+        pos = Vector2(data.x_offset.to_float(), -data.y_offset.to_float())
+        return [('set_bias', data.bias.to_float()),              # Bias
+                ('set_setpoint', data.set_point.to_float()),     # Setpoint
+                ('set_scan_size', data.size.to_float()),         # Scan Size
+                ('set_scan_pos_x', pos.x),                       # Scan Position
+                ('set_scan_pos_y', pos.y),
+                ('set_line_time', data.line_time.to_float()),    # Line Time
+                ('set_resolution', data.lines_per_frame),        # Lines Per Frame
+                ('set_scan_count', data.repetitions)]            # Repetitions
+
+    def prefetch(self) -> None:
+        """
+            Configures the STM device for the task to run next, once this task has been reported finished.
 
-    def start_procedure(self) -> str:
+            The next task is looked up only now, so a task unchecked, moved or removed while this one was running is not
+            configured. Sending its parameters while the GUI thread handles 'finished' takes the setup out of the dead
+            time between frames: the next worker usually finds the STM device configured and only starts its procedure.
+            Nothing is sent while execution is paused or stopped. A failure is only reported; the next worker sends the
+            affected parameters again and handles the error.
         """
-            Starts the STM procedure based on the task type.
+        if self.next_task is None or self.stm.paused or self.stm.stopped:
+            return
+        task = self.next_task()
+        if task is None or task.dtype is not TaskData.TaskType.Image:
+            return
+        try:
+            self.stm.set_params(TaskWorker.stm_params(task.inner))
+        except (STMError, OSError, ValueError) as e:
+            print(f'Prefetching the next task failed: {e}')
+
+    def start_procedure(self) -> Optional[ProcedureResult]:
+        """
+            Starts the STM procedure based on the task type and waits for it to finish.
 
             Returns:
-                str: The result of the STM procedure.
+                ProcedureResult: The reply of the STM procedure with its start and finish times.
 
             This method initiates the STM procedure based on the type of task specified in the 'task' attribute.
             Currently, only the 'Image' task type is implemented.
 
             For Image task:
-            The method starts the STM procedure for 'dI-dV Map Scan Speed'.
+            The method starts the STM procedure for 'dI-dV Map Scan Speed'. The wait is bounded by the expected frame
+            time, see 'procedure_timeout'.
 
             For other task types:
             (Currently not implemented)
 
-            The result of the STM procedure, if available, is returned as a string.
-
             Note: The method returns 'None' for task types other than 'Image' as they are not implemented yet.
         """
         match self.task.dtype:
             case TaskData.TaskType.Image:
-                return self.stm.start_procedure('dI-dV Map Scan Speed')
+                return self.stm.start_procedure('dI-dV Map Scan Speed', timeout=self.procedure_timeout(self.task.inner))
             case _:
-                return 'None'
+                return None
             # case TaskType.Spectra:
                 # self.stm.start_procedure('')
+
+    def procedure_timeout(self, data: ImageData) -> float:
+        """
+            Estimates how long to wait for an image procedure before giving up.
+
+            Args:
+                data (ImageData): The image parameters of the task.
+
+            Returns:
+                float: The timeout in seconds, '_timeout_factor' times the expected frame time plus '_timeout_slack'.
+        """
+        frame_time = 2 * data.line_time.to_float() * data.lines_per_frame * data.repetitions
+        return TaskWorker._timeout_factor * frame_time + TaskWorker._timeout_slack
@@ -1,4 +1,4 @@
-import sys
+import sys, argparse
 import qdarktheme
 from pathlib import Path
 
@@ -6,12 +6,18 @@ from PySide6 import QtCore
 from PySide6.QtWidgets import QApplication
 
 from ui.app import Ui_MainWindow
+from lib.simulator import STMSimulator
 
 # Set a global attribute to share OpenGL contexts between threads for better performance
 QApplication.setAttribute(QtCore.Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
 
+# Read the options of pyxm, leaving the rest to Qt
+parser = argparse.ArgumentParser(description='pyxm')
+parser.add_argument('--simulator', action='store_true', help='preview the synthetic images of src/lib/simulator.py')
+(args, qt_args) = parser.parse_known_args()
+
 # Initialize the Qt application
-app = QApplication(sys.argv)
+app = QApplication(sys.argv[:1] + qt_args)
 
 # Load custom CSS style from a file
 style = Path('src/ui/style.css').read_text()
@@ -26,7 +32,10 @@ qdarktheme.setup_theme(
 )
 
 # Create an instance of the main application window
-win = Ui_MainWindow()
+if args.simulator:
+    win = Ui_MainWindow(load_image=STMSimulator.load_topography, image_complete=STMSimulator.image_complete)
+else:
+    win = Ui_MainWindow()
 
 # Set the custom style sheet for the main application window
 win.setStyleSheet(style)
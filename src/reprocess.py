@@ -0,0 +1,37 @@
+import sys, time, argparse
+
+from lib.batchprocessor import BatchProcessor, load_topography
+from lib.simulator import STMSimulator
+
+def main(argv: list = None) -> int:
+    """
+        Reprocesses the '.sm4' files of a session from the command line.
+
+        Args:
+            argv (list): The command line arguments. Defaults to 'sys.argv'.
+
+        Returns:
+            int: The exit code, 1 if any file could not be processed and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Level every .sm4 file of a session and write thumbnails and an index.')
+    parser.add_argument('paths', nargs='+', help='save directories or .sm4 files')
+    parser.add_argument('-o', '--out', required=True, help='directory for the thumbnails and index.json')
+    parser.add_argument('-s', '--size', type=int, default=128, help='thumbnail size in pixels')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes, defaults to the CPU count')
+    parser.add_argument('--simulator', action='store_true', help='read the synthetic images of src/lib/simulator.py')
+    args = parser.parse_args(argv)
+
+    fnames = BatchProcessor.find_files(args.paths)
+    start = time.perf_counter()
+    summaries = BatchProcessor(args.out, args.size, args.workers,
+                               load=STMSimulator.load_topography if args.simulator else load_topography).run(fnames)
+    elapsed = time.perf_counter() - start
+
+    failed = [summary for summary in summaries if summary.error is not None]
+    for summary in failed:
+        print(f'{summary.fname}: {summary.error}')
+    print(f'Processed {len(summaries) - len(failed)} of {len(summaries)} files in {elapsed:.2f} s')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,8 @@
-import os, glob, json, spym
+import os, json, time
+from collections import deque
 import numpy as np
-import matplotlib.pyplot as plt
-import PIL
-from PIL.ImageQt import ImageQt
 from types import SimpleNamespace
+from typing import Callable, List
 
 from PySide6.QtCore import *
 from PySide6.QtWidgets import *
@@ -12,13 +11,24 @@ from qimage2ndarray import array2qimage
 
 from core.exponentialnumber import ExponentialNumber
 from core.tasksetdata import TaskSetData
+from core.sweepaxis import SweepAxis
+from core.sweep import Sweep
+from core.tasktable import TaskTable
 
 from lib.stm import STM
 from lib.taskworker import TaskWorker
+from lib.previewworker import PreviewWorker
+from lib.previewrenderer import PreviewRenderer
+from lib.savewatcher import SaveWatcher
+from lib.batchprocessor import load_topography
+from lib.framecache import FrameCache
+from lib.framestore import FrameStore
 
 from ui.widget.scanarea.scanarea import ScanArea
 from ui.widget.scanarea.rectpreview import RectPreview
+from ui.widget.scanarea.pyramiditem import PyramidItem
 from ui.widget.scientificspinbox import ScientificSpinBox
+from ui.widget.sweepaxisinput import SweepAxisInput
 from ui.widget.tasksetlist import TaskSetList
 from ui.widget.taskset.tasksetstatus import TaskSetStatus
 from ui.widget.togglebutton import ToggleButton
@@ -37,6 +47,16 @@ class Ui_MainWindow(QMainWindow):
         Attributes:
             centralwidget (QWidget): The central widget for the main window.
             threadpool (QThreadPool): A thread pool used for running tasks in the background.
+            preview_pool (QThreadPool): A single-thread pool that renders image previews in the order they were acquired.
+            preview_renderer (PreviewRenderer): Renders the previews at a fixed resolution.
+            frame_cache (FrameCache): Keeps levelled and rendered images, so previews can be shown again instantly.
+            frame_store (FrameStore): Keeps the levelled channels of every image of the session, opened with the first
+            image in a new directory of 'frame_store_path'.
+            frame_store_path (str): The directory the frame stores of the sessions are kept in. It is apart from the save
+            directory of the STM device, which pyxm only reads.
+            load_image (Callable[[str], np.ndarray]): Loads the topography channels of an image saved by the STM device.
+            save_watcher (SaveWatcher): Reports the images the STM device saves once they have stopped changing for a
+            second and are complete.
             running (bool): Flag indicating if a task is currently running.
             paused (bool): Flag indicating if the task execution is paused.
             content (QFrame): The content frame containing the main application elements.
@@ -44,6 +64,12 @@ class Ui_MainWindow(QMainWindow):
             scan_area (ScanArea): The widget responsible for displaying the scan area.
             options_frame (QFrame): The frame containing the options and task-related controls.
             task_set_list (TaskSetList): The list of task sets displayed in the user interface.
+            worker_type (type): The QRunnable made by 'start_task' to run a task, called with the task, the STM instance
+            and the next task like a TaskWorker.
+            _preview_windows (int): The number of finished tasks, most recent first, an image reported by 'save_watcher'
+            is matched against.
+            _mtime_slack (float): The time in seconds an image may be modified after its task finished and still belong
+            to it.
 
         Methods:
             __init__: Initializes the main window and sets up the user interface.
@@ -56,10 +82,10 @@ class Ui_MainWindow(QMainWindow):
             scan_rect_moved: Updates the "X offset," "Y offset," and "Size" input fields when the scan area is moved.
             update_time_to_finish: Updates the estimated time to finish the task execution based on input field values.
             update_total_images: Updates the total number of images based on input field values.
-            set_sweep_enabled: Enables or disables the sweep-related input fields based on the selected sweep parameter.
-            set_sweep_units: Sets the units for sweep-related input fields based on the selected sweep parameter.
-            set_sweep_vals: Sets the sweep-related input fields' values based on the selected sweep parameter.
-            update_sweep_params: Updates the sweep-related parameters based on the selected sweep parameter.
+            add_sweep_axis_input: Adds a row of sweep-related input fields for one more swept parameter.
+            sweep_axes: Gets the swept parameters entered in the sweep-related input fields.
+            sweep: Gets the sweep entered in the sweep-related input fields.
+            update_sweep_params: Updates the sweep-related parameters based on the selected sweep parameters.
 
         Note:
         - This class uses PySide6, a Python binding for the Qt framework, to create the graphical user interface.
@@ -72,16 +98,31 @@ class Ui_MainWindow(QMainWindow):
         - The "add_task_set" method adds a new task set to the list based on user-provided parameters.
         - The "update_scan_size," "update_scan_position," and "scan_rect_moved" methods update the scan area visualization based on user inputs.
         - The "update_time_to_finish" and "update_total_images" methods calculate and display task-related statistics.
-        - The "set_sweep_enabled," "set_sweep_units," and "set_sweep_vals" methods manage sweep-related input fields.
-        - The "update_sweep_params" method updates sweep-related input fields based on the selected sweep parameter.
+        - The "sweep_axes" and "sweep" methods read the sweep-related input fields, one SweepAxisInput per swept parameter.
+        More SweepAxisInput rows are added with the "Add Parameter" button, see "add_sweep_axis_input".
+        - The "update_sweep_params" method updates sweep-related input fields based on the selected sweep parameters.
     """
-    def __init__(self, *args, **kwargs):
+    worker_type = TaskWorker
+    _preview_windows = 64
+    _mtime_slack = 2.0
+
+    def __init__(self, frame_store_path: str = None,
+                 load_image: Callable[[str], np.ndarray] = load_topography,
+                 image_complete: Callable[[str], bool] = None, *args, **kwargs):
         """
             Initialize the main window UI.
 
             This method sets up the main window and its components, including the toolbar, content frame, scan area, and
             various widgets. It also configures the initial states of different UI elements and establishes event
             connections.
+
+            Args:
+                frame_store_path (str): The directory to keep the frame stores of the sessions in. Default is None, for a
+                'frames' directory in the pyxm data directory of the user.
+                load_image (Callable[[str], np.ndarray]): Loads the topography channels of an image saved by the STM
+                device. Default is 'batchprocessor.load_topography', for '.sm4' files.
+                image_complete (Callable[[str], bool]): Tells whether an image saved by the STM device is completely
+                written, see 'SaveWatcher'. Default is None, for '.sm4' files, which only settle.
         """
         super().__init__(*args, **kwargs)
 
@@ -93,7 +134,7 @@ class Ui_MainWindow(QMainWindow):
         ## ------- Global STM object --- ##
         with open('src/stm_commands.json') as f:
             commands = json.load(f, object_hook=lambda d: SimpleNamespace(**d))
-        self.stm = STM(commands=commands)
+        self.stm = STM(commands=commands, persistent=True)
 
         ## ------- Task threadpool ----- ##
         self.running = False
@@ -102,6 +143,21 @@ class Ui_MainWindow(QMainWindow):
         self.threadpool = QThreadPool.globalInstance()
         print("Multithreading with maximum %d threads" % self.threadpool.maxThreadCount())
 
+        ## ------- Preview threadpool -- ##
+        self.preview_pool = QThreadPool(self)
+        self.preview_pool.setMaxThreadCount(1)
+        self.preview_renderer = PreviewRenderer()
+        self.frame_cache = FrameCache()
+        self.frame_store = None
+        if frame_store_path is None:
+            data_path = QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation)
+            frame_store_path = os.path.join(data_path, 'pyxm', 'frames')
+        self.frame_store_path = frame_store_path
+        self.load_image = load_image
+        self.save_watcher = SaveWatcher(complete=image_complete, parent=self)
+        self.save_watcher.file_ready.connect(self.image_saved)
+        self._finished_tasks = deque(maxlen=Ui_MainWindow._preview_windows)
+
         ## ------ Toolbar ------ ##
         self.toolbar = QFrame(self.centralwidget, objectName='toolbar')
         self.toolbar.setFixedHeight(26)
@@ -145,7 +201,7 @@ class Ui_MainWindow(QMainWindow):
         sizePolicy = QSizePolicy(QSizePolicy.Preferred, QSizePolicy.Minimum)
         sizePolicy.setHeightForWidth(True)
         self.scan_area.setSizePolicy(sizePolicy)
-        self._rect_previews = list()
+        self.scan_area.overlays.reload_requested.connect(self.reload_preview)
 
         self.scan_area_layout = QVBoxLayout(self.scan_area_frame)
         self.scan_area_layout.setContentsMargins(0, 7, 0, 0)
@@ -356,38 +412,24 @@ class Ui_MainWindow(QMainWindow):
         self.sweep_options = QGroupBox("Sweep Options", self.options_frame)
         self.sweep_options.setFlat(True)
         
-        self.sweep_parameter_label = QLabel("Sweep parameter")
-        self.sweep_parameter = QComboBox()
-        self.sweep_parameter.addItems(["None", "Bias", "Size"])#, "Set point current", "Size", "X offset", "Y offset"])
-        self.sweep_parameter.setCurrentText("None")
-
-        self.sweep_start_label = QLabel("Initial value")
-        self.sweep_start = ScientificSpinBox()
-        self.sweep_start.setBounds(lower=ExponentialNumber(-5, 0), upper=ExponentialNumber(5, 0))
-        self.sweep_start.setValue(ExponentialNumber(200, -3))
-        self.sweep_start.setUnits('V')
-
-        self.sweep_stop_label = QLabel("Final value")
-        self.sweep_stop = ScientificSpinBox()
-        self.sweep_stop.setBounds(lower=ExponentialNumber(-5, 0), upper=ExponentialNumber(5, 0))
-        self.sweep_stop.setValue(ExponentialNumber(1, 0))
-        self.sweep_stop.setUnits('V')
-
-        self.sweep_step_label = QLabel("Increment")
-        self.sweep_step = ScientificSpinBox()
-        self.sweep_step.setBounds(lower=ExponentialNumber(-5, 0), upper=ExponentialNumber(5, 0))
-        self.sweep_step.setValue(ExponentialNumber(100, -3))
-        self.sweep_step.setUnits('V')
-
-        sweep_opt_widgets = [(self.sweep_parameter_label, self.sweep_parameter),
-                             (self.sweep_start_label, self.sweep_start),
-                             (self.sweep_stop_label, self.sweep_stop),
-                             (self.sweep_step_label, self.sweep_step)]
-        
+        self.sweep_axis_inputs: List[SweepAxisInput] = list()
+        self.sweep_axes_layout = QVBoxLayout()
+        self.sweep_axes_layout.setContentsMargins(0, 0, 0, 0)
+        self.add_sweep_axis_btn = QPushButton("Add Parameter", self.options_frame)
+        self.add_sweep_axis_btn.clicked.connect(self.add_sweep_axis_input)
+        self.add_sweep_axis_input()
+        self.add_sweep_axis_input()
+
+        self.sweep_order_label = QLabel("Sweep order")
+        self.sweep_order = QComboBox()
+        self.sweep_order.addItems(["Nested", "Zipped"])
+        self.sweep_order.setCurrentText("Nested")
+
         self.sweep_options_layout = QGridLayout()
-        for (i, (label, widget)) in enumerate(sweep_opt_widgets):    
-            self.sweep_options_layout.addWidget(label, i, 0, 1, 1)
-            self.sweep_options_layout.addWidget(widget, i, 1, 1, 1)
+        self.sweep_options_layout.addLayout(self.sweep_axes_layout, 0, 0, 1, 2)
+        self.sweep_options_layout.addWidget(self.add_sweep_axis_btn, 1, 0, 1, 2)
+        self.sweep_options_layout.addWidget(self.sweep_order_label, 2, 0, 1, 1)
+        self.sweep_options_layout.addWidget(self.sweep_order, 2, 1, 1, 1)
         self.sweep_options.setLayout(self.sweep_options_layout)
 
         # Spacing
@@ -419,6 +461,8 @@ class Ui_MainWindow(QMainWindow):
         self.task_set_list = TaskSetList(title="Task Set List", objectName='task_list')
         self.task_set_list.setMinimumWidth(300)
         self.task_set_list.setMaximumWidth(525)
+        self.task_set_list.hover_preview.connect(self.task_rect_preview)
+        self.task_set_list.remove_preview.connect(self.remove_rect_preview)
         
         self.content_layout = QHBoxLayout(self.content)
         self.content_layout.setContentsMargins(0, 0, 0, 0)
@@ -455,12 +499,9 @@ class Ui_MainWindow(QMainWindow):
             method. These signals are emitted when the X and Y offsets are changed, respectively, and they update the
             position of the scan area rectangle.
             - Several UI elements' signals are connected to the `update_time_to_finish` method. These elements include the
-            `lines_per_frame`, `line_time`, `sweep_start`, `sweep_stop`, `sweep_step`, and `repetitions` widgets. When
+            `lines_per_frame`, `line_time`, `sweep_order` and `repetitions` widgets and the `sweep_axis_inputs`. When
             any of these values are changed, the method recalculates and updates the estimated time to finish the task
-            set.
-            - The `sweep_parameter` widget's `currentIndexChanged` signal is connected to the `update_sweep_params`
-            method. This signal is emitted when the user selects a different sweep parameter, and it updates the enabled
-            status and value range of sweep-related widgets accordingly.
+            set. The `sweep_axis_inputs` are connected as they are added, see `add_sweep_axis_input`.
             - The "Play" and "Pause" toggle buttons' `clicked` signals are connected to the `play_clicked` and
             `pause_clicked` methods, respectively. These signals control the execution and pausing of task sets.
             
@@ -486,21 +527,13 @@ class Ui_MainWindow(QMainWindow):
         # Time to finish
         self.lines_per_frame.currentIndexChanged.connect(self.update_time_to_finish)
         self.line_time.value_changed.connect(self.update_time_to_finish)
-        self.sweep_parameter.currentIndexChanged.connect(self.update_time_to_finish)
-        self.sweep_start.value_changed.connect(self.update_time_to_finish)
-        self.sweep_stop.value_changed.connect(self.update_time_to_finish)
-        self.sweep_step.value_changed.connect(self.update_time_to_finish)
+        self.sweep_order.currentIndexChanged.connect(self.update_time_to_finish)
         self.repetitions.valueChanged.connect(self.update_time_to_finish)
 
         # Total images
-        self.sweep_start.value_changed.connect(self.update_total_images)
-        self.sweep_stop.value_changed.connect(self.update_total_images)
-        self.sweep_step.value_changed.connect(self.update_total_images)
+        self.sweep_order.currentIndexChanged.connect(self.update_total_images)
         self.repetitions.valueChanged.connect(self.update_total_images)
 
-        # Sweep param
-        self.sweep_parameter.currentIndexChanged.connect(self.update_sweep_params)
-
         # Toolbar
         self.play.clicked.connect(self.play_clicked)
         self.pause.clicked.connect(self.pause_clicked)
@@ -512,33 +545,22 @@ class Ui_MainWindow(QMainWindow):
 
             This method is triggered when the user clicks the play button on the UI. If task execution is not currently in
             progress (i.e., `running` is False), it checks if there are any task sets available for execution in the task
-            list. If there are, it selects the first non-finished task set for execution and adds its tasks to the todo
-            list. Then, it starts the task execution by creating and launching a TaskWorker for the first task in the todo
-            list.
+            list. If there are, it selects the first non-finished task set for execution. Then, it starts the task execution
+            by creating and launching a TaskWorker for its first checked task that is still to do. The save directory of the
+            STM device is watched once the first task reports it, see 'preview_image', so all controller traffic goes
+            through the single connection of 'stm'.
 
             Note:
                 - If task execution is already in progress, clicking the play button has no effect.
                 - The TaskWorker is responsible for executing individual tasks asynchronously in the background. Once a task
                 is completed, the TaskWorker emits a `finished` signal, and the `restart_task_worker` method is called to
-                handle the next task in the todo list or select the next task set if the current one is completed.
+                handle the next task of the task set or select the next task set if the current one is completed.
         """
         if self.running:
             self.play.setChecked(True)
             self.play.toggle()
         else:
-            if len(self.task_set_list.task_sets) > 0:
-                for task_set in self.task_set_list.task_sets:
-                    if task_set.status is not TaskSetStatus.Finished:
-                        self.current_task_set = task_set
-                        break
-                for (i, task_item) in enumerate(self.current_task_set._info.task_items):
-                    if task_item.isChecked():
-                        self.current_task_set.todo.append(self.current_task_set.tasks[i])
-                    else:
-                        task_item.setEnabled(False)
-                    self.current_task_set.total_todo = len(self.current_task_set.todo)
-            else:
-                self.current_task_set = None
+            self.select_task_set()
             self.start_task()
 
     def pause_clicked(self):
@@ -560,21 +582,23 @@ class Ui_MainWindow(QMainWindow):
             self.paused = False
             self.stm.paused = False
             if not self.running:
-                if len(self.task_set_list.task_sets) > 0:
-                    for task_set in self.task_set_list.task_sets:
-                        if task_set.status is not TaskSetStatus.Finished:
-                            self.current_task_set = task_set
-                            break
-                    for (i, task_item) in enumerate(self.current_task_set._info.task_items):
-                        if task_item.isChecked():
-                            self.current_task_set.todo.append(self.current_task_set.tasks[i])
-                        else:
-                            task_item.setEnabled(False)
-                        self.current_task_set.total_todo = len(self.current_task_set.todo)
-                else:
-                    self.current_task_set = None
+                self.select_task_set()
                 self.start_task()
 
+    def select_task_set(self):
+        """
+            Select the first task set of the queue that is not finished and still has tasks to do, and prepare it to be
+            run. The queue order is the order shown, so task sets reordered by dragging are run in their new order.
+        """
+        self.current_task_set = None
+        for task_set in self.task_set_list.task_sets:
+            if task_set.status is not TaskSetStatus.Finished:
+                task_set.prepare()
+                if task_set.next_task() is not None:
+                    self.current_task_set = task_set
+                    return
+                task_set.setStatus(TaskSetStatus.Finished)
+
     def stop_clicked(self):
         self.stopped = True
         self.stm.stopped = True
@@ -584,107 +608,100 @@ class Ui_MainWindow(QMainWindow):
             Start the execution of the current task set.
 
             This method is responsible for initiating the execution of tasks within the current task set. If there are tasks
-            available in the todo list of the current task set, it sets the `running` flag to True, indicating that task
-            execution is in progress. It selects the first task from the todo list and creates a TaskWorker to execute it.
-            The TaskWorker is then started by adding it to the thread pool.
+            still to do in the current task set, it sets the `running` flag to True, indicating that task execution is in
+            progress. It pulls the next checked task from the task set and creates a TaskWorker to execute it. The
+            TaskWorker is then started by adding it to the thread pool. The check box of the task is disabled from now
+            on, so it can no longer be unchecked once it runs; it is enabled again if the task is stopped or fails.
 
             Once the task is completed, the TaskWorker emits a `finished` signal, and the `restart_task_worker` method is
-            called to handle the next task in the todo list or select the next task set if the current one is completed.
+            called to handle the next task of the task set or select the next task set if the current one is completed.
+            The TaskWorker is also given a way to look up the task to run next, so it can configure the STM device for it
+            as soon as the current task has finished.
 
             Note:
                 - If the `running` flag is already True, calling this method has no effect, as task execution is already
                 in progress.
-                - The todo list contains the tasks that are yet to be executed in the current task set. Tasks are added to
-                the todo list during the initialization of the task set and when a task is re-enabled for execution.
+                - The tasks still to do are pulled lazily from the task set with `TaskSet.next_task`, so a task is only
+                made when it is about to run.
                 - The `restart_task_worker` method handles the logic of selecting the next task to be executed based on the
-                current state of the task set and the todo list.
+                current state of the task set.
         """
         if self.current_task_set is not None:
             self.current_task_set.setStatus(TaskSetStatus.Working)
-            self.current_task = self.current_task_set.todo[0]
-            worker = TaskWorker(self.current_task, self.stm)
+            self.current_task = self.current_task_set.next_task()
+            self.current_task_set.model.set_enabled(self.current_task.index, False)
+            self.task_dispatched = time.time()
+            self.current_task.started = self.task_dispatched
+            (task_set, task) = (self.current_task_set, self.current_task)
+            worker = self.worker_type(task, self.stm, next_task=lambda: self.next_task(task_set, task))
             worker.signals.finished.connect(self.restart_task_worker)
+            worker.signals.error.connect(self.task_error)
             self.threadpool.start(worker)
             self.running = True
             self.paint_current_task_rect()
         else:
             self.running = False
+            self.stm.drop()
             self.play.setChecked(False)
             self.play.toggle()
             
+    def next_task(self, task_set, task):
+        """
+            Find the task expected to run after a task.
+
+            This is the next checked task still to do of its task set or, if there is none, the first one of the first
+            task set in the queue that is not finished, as chosen by 'select_task_set'. The TaskWorker of the task calls this from its thread once the task has finished, to
+            configure the STM device for the next task. Only the check states and task tables are read, so the tasks
+            unchecked, reordered or removed while the task was running are taken into account.
+
+            Args:
+                task_set (TaskSet): The task set of the task.
+                task (TaskData): The task.
+
+            Returns:
+                TaskData: The next task, or None if there is none.
+        """
+        next_task = task_set.next_task(after=task)
+        if next_task is not None:
+            return next_task
+        for other in self.task_set_list.task_sets:
+            if other is not task_set and other.status is not TaskSetStatus.Finished:
+                next_task = next(other.pending(0), None)
+                if next_task is not None:
+                    return next_task
+        return None
+
     def restart_task_worker(self, save_path: str):
         """
             Handle the completion of a task and select the next task or task set for execution.
 
             This method is called when a task within the current task set is completed. It updates the status of the
-            completed task and removes it from the todo list of the current task set. If there are more tasks remaining in
-            the todo list, the method sets the `running` flag to True and starts the execution of the next task. If the
-            current task set is not yet completed, the next task is selected from the todo list. If the current task set
-            is completed, the method proceeds to select the next task set, if available, from the list of task sets.
+            completed task in the task table of the current task set. If there are more checked tasks still to do in the
+            current task set, the method sets the `running` flag to True and starts the execution of the next one. If the
+            current task set is completed, the method proceeds to select the first task set of the queue that is not finished,
+            if available, so task sets dragged ahead of the running one during a run are not skipped.
 
-            If there are no more tasks to be executed in the current task set and there are more task sets available, the
-            method proceeds to select the next task set and the first task from its todo list for execution.
+            The next task is started before the finished one is handed to the preview, so the preview does not add to the
+            dead time between frames.
 
             Note:
-                - The todo list contains the tasks that are yet to be executed in the current task set. Tasks are added to
-                the todo list during the initialization of the task set and when a task is re-enabled for execution.
+                - The tasks still to do are pulled lazily from the task set with `TaskSet.next_task`.
                 - The method uses the `threadpool` attribute of the class to manage the execution of tasks using separate
                 worker threads.
         """
-        if not self.stopped:
+        (task, dispatched) = (self.current_task, self.task_dispatched)
+        if self.stopped:
+            self.current_task_set.model.set_enabled(self.current_task.index, True)
+        else:
             self.current_task.completed = True
-            self.current_task_set._info.task_items[self.current_task.index].setEnabled(False)
-            self.current_task_set.todo.pop(0)   
+            self.current_task.finished = time.time()
         self.current_task_set.update_task_bar()
         self.remove_current_task_rect()
         
-        # Image preview
-        try:
-            files = glob.glob(os.path.join(save_path, '*.sm4'))
-            fname = max(files, key=os.path.getctime)
-            sm4 = spym.load(fname)
-            if 'Current' not in sm4.data_vars and 'Topography_Forward' in sm4.data_vars:
-                tf = sm4.Topography_Forward
-                tf.spym.align()
-                tf.spym.plane()
-                tf.spym.align()
-                nd_img = tf.data
-
-                size = self.current_task.inner.size.to_float() * 1e9 / self.scan_area._size
-                x = self.current_task.inner.x_offset.to_float() * 1e9 - (size/2)
-                y = self.current_task.inner.y_offset.to_float() * 1e9 - (size/2)
-
-                fig = plt.figure(figsize=(20, 20))
-                ax = plt.Axes(fig, [0., 0., 1., 1.])
-                ax.set_axis_off()
-                fig.add_axes(ax)
-                ax.imshow(nd_img, cmap='afmhot')
-                fig.canvas.draw()
-
-                image = PIL.Image.frombytes('RGB', fig.canvas.get_width_height(), fig.canvas.tostring_rgb())
-                image = QPixmap(ImageQt(image))
-                # image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.FastTransformation)
-                image = QGraphicsPixmapItem(image)
-                image.setScale(size)
-                image.setOffset(QPointF(x, y) / self.scan_area._size)
-                image.setZValue(0)
-                self.scan_area.scene().addItem(image)
-        except ValueError as e:
-            print(e)
-
         # Check for more tasks in current list
-        if len(self.current_task_set.todo) == 0:
+        if self.current_task_set.next_task() is None:
             self.current_task_set.setStatus(TaskSetStatus.Finished)
-            if self.current_task_set.index < len(self.task_set_list.task_sets) - 1:
-                self.current_task_set = self.task_set_list.task_sets[self.current_task_set.index + 1]                                   
-                for (i, task_item) in enumerate(self.current_task_set._info.task_items):
-                    if task_item.isChecked():
-                        self.current_task_set.todo.append(self.current_task_set.tasks[i])
-                    else:
-                        task_item.setEnabled(False)
-                    self.current_task_set.total_todo = len(self.current_task_set.todo)
-            else:
-                self.current_task_set = None
+            self.select_task_set()
 
         # Check for paused and stopped
         if self.paused:
@@ -697,9 +714,149 @@ class Ui_MainWindow(QMainWindow):
                 self.play.toggle()
                 self.running = False
                 self.stopped = False
+                self.stm.drop()
             else:
                 self.start_task()
+
+        # Image preview, once the next task is already running
+        self.preview_image(save_path, task, dispatched)
         
+    def preview_image(self, save_path: str, task, dispatched: float):
+        """
+            Get ready to preview the image of a finished task at its position.
+
+            The images are reported by 'save_watcher' once the STM device has written them, and are matched to the task
+            that acquired them by their modification time, see 'image_saved'. The time the task ran is kept for that,
+            together with the times of the last '_preview_windows' finished tasks.
+
+            Args:
+                save_path (str): The directory the STM device saves images to.
+                task (TaskData): The finished task.
+                dispatched (float): The time the task was started. Images saved in 'save_path' since then are new when
+                the directory is first watched.
+        """
+        self.save_watcher.watch(save_path, since=dispatched)
+        if self.frame_store is None:
+            self.frame_store = FrameStore(os.path.join(self.frame_store_path, time.strftime('%Y%m%d_%H%M%S')))
+        self._finished_tasks.append((task, dispatched, time.time()))
+
+    def image_saved(self, fname: str):
+        """
+            Preview an image reported by 'save_watcher' for the task that acquired it.
+
+            The task is the one that ran when the image was last modified: a finished task whose start and finish times
+            contain the modification time, else the running task if it started before then, else a finished task that
+            ended at most '_mtime_slack' seconds before. An image of no task, e.g. one saved by a scan started by hand or
+            in an earlier run, is not previewed. Every image of a task that saves several is previewed in turn. The
+            image is loaded, levelled and rendered by a PreviewWorker in 'preview_pool', so the GUI stays responsive and
+            the next task keeps running meanwhile. The rendered image is placed by 'show_preview'.
+
+            Args:
+                fname (str): The path of the image.
+        """
+        try:
+            mtime = os.stat(fname).st_mtime
+        except OSError as e:
+            print(e)
+            return
+        task = self.task_of_image(mtime)
+        if task is not None:
+            self.start_preview(fname, task)
+
+    def task_of_image(self, mtime: float):
+        """
+            Find the task that acquired an image, see 'image_saved'.
+
+            Args:
+                mtime (float): The modification time of the image.
+
+            Returns:
+                TaskData: The task, or None if the image belongs to none.
+        """
+        for (task, started, finished) in reversed(self._finished_tasks):
+            if started <= mtime <= finished:
+                return task
+        if self.running and mtime >= self.task_dispatched:
+            return self.current_task
+        for (task, started, finished) in reversed(self._finished_tasks):
+            if started <= mtime <= finished + Ui_MainWindow._mtime_slack:
+                return task
+        return None
+
+    def start_preview(self, fname: str, task):
+        """
+            Render the preview of an image in 'preview_pool'.
+
+            Args:
+                fname (str): The path of the image.
+                task (TaskData): The task that acquired the image.
+        """
+        task.fname = fname
+        worker = PreviewWorker(fname, task, self.preview_renderer, self.frame_cache, self.frame_store, self.load_image)
+        worker.signals.finished.connect(self.show_preview)
+        worker.signals.error.connect(self.preview_error)
+        self.preview_pool.start(worker)
+
+    def show_preview(self, pyramid: list, task):
+        """
+            Place a rendered preview in the scan area at the position of the task that acquired it.
+
+            Args:
+                pyramid (list): The level-of-detail pyramid of QImages rendered by a PreviewWorker.
+                task (TaskData): The task that acquired the image.
+        """
+        size = task.inner.size.to_float() * 1e9
+        x = task.inner.x_offset.to_float() * 1e9 - (size/2)
+        y = task.inner.y_offset.to_float() * 1e9 - (size/2)
+
+        item = PyramidItem(pyramid, QRectF(x, y, size, size), task=task, fname=task.fname)
+        item.setZValue(0)
+        self.scan_area.add_overlay(item)
+
+    def reload_preview(self, item: PyramidItem):
+        """
+            Render the preview of an overlay that was unloaded to a placeholder and scrolled back into view.
+
+            Args:
+                item (PyramidItem): The placeholder.
+        """
+        if item.fname is not None and item.task is not None:
+            self.start_preview(item.fname, item.task)
+
+    def preview_error(self, error: tuple):
+        """
+            Report a preview that could not be made.
+
+            Args:
+                error (tuple): The (exception type, exception, traceback) emitted by the PreviewWorker.
+        """
+        print(error[1])
+
+    def task_error(self, error: tuple):
+        """
+            Handle a task that failed because the STM device rejected one of its commands.
+
+            The current task set is marked as failed and task execution stops, so the user can inspect the reported
+            commands before resuming.
+
+            Args:
+                error (tuple): The (exception type, exception, traceback) emitted by the TaskWorker.
+        """
+        (_, e, tb) = error
+        print(tb)
+        for failure in getattr(e, 'failures', [e]):
+            print(f'STM command failed: {failure}')
+
+        self.remove_current_task_rect()
+        self.current_task.status = TaskTable.Status.error
+        self.current_task_set.model.set_enabled(self.current_task.index, True)
+        self.current_task_set.setStatus(TaskSetStatus.Error)
+        self.current_task_set = None
+        self.running = False
+        self.stm.drop()
+        self.play.setChecked(False)
+        self.play.toggle()
+
     def add_task_set(self):
         """
             Add a new task set to the task list.
@@ -712,15 +869,13 @@ class Ui_MainWindow(QMainWindow):
                 This method is responsible for extracting the values entered by the user for various task parameters,
                 creating a TaskSetData object, and adding it to the task list for future execution.
         """
-        sweep_param = TaskSetData.SweepParameter.none
-        match self.sweep_parameter.currentText():
-            case "None":
-                sweep_param = TaskSetData.SweepParameter.none
-            case "Bias":
-                sweep_param = TaskSetData.SweepParameter.bias
-            case "Size":
-                sweep_param = TaskSetData.SweepParameter.size
-        
+        try:
+            sweep = self.sweep()
+        except ValueError as e:
+            print(e)
+            return
+        first_axis = sweep.axes[0] if sweep.axes else SweepAxis(TaskSetData.SweepParameter.none, *[ExponentialNumber.default()] * 3)
+
         task_set_data = TaskSetData(name=self.task_set_name.text(),
                                     size=self.scan_size.value,
                                     x_offset=self.x_offset.value,
@@ -730,28 +885,22 @@ class Ui_MainWindow(QMainWindow):
                                     line_time=self.line_time.value,
                                     lines_per_frame=int(self.lines_per_frame.currentText()),
                                     repetitions=self.repetitions.value(),
-                                    sweep_parameter=sweep_param,
-                                    sweep_start=self.sweep_start.value,
-                                    sweep_stop=self.sweep_stop.value,
-                                    sweep_step=self.sweep_step.value,
+                                    sweep_parameter=first_axis.parameter,
+                                    sweep_start=first_axis.start,
+                                    sweep_stop=first_axis.stop,
+                                    sweep_step=first_axis.step,
                                     total_tasks=int(self.total_images.text().split(": ")[1]),
-                                    time_to_finish=self.time_to_finish.text().split(": ")[1])
+                                    time_to_finish=self.time_to_finish.text().split(": ")[1],
+                                    sweep_axes=sweep.axes,
+                                    sweep_order=sweep.order)
 
         self.task_set_list.add_task_set(task_set_data)
-        self.task_set_list.task_sets[-1].hover_preview.connect(self.task_rect_preview)
-        self.task_set_list.task_sets[-1].remove_preview.connect(self.remove_rect_preview)
 
-    def task_rect_preview(self, rects: list):
-        for rect_data in rects:
-            x, y, size = rect_data
-            self._rect_previews.append(RectPreview(QRect(x, y, size, size)))
-            self.scan_area.scene().addItem(self._rect_previews[-1])
+    def task_rect_preview(self, rects: np.ndarray):
+        self.scan_area.previews.show(rects)
 
     def remove_rect_preview(self):
-        if len(self._rect_previews) != 0 :
-            for rect in self._rect_previews:
-                self.scan_area.scene().removeItem(rect)
-        self._rect_previews = list()
+        self.scan_area.previews.hide()
 
     def paint_current_task_rect(self):
         size = self.current_task.inner.size.to_float() * 1e9
@@ -857,10 +1006,10 @@ class Ui_MainWindow(QMainWindow):
                 execution, the time required to capture each image (line time), and the number of repetitions for each
                 task set.
         """
-        if self.sweep_parameter.currentText() != 'None':
-            N = abs((self.sweep_start.value.to_float() - self.sweep_stop.value.to_float()) // self.sweep_step.value.to_float())
-        else:
-            N = 1
+        try:
+            N = len(self.sweep())
+        except ValueError:
+            N = 0
         N *= self.repetitions.value()
         total_time = 2 * self.line_time.value.to_float() * float(self.lines_per_frame.currentText()) * N
         
@@ -886,86 +1035,91 @@ class Ui_MainWindow(QMainWindow):
                 The total number of images is calculated based on the sweep range defined by the user (start, stop, and
                 step values) and the number of repetitions for each task set.
         """
-        if self.sweep_parameter.currentText() != 'None':
-            N = abs((self.sweep_start.value.to_float() - self.sweep_stop.value.to_float()) // self.sweep_step.value.to_float())
-        else:
-            N = 1
+        try:
+            N = len(self.sweep())
+        except ValueError:
+            N = 0
         N *= self.repetitions.value()
         self.total_images.setText(f"Total images: {int(N)}")
 
-    def set_sweep_enabled(self, value: bool):
+    def add_sweep_axis_input(self):
         """
-            Enable or disable sweep parameter widgets.
+            Add a row of sweep parameter widgets, so one more parameter can be swept, e.g. the bias of a grid of scan
+            positions swept by the X offset and Y offset rows.
 
-            This method enables or disables the widgets related to sweep parameters (start, stop, and step values) based on
-            the specified value.
-
-            Parameters:
-                value (bool): True to enable the sweep parameter widgets, False to disable them.
+            The new row sweeps nothing until a parameter is selected. Its changes update the estimated time to finish,
+            the total number of images and the sweep-related widgets, see `update_sweep_params`. Once there is a row per
+            parameter that can be swept, no more rows can be added.
         """
-        self.sweep_start.setEnabled(value)
-        self.sweep_stop.setEnabled(value)
-        self.sweep_step.setEnabled(value)
-
-    def set_sweep_units(self, units: str):
+        labels = ["Sweep parameter", "Second parameter", "Third parameter", "Fourth parameter", "Fifth parameter"]
+        sweep_axis_input = SweepAxisInput(labels[len(self.sweep_axis_inputs)])
+        sweep_axis_input.set_enabled(False)
+        sweep_axis_input.changed.connect(self.update_time_to_finish)
+        sweep_axis_input.changed.connect(self.update_total_images)
+        sweep_axis_input.parameter_changed.connect(self.update_sweep_params)
+        self.sweep_axis_inputs.append(sweep_axis_input)
+        self.sweep_axes_layout.addWidget(sweep_axis_input)
+        self.add_sweep_axis_btn.setEnabled(len(self.sweep_axis_inputs) < len(labels))
+
+    def sweep_axes(self) -> List[SweepAxis]:
         """
-            Set the units for sweep parameter widgets.
+            Get the swept parameters entered in the sweep parameter widgets.
 
-            This method sets the units for the sweep parameter widgets (start, stop, and step values) to the specified
-            units.
+            Y offsets are entered as shown in the scan area, with y pointing up, and are flipped like the Y offset of the
+            image parameters.
 
-            Parameters:
-                units (str): The units to set for the sweep parameter widgets.
+            Returns:
+                List[SweepAxis]: The swept parameters, in the order of the widgets. Empty if nothing is swept.
         """
-        self.sweep_start.setUnits(units)
-        self.sweep_stop.setUnits(units)
-        self.sweep_step.setUnits(units)
-
-    def set_sweep_vals(self, val: ExponentialNumber, lower: ExponentialNumber, upper: ExponentialNumber):
+        axes = list()
+        for sweep_axis_input in self.sweep_axis_inputs:
+            axis = sweep_axis_input.axis()
+            if axis is None:
+                continue
+            if axis.parameter is TaskSetData.SweepParameter.y_offset:
+                axis = SweepAxis(axis.parameter, -axis.start, -axis.stop, -axis.step)
+            axes.append(axis)
+        return axes
+
+    def sweep(self) -> Sweep:
         """
-            Set the bounds and initial value for sweep parameter widgets.
+            Get the sweep entered in the sweep parameter widgets.
 
-            This method sets the lower and upper bounds, as well as the initial value, for the sweep parameter widgets
-            (start, stop, and step values) based on the specified values.
+            Returns:
+                Sweep: The sweep of the swept parameters, in the selected order.
 
-            Parameters:
-                val (ExponentialNumber): The initial value for the sweep parameter widgets.
-                lower (ExponentialNumber): The lower bound for the sweep parameter widgets.
-                upper (ExponentialNumber): The upper bound for the sweep parameter widgets.
+            Raises:
+                ValueError: If a parameter is selected more than once, or an increment is zero.
         """
-        self.sweep_start.setBounds(lower, upper)
-        self.sweep_start.setValue(val.copy())
-        self.sweep_stop.setBounds(lower, upper)
-        self.sweep_stop.setValue(val.copy())
-        self.sweep_step.setBounds(lower, upper)
-        self.sweep_step.setValue(val.copy())
+        return Sweep(self.sweep_axes(), TaskSetData.SweepOrder[self.sweep_order.currentText().lower()])
 
     def update_sweep_params(self):
         """
-            Update the UI based on the selected sweep parameter.
+            Update the UI based on the selected sweep parameters.
 
-            This method is called when the user selects a different sweep parameter from the sweep parameter combo box. It
-            updates the UI to reflect the selected parameter's characteristics.
+            This method is called when the user selects a different parameter in one of the sweep parameter widgets. It
+            sets the bounds, units and initial values of that widget to those of the selected parameter, and disables the
+            image parameter widgets of the parameters that are swept.
 
             Note:
-                The sweep parameter defines the parameter to be swept during the task execution. It could be "None," "Bias,"
-                or "Size." Based on the selected parameter, this method enables or disables specific widgets accordingly.
-        """
-        sweep_param = self.sweep_parameter.currentText()
-        match sweep_param:
-            case "None":
-                self.set_sweep_enabled(False)
-                self.bias.setEnabled(True)
-                self.scan_size.setEnabled(True)
-            case "Bias":
-                self.bias.setEnabled(False)
-                self.scan_size.setEnabled(True)
-                self.set_sweep_enabled(True)
-                self.set_sweep_vals(self.bias.value, lower=ExponentialNumber(-5, 0), upper=ExponentialNumber(5, 0))
-                self.set_sweep_units("V")
-            case "Size":
-                self.bias.setEnabled(True)
-                self.scan_size.setEnabled(False)
-                self.set_sweep_enabled(True)
-                self.set_sweep_vals(self.scan_size.value, lower=ExponentialNumber(2.5, -12), upper=ExponentialNumber(3, -6))
-                self.set_sweep_units("m")
\ No newline at end of file
+                The sweep parameters define the parameters to be swept during the task execution. Each could be "None,"
+                "Bias," "Set point," "Size," "X offset" or "Y offset."
+        """
+        defaults = {TaskSetData.SweepParameter.bias: (self.bias, ExponentialNumber(-5, 0), ExponentialNumber(5, 0), "V"),
+                    TaskSetData.SweepParameter.set_point: (self.set_point, ExponentialNumber(-500, -9), ExponentialNumber(500, -9), "A"),
+                    TaskSetData.SweepParameter.size: (self.scan_size, ExponentialNumber(2.5, -12), ExponentialNumber(3, -6), "m"),
+                    TaskSetData.SweepParameter.x_offset: (self.x_offset, ExponentialNumber(-1.5, -6), ExponentialNumber(1.5, -6), "m"),
+                    TaskSetData.SweepParameter.y_offset: (self.y_offset, ExponentialNumber(-1.5, -6), ExponentialNumber(1.5, -6), "m")}
+
+        changed = self.sender()
+        for sweep_axis_input in self.sweep_axis_inputs:
+            parameter = sweep_axis_input.sweep_parameter()
+            sweep_axis_input.set_enabled(parameter is not TaskSetData.SweepParameter.none)
+            if parameter in defaults and changed in (sweep_axis_input, None):
+                (widget, lower, upper, units) = defaults[parameter]
+                sweep_axis_input.set_vals(widget.value, lower=lower, upper=upper)
+                sweep_axis_input.set_units(units)
+
+        swept = {sweep_axis_input.sweep_parameter() for sweep_axis_input in self.sweep_axis_inputs}
+        for (parameter, (widget, *_)) in defaults.items():
+            widget.setEnabled(parameter not in swept)
\ No newline at end of file
@@ -0,0 +1,129 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+from ui.widget.scanarea.pyramiditem import PyramidItem
+
+class OverlayManager(QObject):
+    """
+    Keeps track of the image overlays in a scan area scene and bounds the memory they use.
+
+    Overlays are keyed by the rect they cover, so a new image at the same rect replaces the old one instead of being
+    stacked on top of it. Only visible overlays hold a pixmap. When the pyramids held by all overlays exceed the memory
+    budget, off-screen overlays are unloaded to placeholders, least recently seen first. A placeholder that scrolls
+    into view emits 'reload_requested', so its image can be rendered again, e.g. from the frame cache.
+
+    Attributes:
+        reload_requested (Signal): Signal emitted with a placeholder PyramidItem that became visible.
+        budget (int): The maximum memory in bytes used by the pyramids and pixmaps of all overlays.
+        items (OrderedDict): The overlays keyed by their rect, least recently seen first.
+    """
+    reload_requested = Signal(object)
+
+    def __init__(self, scene: QGraphicsScene, budget: int = 128 * 2**20, *args, **kwargs):
+        """
+        Initialize the OverlayManager.
+
+        Args:
+            scene (QGraphicsScene): The scene the overlays are shown in.
+            budget (int): The maximum memory in bytes used by the overlays. Default is 128 MiB.
+        """
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+        self.items = OrderedDict()
+        self._scene = scene
+        self._scale = 1.
+        self._view = QRectF()
+
+    @staticmethod
+    def key(rect: QRectF) -> tuple:
+        """
+        The key of an overlay covering a rect. Rects that differ by less than a picometre share a key.
+
+        Args:
+            rect (QRectF): The rect in scene coordinates.
+
+        Returns:
+            tuple: The rounded position and size of the rect.
+        """
+        return tuple(round(v, 3) for v in (rect.x(), rect.y(), rect.width(), rect.height()))
+
+    def add(self, item: PyramidItem):
+        """
+        Add an overlay to the scene, replacing the one at the same rect.
+
+        Args:
+            item (PyramidItem): The overlay.
+        """
+        key = OverlayManager.key(item.rect())
+        old = self.items.pop(key, None)
+        if old is not None:
+            self._scene.removeItem(old)
+        item.on_demand = self.reload_requested.emit
+        self.items[key] = item
+        self._scene.addItem(item)
+        if self._view.intersects(item.rect()):
+            item.set_level_of_detail(self._scale)
+        self.enforce_budget()
+
+    def remove(self, item: PyramidItem):
+        """
+        Remove an overlay from the scene.
+
+        Args:
+            item (PyramidItem): The overlay.
+        """
+        key = OverlayManager.key(item.rect())
+        if self.items.get(key) is item:
+            del self.items[key]
+            self._scene.removeItem(item)
+
+    def clear(self):
+        """
+        Remove every overlay from the scene.
+        """
+        for item in self.items.values():
+            self._scene.removeItem(item)
+        self.items.clear()
+
+    def memory(self) -> int:
+        """
+        The memory used by the overlays.
+
+        Returns:
+            int: The size in bytes of all pyramids and pixmaps held.
+        """
+        return sum(item.pyramid_bytes() + item.pixmap_bytes() for item in self.items.values())
+
+    def update_view(self, view: QRectF, scale: float):
+        """
+        Update the overlays for a new view: visible ones show the level matching the zoom, off-screen ones drop their
+        pixmap.
+
+        Args:
+            view (QRectF): The visible part of the scene.
+            scale (float): The number of device pixels per scene unit.
+        """
+        self._view = QRectF(view)
+        self._scale = scale
+        for (key, item) in list(self.items.items()):
+            if view.intersects(item.rect()):
+                item.set_level_of_detail(scale)
+                self.items.move_to_end(key)
+            else:
+                item.release()
+        self.enforce_budget()
+
+    def enforce_budget(self):
+        """
+        Unload off-screen overlays to placeholders, least recently seen first, until the overlays fit the budget.
+        """
+        used = self.memory()
+        for item in list(self.items.values()):
+            if used <= self.budget:
+                break
+            if item.loaded and not self._view.intersects(item.rect()):
+                used -= item.pyramid_bytes() + item.pixmap_bytes()
+                item.unload()
@@ -0,0 +1,163 @@
+from typing import Callable, List
+
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+class PyramidItem(QGraphicsItem):
+    """
+    QGraphicsItem showing an image stored as a level-of-detail pyramid.
+
+    The pyramid holds the image at halving resolutions, largest first. Only the level that matches the current view
+    scale is converted to a QPixmap and kept, so an image seen from far away costs a few kilobytes of pixmap memory
+    instead of its full resolution. The view picks the level through 'set_level_of_detail' whenever its zoom changes.
+
+    An item can be unloaded to a placeholder, which drops its pyramid and pixmap and only draws its outline. When a
+    placeholder is painted, it asks for its image once through 'on_demand'.
+
+    Attributes:
+        pyramid (List[QImage]): The image at halving resolutions, largest first, or None while unloaded.
+        level (int): The index in 'pyramid' of the level currently shown, or None before one was picked.
+        task (TaskData): The task that acquired the image, or None.
+        fname (str): The path of the image file, or None.
+        on_demand (Callable): Called with the item when an unloaded item is painted, or None.
+    """
+
+    _placeholder_color = QColor(160, 160, 160)
+
+    def __init__(self, pyramid: List[QImage], rect: QRectF, task=None, fname: str = None, *args, **kwargs):
+        """
+        Initialize the PyramidItem.
+
+        Args:
+            pyramid (List[QImage]): The image at halving resolutions, largest first.
+            rect (QRectF): The rect the image covers in scene coordinates.
+            task (TaskData): The task that acquired the image. Default is None.
+            fname (str): The path of the image file. Default is None.
+        """
+        super().__init__(*args, **kwargs)
+        self.pyramid = pyramid
+        self.level = None
+        self.task = task
+        self.fname = fname
+        self.on_demand: Callable = None
+        self._rect = QRectF(rect)
+        self._pixmap = None
+        self._requested = False
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the item holds its pyramid, as opposed to being a placeholder.
+
+        Returns:
+            bool: True if the pyramid is held.
+        """
+        return self.pyramid is not None
+
+    def rect(self) -> QRectF:
+        """
+        The rect the image covers in scene coordinates.
+
+        Returns:
+            QRectF: The rect.
+        """
+        return QRectF(self._rect)
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(self._rect)
+
+    def level_for(self, scale: float) -> int:
+        """
+        Picks the smallest level that still has at least one image pixel per device pixel.
+
+        Args:
+            scale (float): The number of device pixels per scene unit.
+
+        Returns:
+            int: The index of the level in 'pyramid'.
+        """
+        pixels = self._rect.width() * scale
+        level = 0
+        while level + 1 < len(self.pyramid) and self.pyramid[level + 1].width() >= pixels:
+            level += 1
+        return level
+
+    def set_level_of_detail(self, scale: float):
+        """
+        Shows the level matching a view scale, converting it to a pixmap if it is not the one already shown.
+
+        Placeholders are left as they are.
+
+        Args:
+            scale (float): The number of device pixels per scene unit.
+        """
+        if not self.loaded:
+            return
+        level = self.level_for(scale)
+        if level != self.level or self._pixmap is None:
+            self.level = level
+            self._pixmap = QPixmap.fromImage(self.pyramid[level])
+            self.update()
+
+    def release(self):
+        """
+        Drops the pixmap of the level shown. It is made again by the next 'set_level_of_detail' or paint.
+        """
+        self._pixmap = None
+
+    def unload(self):
+        """
+        Drops the pyramid and the pixmap, turning the item into a placeholder.
+        """
+        self.pyramid = None
+        self._pixmap = None
+        self._requested = False
+        self.update()
+
+    def pixmap_bytes(self) -> int:
+        """
+        The memory used by the pixmap of the level shown.
+
+        Returns:
+            int: The size in bytes, 0 if no pixmap is held.
+        """
+        if self._pixmap is None:
+            return 0
+        return self._pixmap.width() * self._pixmap.height() * self._pixmap.depth() // 8
+
+    def pyramid_bytes(self) -> int:
+        """
+        The memory used by the pyramid.
+
+        Returns:
+            int: The size in bytes, 0 for a placeholder.
+        """
+        if self.pyramid is None:
+            return 0
+        return sum(image.sizeInBytes() for image in self.pyramid)
+
+    def paint(self, painter, option, widget=None):
+        """
+        Paint the level shown, stretched over the item's rect, or the outline of a placeholder.
+
+        Args:
+            painter (QPainter): The painter to use for painting.
+            option (QStyleOptionGraphicsItem): Style options for the item.
+            widget (QWidget): The widget to paint on.
+        """
+        if not self.loaded:
+            pen = QPen(PyramidItem._placeholder_color, 1.0, Qt.DashLine)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawRect(self._rect)
+            if self.on_demand is not None and not self._requested:
+                self._requested = True
+                self.on_demand(self)
+            return
+
+        if self._pixmap is None:
+            self.level = self.level_for(option.levelOfDetailFromTransform(painter.worldTransform()))
+            self._pixmap = QPixmap.fromImage(self.pyramid[self.level])
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawPixmap(self._rect, self._pixmap, QRectF(self._pixmap.rect()))
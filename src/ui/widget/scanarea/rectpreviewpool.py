@@ -0,0 +1,87 @@
+import numpy as np
+from typing import List
+
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+from ui.widget.scanarea.rectpreview import RectPreview
+
+class RectPreviewPool():
+    """
+    A reusable pool of RectPreview items previewing scan areas in a scan area scene.
+
+    Items are added to the scene once and then only moved, shown and hidden, so previewing the scan areas of a task
+    set creates no graphics item. The rects of the items are only set again when the previewed array changes; showing
+    the same array again only shows its items. Hidden items are only kept up to 'spare', so previewing a large task set
+    once does not leave its items in the scene for the rest of the session.
+
+    Attributes:
+        spare (int): The largest number of hidden items kept for reuse.
+        items (List[RectPreview]): The items of the pool, the first 'shown' of them visible.
+        shown (int): The number of visible items.
+    """
+
+    spare = 256
+
+    def __init__(self, scene: QGraphicsScene):
+        """
+        Initialize an empty RectPreviewPool.
+
+        Args:
+            scene (QGraphicsScene): The scene the previews are shown in.
+        """
+        self.items: List[RectPreview] = list()
+        self.shown = 0
+        self._scene = scene
+        self._rects: np.ndarray = None
+
+    def show(self, rects: np.ndarray):
+        """
+        Preview scan areas, in place of the ones previewed so far.
+
+        Args:
+            rects (np.ndarray): One (x, y, size) row per scan area, in nanometres.
+        """
+        while len(self.items) < len(rects):
+            item = RectPreview(QRectF())
+            item.setVisible(False)
+            self._scene.addItem(item)
+            self.items.append(item)
+
+        if rects is not self._rects:
+            self._rects = rects
+            for (item, (x, y, size)) in zip(self.items, rects.tolist()):
+                item.setRect(x, y, size, size)
+
+        for item in self.items[self.shown:len(rects)]:
+            item.setVisible(True)
+        for item in self.items[len(rects):self.shown]:
+            item.setVisible(False)
+        self.shown = len(rects)
+        self._trim(max(self.shown, RectPreviewPool.spare))
+
+    def hide(self):
+        """
+        Hide every preview.
+        """
+        for item in self.items[:self.shown]:
+            item.setVisible(False)
+        self.shown = 0
+        self._trim(RectPreviewPool.spare)
+
+    def _trim(self, count: int):
+        """
+        Remove the items after the first ones from the scene and the pool.
+
+        Args:
+            count (int): The number of items to keep.
+        """
+        if len(self.items) <= count:
+            return
+        for item in self.items[count:]:
+            self._scene.removeItem(item)
+        del self.items[count:]
+        if self._rects is not None and len(self._rects) > count:
+            # The removed items held part of the previewed array, so its rects are set again when it is shown next
+            self._rects = None
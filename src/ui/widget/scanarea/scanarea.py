@@ -11,6 +11,9 @@ from ui.widget.scanarea.specline import SpecLineItem
 from ui.widget.scanarea.speclinehandle import SpecLineHandle
 from ui.widget.scanarea.scantoolbar import ScanAreaToolBar
 from ui.widget.scanarea.toolmode import ToolMode
+from ui.widget.scanarea.pyramiditem import PyramidItem
+from ui.widget.scanarea.overlaymanager import OverlayManager
+from ui.widget.scanarea.rectpreviewpool import RectPreviewPool
 
 class GraphicsScene(QGraphicsScene):
     adjust_spec_line = Signal(float)
@@ -25,6 +28,8 @@ class ScanArea(QGraphicsView):
     Attributes:
         scan_rect_moved (Signal): Signal emitted when the scan rectangle is moved.
         scan_rect_resized (Signal): Signal emitted when the scan rectangle is resized.
+        overlays (OverlayManager): The image overlays shown in the scan area.
+        previews (RectPreviewPool): The previews of the scan areas of a task set.
     """
     scan_rect_moved = Signal()
     scan_rect_resized = Signal()
@@ -43,6 +48,8 @@ class ScanArea(QGraphicsView):
         self._zoom = 0
         self._size = size
         self._scene = GraphicsScene()
+        self.overlays = OverlayManager(self._scene, parent=self)
+        self.previews = RectPreviewPool(self._scene)
         self._scene.setSceneRect(QRect(-size/2, -size/2, size, size))
         self.setScene(self._scene)
         
@@ -105,6 +112,7 @@ class ScanArea(QGraphicsView):
         min_size = min(self.rect().width(), self.rect().height())
         self.resize(min_size, min_size)
         self.fitInView(self._current_view, Qt.KeepAspectRatio)
+        self.update_level_of_detail()
 
     def wheelEvent(self, event):
         """
@@ -140,6 +148,7 @@ class ScanArea(QGraphicsView):
 
         self.update_current_view()
         self.update_toolbar()
+        self.update_level_of_detail()
 
     def showEvent(self, event):
         """
@@ -198,8 +207,35 @@ class ScanArea(QGraphicsView):
         if self._new_spec_line:
             self._new_spec_line = False
         self.update_current_view()
+        self.update_level_of_detail()
         return super().mouseReleaseEvent(event)
     
+    def add_overlay(self, item: PyramidItem):
+        """
+        Add an image overlay to the scene through 'overlays', replacing the overlay at the same rect.
+
+        Args:
+            item (PyramidItem): The overlay.
+        """
+        self.overlays.add(item)
+
+    def device_scale(self) -> float:
+        """
+        The number of device pixels per scene unit in the current view.
+
+        Returns:
+            float: The scale.
+        """
+        return self.transform().m11() * self.devicePixelRatioF()
+
+    def update_level_of_detail(self):
+        """
+        Update the overlays for the current view: visible ones show the pyramid level matching the zoom, off-screen
+        ones release their pixmaps.
+        """
+        view = self.mapToScene(self.viewport().rect()).boundingRect()
+        self.overlays.update_view(view, self.device_scale())
+
     def update_current_view(self):
         """
         Update the current view.
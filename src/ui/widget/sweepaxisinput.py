@@ -0,0 +1,135 @@
+from PySide6.QtCore import *
+from PySide6.QtWidgets import *
+
+from core.exponentialnumber import ExponentialNumber
+from core.tasksetdata import TaskSetData
+from core.sweepaxis import SweepAxis
+from ui.widget.scientificspinbox import ScientificSpinBox
+
+class SweepAxisInput(QWidget):
+    """
+        Input fields for one swept parameter: the parameter, and the initial value, final value and increment of its sweep.
+
+        Class attributes:
+            parameters (dict): The SweepParameter of every entry of the parameter combo box, keyed by its text.
+            changed (Signal): Signal emitted when the parameter or any value of the sweep changes.
+            parameter_changed (Signal): Signal emitted when the parameter changes.
+
+        Attributes:
+            parameter (QComboBox): The parameter to sweep.
+            start (ScientificSpinBox): The initial value of the sweep.
+            stop (ScientificSpinBox): The final value of the sweep.
+            step (ScientificSpinBox): The increment of the sweep.
+
+        Methods:
+            sweep_parameter() -> SweepParameter: The parameter selected.
+            axis() -> SweepAxis: The sweep entered.
+            set_enabled(value: bool): Enables or disables the value fields.
+            set_units(units: str): Sets the units of the value fields.
+            set_vals(val: ExponentialNumber, lower: ExponentialNumber, upper: ExponentialNumber): Sets the value fields.
+    """
+    parameters = {"None": TaskSetData.SweepParameter.none,
+                  "Bias": TaskSetData.SweepParameter.bias,
+                  "Set point": TaskSetData.SweepParameter.set_point,
+                  "Size": TaskSetData.SweepParameter.size,
+                  "X offset": TaskSetData.SweepParameter.x_offset,
+                  "Y offset": TaskSetData.SweepParameter.y_offset}
+
+    changed = Signal()
+    parameter_changed = Signal()
+
+    def __init__(self, label: str = "Sweep parameter", *args, **kwargs):
+        """
+            Initialize the SweepAxisInput.
+
+            Args:
+                label (str): The label of the parameter combo box. Default is "Sweep parameter".
+        """
+        super().__init__(*args, **kwargs)
+
+        self.parameter = QComboBox()
+        self.parameter.addItems(list(SweepAxisInput.parameters))
+        self.parameter.setCurrentText("None")
+
+        self.start = ScientificSpinBox()
+        self.stop = ScientificSpinBox()
+        self.step = ScientificSpinBox()
+        self.set_vals(ExponentialNumber(200, -3), lower=ExponentialNumber(-5, 0), upper=ExponentialNumber(5, 0))
+        self.stop.setValue(ExponentialNumber(1, 0))
+        self.step.setValue(ExponentialNumber(100, -3))
+        self.set_units('V')
+
+        widgets = [(QLabel(label), self.parameter),
+                   (QLabel("Initial value"), self.start),
+                   (QLabel("Final value"), self.stop),
+                   (QLabel("Increment"), self.step)]
+        layout = QGridLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        for (i, (label_widget, widget)) in enumerate(widgets):
+            layout.addWidget(label_widget, i, 0, 1, 1)
+            layout.addWidget(widget, i, 1, 1, 1)
+
+        self.parameter.currentIndexChanged.connect(self.parameter_changed)
+        self.parameter.currentIndexChanged.connect(self.changed)
+        for widget in (self.start, self.stop, self.step):
+            widget.value_changed.connect(self.changed)
+
+    def sweep_parameter(self) -> TaskSetData.SweepParameter:
+        """
+            The parameter selected.
+
+            Returns:
+                SweepParameter: The parameter, 'none' if nothing is swept.
+        """
+        return SweepAxisInput.parameters[self.parameter.currentText()]
+
+    def axis(self) -> SweepAxis:
+        """
+            The sweep entered, with the values as shown in the fields. The sign of the increment does not matter, the sweep
+            runs from the initial value towards the final value, see 'SweepAxis'.
+
+            Returns:
+                SweepAxis: The sweep, or None if no parameter is selected.
+        """
+        parameter = self.sweep_parameter()
+        if parameter is TaskSetData.SweepParameter.none:
+            return None
+        return SweepAxis(parameter, self.start.value, self.stop.value, self.step.value)
+
+    def set_enabled(self, value: bool):
+        """
+            Enable or disable the initial value, final value and increment fields.
+
+            Args:
+                value (bool): True to enable the fields, False to disable them.
+        """
+        self.start.setEnabled(value)
+        self.stop.setEnabled(value)
+        self.step.setEnabled(value)
+
+    def set_units(self, units: str):
+        """
+            Set the units of the initial value, final value and increment fields.
+
+            Args:
+                units (str): The units.
+        """
+        self.start.setUnits(units)
+        self.stop.setUnits(units)
+        self.step.setUnits(units)
+
+    def set_vals(self, val: ExponentialNumber, lower: ExponentialNumber, upper: ExponentialNumber):
+        """
+            Set the bounds and initial value of the initial value, final value and increment fields.
+
+            Args:
+                val (ExponentialNumber): The initial value of the fields.
+                lower (ExponentialNumber): The lower bound of the fields.
+                upper (ExponentialNumber): The upper bound of the fields.
+        """
+        self.start.setBounds(lower, upper)
+        self.start.setValue(val.copy())
+        self.stop.setBounds(lower, upper)
+        self.stop.setValue(val.copy())
+        self.step.setBounds(lower, upper)
+        self.step.setValue(val.copy())
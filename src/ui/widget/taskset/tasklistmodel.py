@@ -0,0 +1,142 @@
+import numpy as np
+from typing import List
+
+from PySide6.QtCore import *
+
+from core.taskrow import TaskRow
+from core.tasktable import TaskTable
+
+class TaskListModel(QAbstractListModel):
+    """
+    List model of the tasks of a TaskSet, with a check box per task.
+
+    The check state of every task lives in the model as boolean arrays, one entry per task, so the scheduler reads
+    which tasks to run without going through any widget and a view only asks for the rows it draws. The text of a row
+    is made from the task table when the row is drawn.
+
+    Attributes:
+        check_changed (Signal): Emitted when the user checks or unchecks a task.
+        tasks (TaskTable): The tasks listed.
+        swept (List[str]): The names of the swept parameters, shown for every task.
+        checked (np.ndarray): Whether each task is checked.
+        enabled (np.ndarray): Whether each task can still be checked or unchecked.
+
+    Methods:
+        task_text(task: TaskRow, swept: List[str]) -> str: The text describing a task.
+        is_checked(i: int) -> bool: Whether a task is checked.
+        checked_count() -> int: Counts the checked tasks.
+        set_enabled(i: int, enabled: bool): Enables or disables the check box of a task.
+        disable_unchecked(): Disables the check boxes of the unchecked tasks.
+    """
+
+    check_changed = Signal()
+
+    _parameter_labels = {'bias': ('Bias', 'V'),
+                         'set_point': ('Set point', 'A'),
+                         'size': ('Size', 'm'),
+                         'x_offset': ('X offset', 'm'),
+                         'y_offset': ('Y offset', 'm')}
+
+    def __init__(self, tasks: TaskTable, swept: List[str], *args, **kwargs):
+        """
+        Initialize the TaskListModel with every task checked and enabled.
+
+        Args:
+            tasks (TaskTable): The tasks to list.
+            swept (List[str]): The names of the swept parameters.
+        """
+        super().__init__(*args, **kwargs)
+        self.tasks = tasks
+        self.swept = swept
+        self.checked = np.ones(len(tasks), dtype=bool)
+        self.enabled = np.ones(len(tasks), dtype=bool)
+
+    @staticmethod
+    def task_text(task: TaskRow, swept: List[str]) -> str:
+        """
+        The text describing a task by the values of its swept parameters.
+
+        Args:
+            task (TaskRow): The task.
+            swept (List[str]): The names of the swept parameters.
+
+        Returns:
+            str: The label and value of every swept parameter, separated by commas.
+        """
+        texts = list()
+        for name in swept:
+            (label, units) = TaskListModel._parameter_labels[name]
+            value = getattr(task.inner, name)
+            texts.append(f'{label}: {-value if name == "y_offset" else value}{units}')
+        return ', '.join(texts)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+        match role:
+            case Qt.DisplayRole:
+                return TaskListModel.task_text(self.tasks[index.row()], self.swept)
+            case Qt.CheckStateRole:
+                return Qt.Checked if self.checked[index.row()] else Qt.Unchecked
+        return None
+
+    def setData(self, index: QModelIndex, value: object, role: int = Qt.EditRole) -> bool:
+        if not index.isValid() or role != Qt.CheckStateRole or not self.enabled[index.row()]:
+            return False
+        checked = Qt.CheckState(value) == Qt.Checked
+        if checked != self.checked[index.row()]:
+            self.checked[index.row()] = checked
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.check_changed.emit()
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self.enabled[index.row()]:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsUserCheckable
+
+    def is_checked(self, i: int) -> bool:
+        """
+        Whether a task is checked.
+
+        Args:
+            i (int): The index of the task.
+
+        Returns:
+            bool: True if the task is checked.
+        """
+        return bool(self.checked[i])
+
+    def checked_count(self) -> int:
+        """
+        Counts the checked tasks.
+
+        Returns:
+            int: The number of checked tasks.
+        """
+        return int(np.count_nonzero(self.checked))
+
+    def set_enabled(self, i: int, enabled: bool):
+        """
+        Enables or disables the check box of a task, e.g. once it has been completed.
+
+        Args:
+            i (int): The index of the task.
+            enabled (bool): True to let the user check or uncheck the task.
+        """
+        self.enabled[i] = enabled
+        index = self.index(i)
+        self.dataChanged.emit(index, index)
+
+    def disable_unchecked(self):
+        """
+        Disables the check boxes of the unchecked tasks, once they have been left out of a run.
+        """
+        self.enabled &= self.checked
+        if len(self.tasks) > 0:
+            self.dataChanged.emit(self.index(0), self.index(len(self.tasks) - 1))
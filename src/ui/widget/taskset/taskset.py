@@ -1,299 +1,191 @@
 import numpy as np
-from typing import Callable, List
+from typing import Iterator
 
-from PySide6 import QtCore
-from PySide6.QtGui import *
 from PySide6.QtCore import *
-from PySide6.QtWidgets import *
-import qtawesome as fa
 
-from core.exponentialnumber import ExponentialNumber
 from core.tasksetdata import TaskSetData
-from core.taskdata import TaskData
-from core.imagedata import ImageData
+from core.sweep import Sweep
+from core.taskrow import TaskRow
+from core.tasktable import TaskTable
 
-from ui.widget.taskset.tasksetbar import TaskSetBar
-from ui.widget.taskset.tasksetinput import TaskSetInput
-from ui.widget.taskset.tasksetinfo import TaskSetInfo
+from ui.widget.taskset.tasklistmodel import TaskListModel
 from ui.widget.taskset.tasksetstatus import TaskSetStatus
 
-class TaskSet(QWidget):
+class TaskSet(QObject):
     """
-        Widget representing a TaskSet.
+        A task set of the queue.
 
-        This widget represents a TaskSet, which contains multiple tasks to be executed.
+        A TaskSet holds the tasks of a task set, their check states and its progress, and pulls the tasks to run. It is
+        not a widget: the queue shows every task set as a row of a TaskSetQueueModel painted by a TaskSetDelegate, and
+        the widgets detailing a task set are only made while it is expanded, so a queue of hundreds of task sets costs
+        a few objects per set.
 
         Attributes:
-            Status (Enum): An enumeration representing the status of the TaskSet (Ready, Working, Finished, or Error).
-            status (Status): The current status of the TaskSet.
-            index (int): The index of the TaskSet.
+            changed (Signal): Emitted when the name, status or progress of the TaskSet changes.
+            name (str): The name of the TaskSet.
+            status (TaskSetStatus): The current status of the TaskSet.
+            index (int): The index of the TaskSet in the queue.
             data (TaskSetData): The data associated with the TaskSet.
-            tasks (List[TaskData]): A list of TaskData objects representing individual tasks in the TaskSet.
-            todo (List[TaskData]): A list of tasks that are yet to be completed.
-            total_todo (int): The total number of tasks to be completed.
-            dropFunc (Callable): A function to call when the TaskSet is dropped.
-            _selected (bool): A flag indicating whether the TaskSet is selected (expanded).
-            _content (QWidget): The content widget containing the TaskSet's information.
-            _task_bar (TaskSetBar): The progress bar for the TaskSet.
-            _icon (QLabel): An icon label representing the TaskSet.
-            _name (TaskSetInput): The name input field for the TaskSet.
-            _drag (QLabel): A drag icon label for the TaskSet.
-            _remove_task_set_btn (QPushButton): A button to remove the TaskSet.
-            _info (TaskSetInfo): The widget displaying detailed information about the TaskSet.
-            _content_layout (QGridLayout): The layout for the content widget.
-            _layout (QGridLayout): The main layout for the TaskSet widget.
-            _task_bar_hover_anim (QPropertyAnimation): Animation for the progress bar on hover.
-            _info_anim (QParallelAnimationGroup): Animation group for expanding/collapsing the detailed information.
+            tasks (TaskTable): The table of the individual tasks in the TaskSet.
+            model (TaskListModel): The tasks and their check states.
+            total_todo (int): The total number of tasks to be completed, counted again whenever a task is checked or
+            unchecked.
+            progress (float): The fraction of the tasks to be completed that are completed, from 0.0 to 1.0.
+            preview_rects (np.ndarray): One (x, y, size) row per distinct scan area of the tasks, in nanometres, as
+            previewed when the TaskSet is hovered. It is computed once, with the tasks.
     """
-    hover_preview = Signal(list)
-    remove_preview = Signal()
-    # selected_preview = Signal(list)
-    # remove_selected_preview = Signal()
+    changed = Signal()
 
-    def __init__(self, name: str, data: TaskSetData, idx: int, dropFunc: Callable):
+    def __init__(self, name: str, data: TaskSetData, idx: int, *args, **kwargs):
         """
-            Initialize the TaskSet widget.
+            Initialize the TaskSet.
 
             Args:
                 name (str): The name of the TaskSet.
                 data (TaskSetData): The data associated with the TaskSet.
-                idx (int): The index of the TaskSet.
-                dropFunc (Callable): A function to call when the TaskSet is dropped.
+                idx (int): The index of the TaskSet in the queue.
         """
-        super().__init__()
+        super().__init__(*args, **kwargs)
+        self.name = name
         self.status = TaskSetStatus.Ready
         self.index = idx
         self.data = data
-        self.tasks: List[TaskData] = self.create_tasks(data)
-        self.todo: List[TaskData] = list()
+        self.tasks: TaskTable = self.create_tasks(data)
+        self.model = TaskListModel(self.tasks, [axis.parameter.name for axis in data.axes()], self)
+        self.model.check_changed.connect(self.checks_changed)
+        self.preview_rects = self.compute_preview_rects()
         self.total_todo = 1
-        self.dropFunc = dropFunc
-        self._selected = False
-
-        self.setMaximumHeight(60)
-        self._content = QWidget()
-        self._task_bar = TaskSetBar()
-        self._task_bar.updateColor(self.status)
-        self._icon = QLabel(pixmap=fa.icon('fa5.circle', color='black').pixmap(24, 24))
-        self._icon.setFixedWidth(24)
-        self._name = TaskSetInput(name)
-        self._name.textChanged.connect(self.adjustTextWidth)
-        self._name.setStyleSheet('QLineEdit { background: transparent; color: black; border: 0px;}')
-        self._drag = QLabel(pixmap=fa.icon('fa5s.ellipsis-v', color='black').pixmap(24,24))
-        self._drag.setFixedWidth(20)
-        self._content.setFixedHeight(self._task_bar.rect().height())
-
-        self._content_layout = QGridLayout(self._content)
-        self._content_layout.addWidget(self._task_bar, 0, 0, 3, 7)
-        self._content_layout.addItem(QSpacerItem(10, 60), 1, 0)
-        self._content_layout.addWidget(self._icon, 1, 1)
-        self._content_layout.addItem(QSpacerItem(10, 60, QSizePolicy.Expanding, QSizePolicy.Expanding), 1, 2)
-        self._content_layout.addWidget(self._name, 1, 3)
-        self._content_layout.addItem(QSpacerItem(10, 60, QSizePolicy.Expanding, QSizePolicy.Expanding), 1, 4)
-        self._content_layout.addWidget(self._drag, 1, 5)
-        self._content_layout.addItem(QSpacerItem(10, 60), 1, 6)
-        self._content_layout.setContentsMargins(0,0,0,0)
-        
-        self._remove_task_set_btn = QPushButton("Remove Task Set")
-        self._remove_task_set_btn.clicked.connect(self.dropSelf)
-        self._info = TaskSetInfo(self.data, self.tasks, self._remove_task_set_btn)
-
-        self._layout = QGridLayout(self)
-        self._layout.addWidget(self._info, 1, 0)
-        self._layout.addWidget(self._content, 0, 0)
-        self._layout.setSpacing(0)
-        self._layout.setContentsMargins(0,0,0,0)
-
-        self.installEventFilter(self)
-
-        self._task_bar_hover_anim = QPropertyAnimation(self._task_bar, b"paint_rect")
-        self._task_bar_hover_anim.setDuration(100)
-        
-        self._info_anim = QParallelAnimationGroup(self)
-        self.setInfoAnimation()
-        
-    def create_tasks(self, data: TaskSetData) -> List[TaskData]:
+        self.progress = 0.0
+        self._cursor = 0
+
+    @staticmethod
+    def create_tasks(data: TaskSetData) -> TaskTable:
         """
             Create tasks based on the TaskSetData.
 
+            This does not depend on the widget, so tasks can be built without a running QApplication. The tasks are
+            the points of the sweep of the task set, in its order, as the rows of a TaskTable. Rows are only computed
+            when they are read, so this takes the same time whatever the length of the sweep.
+
             Args:
                 data (TaskSetData): The data associated with the TaskSet.
 
             Returns:
-                List[TaskData]: A list of TaskData objects representing individual tasks in the TaskSet.
+                TaskTable: The table of the individual tasks in the TaskSet.
         """
-        tasks = list()
-        match data.sweep_parameter:
-            case TaskSetData.SweepParameter.none:
-                img = ImageData(data)
-                tasks.append(TaskData(inner=img, dtype=TaskData.TaskType.Image, completed=False, index=0))
-            case TaskSetData.SweepParameter.bias:
-                bias_range = np.arange(start=data.sweep_start.to_float(), stop=data.sweep_stop.to_float() + data.sweep_step.to_float(), step=data.sweep_step.to_float()) 
-                for i, bias in enumerate(bias_range):
-                    img = ImageData(data)
-                    img.bias = ExponentialNumber.from_float(bias)
-                    tasks.append(TaskData(inner=img, dtype=TaskData.TaskType.Image, completed=False, index=i))
-            case TaskSetData.SweepParameter.size:
-                size_range = np.arange(start=data.sweep_start.to_float(), stop=data.sweep_stop.to_float() + data.sweep_step.to_float(), step=data.sweep_step.to_float())
-                for i, size in enumerate(size_range):
-                    img = ImageData(data)
-                    img.size = ExponentialNumber.from_float(size)
-                    tasks.append(TaskData(inner=img, dtype=TaskData.TaskType.Image, completed=False, index=i))
-
-        return tasks
-
-    def setInfoAnimation(self):
+        return TaskTable(data, Sweep.from_data(data))
+
+    def compute_preview_rects(self) -> np.ndarray:
         """
-            Set up the animation for expanding/collapsing the detailed information.
+            Compute the scan areas previewed when the TaskSet is hovered.
 
             Returns:
-                None
+                np.ndarray: One (x, y, size) row per distinct scan area of the tasks, in nanometres.
         """
-        self._info_anim.clear()
-        self._info_anim.addAnimation(QPropertyAnimation(self, b"minimumHeight"))
-        self._info_anim.addAnimation(QPropertyAnimation(self, b"maximumHeight"))
-        self._info_anim.addAnimation(QPropertyAnimation(self._info, b"maximumHeight"))
-        
-        collapsed_height = self.sizeHint().height() - self._info.maximumHeight()
-        content_height = self._info._layout.sizeHint().height()
-
-        anims = [self._info_anim.animationAt(i) for i in range(self._info_anim.animationCount())]
-        for anim in anims[:-1]:
-            anim.setDuration(250)
-            anim.setStartValue(collapsed_height)
-            anim.setEndValue(collapsed_height + content_height)  
-        anims[-1].setStartValue(0)
-        anims[-1].setEndValue(content_height)
-
-        self._name.elideText()
+        rects = self.tasks.rects()
+        if {axis.parameter.name for axis in self.data.axes()}.isdisjoint(('size', 'x_offset', 'y_offset')):
+            return rects[:1]
+        return np.unique(rects, axis=0)
 
-    def setStatus(self, status: TaskSetStatus):
+    def prepare(self):
         """
-            Set the status of the TaskSet.
+            Prepare the TaskSet to be run: the unchecked tasks are left out and can no longer be checked.
 
-            Args:
-                status (Status): The new status of the TaskSet.
+            Returns:
+                None
+        """
+        self.model.disable_unchecked()
+        self.total_todo = max(self.model.checked_count(), 1)
+
+    def checks_changed(self):
+        """
+            Count the tasks to be completed again once a task is checked or unchecked, which is still possible for the
+            tasks to do during a run.
 
             Returns:
                 None
         """
-        self.status = status
-        self._task_bar.updateColor(status)
+        self.total_todo = max(self.model.checked_count(), 1)
         self.update_task_bar()
 
-    def eventFilter(self, obj, ev):
+    def pending(self, start: int = None) -> Iterator[TaskRow]:
         """
-            Filter and handle events.
+            Iterate lazily over the checked tasks that are still to do.
+
+            The checked tasks are read from the check state bitmap of the task list model, so no widget is involved.
 
             Args:
-                obj: The object that triggered the event.
-                ev: The event.
+                start (int): The index of the first task to consider. Default is None, for the current task.
 
             Returns:
-                bool: True if the event is handled; False otherwise.
+                Iterator[TaskRow]: The tasks, in task order. Each one is only made when it is pulled.
         """
-        if ev.type() == QtCore.QEvent.Enter:
-            if not self._selected:
-                self._task_bar_hover_anim.setEndValue(self._task_bar.rect())
-                self._task_bar_hover_anim.start()
-
-            rects = []
-            if self.data.sweep_parameter is TaskSetData.SweepParameter.size:
-                for task in self.tasks:
-                    rect_size = task.inner.size.to_float() * 1e9
-                    rect_x = task.inner.x_offset.to_float() * 1e9 - (rect_size / 2)
-                    rect_y = task.inner.y_offset.to_float() * 1e9 - (rect_size / 2) 
-                    rects.append((rect_x, rect_y, rect_size))    
-            else:
-                if len(self.tasks) > 0:
-                    rect_size = self.tasks[0].inner.size.to_float() * 1e9
-                    rect_x = self.tasks[0].inner.x_offset.to_float() * 1e9 - (rect_size / 2)
-                    rect_y = self.tasks[0].inner.y_offset.to_float() * 1e9 - (rect_size / 2)
-                    rects.append((rect_x, rect_y, rect_size))
-
-            self.hover_preview.emit(rects)
-
-        if ev.type() == QtCore.QEvent.Leave:
-            if not self._selected:
-                self._task_bar_hover_anim.setEndValue(QRect(self._task_bar._padding, self._task_bar._padding, self._content.size().width() - 2*self._task_bar._padding, self._content.size().height() - 2*self._task_bar._padding))
-                self._task_bar_hover_anim.start()
-            self.remove_preview.emit()
-            
-        if ev.type() == QtCore.QEvent.MouseButtonPress:
-            self._lastpos = ev.pos()
-            
-        if ev.type() == QtCore.QEvent.MouseButtonRelease:
-            widget_on_press = obj.childAt(ev.pos())
-            widget_on_release = obj.childAt(self._lastpos)
-            
-            if widget_on_press == self._task_bar and widget_on_press == widget_on_release:
-                if not self._selected:
-                    self._selected = True
-                    self._info_anim.setDirection(QtCore.QAbstractAnimation.Forward)
-                    self._task_bar._vertical_margin = 10
-                else:
-                    self._selected = False
-                    self._info_anim.setDirection(QtCore.QAbstractAnimation.Backward)
-                    self._task_bar._vertical_margin = 0
-                    
-                self._info_anim.start()
-
-        return False
-    
-    def adjustTextWidth(self):
+        start = self._cursor if start is None else start
+        for i in np.flatnonzero(self.model.checked[start:]) + start:
+            if self.tasks.status(int(i)) is TaskTable.Status.todo:
+                yield self.tasks[int(i)]
+
+    def next_task(self, after: TaskRow = None) -> TaskRow:
         """
-            Adjust the width of the name input field based on the text size.
+            Get the next checked task that is still to do.
+
+            Without 'after', this is the task to run now, and the tasks before it are not considered again.
+
+            Args:
+                after (TaskRow): The task to look after. Default is None.
 
             Returns:
-                None
+                TaskRow: The task, or None if there is none.
         """
-        width = self._name.fontMetrics().boundingRect(self._name.text()).width()
-        padding = 25
-        fixedWidth = min(width + padding, 0.6 * self.rect().width())
-        self._name.setFixedWidth(fixedWidth)
+        task = next(self.pending(None if after is None else after.index + 1), None)
+        if after is None and task is not None:
+            self._cursor = task.index
+        return task
 
-    def update_task_bar(self):
+    def setName(self, name: str):
         """
-            Update the progress bar representing the completion of tasks.
+            Set the name of the TaskSet.
+
+            Args:
+                name (str): The new name.
 
             Returns:
                 None
         """
-        completed_tasks = [task for task in self.tasks if task.completed]
-        val = len(completed_tasks) / self.total_todo
-        self._task_bar.value = val
-        self._task_bar.repaint()
+        self.name = name
+        self.changed.emit()
 
-    def setIndex(self, i):
+    def setStatus(self, status: TaskSetStatus):
         """
-            Set the index of the TaskSet.
+            Set the status of the TaskSet.
 
             Args:
-                i (int): The new index.
+                status (Status): The new status of the TaskSet.
 
             Returns:
                 None
         """
-        self.index = i
+        self.status = status
+        self.update_task_bar()
 
-    def dropSelf(self):
+    def update_task_bar(self):
         """
-            Remove the TaskSet.
+            Update the progress of the TaskSet, shown by its task bar.
 
             Returns:
                 None
         """
-        self.dropFunc(self.index)
+        self.progress = self.tasks.completed_count() / self.total_todo
+        self.changed.emit()
 
-    def resizeEvent(self, event) -> None:
+    def setIndex(self, i):
         """
-            Event handler for resizing the widget.
+            Set the index of the TaskSet.
 
             Args:
-                event: The resize event.
+                i (int): The new index.
 
             Returns:
                 None
         """
-        self.adjustTextWidth()
-        return super().resizeEvent(event)
+        self.index = i
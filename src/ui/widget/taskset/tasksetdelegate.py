@@ -0,0 +1,132 @@
+from PySide6 import QtGui
+from PySide6.QtGui import *
+from PySide6.QtCore import *
+from PySide6.QtWidgets import *
+import qtawesome as fa
+
+from ui.widget.taskset.tasksetinput import TaskSetInput
+from ui.widget.taskset.tasksetqueuemodel import TaskSetQueueModel
+from ui.widget.taskset.tasksetstatus import TaskSetStatus
+
+class TaskSetDelegate(QStyledItemDelegate):
+    """
+    Item delegate painting the rows of the queue of task sets.
+
+    Every row is painted as the progress bar of its TaskSet: a rounded rectangle colored by the status of the set,
+    filled up to its progress, with an icon, the name of the set and a drag handle. Nothing is kept per row, so the
+    rows of a long queue cost nothing until they are painted. The bar grows to the full row when the row is hovered or
+    selected. The name is edited in place with a TaskSetInput.
+
+    Attributes:
+        height (int): The height of a row.
+        _padding (int): The padding around the bar of a row that is neither hovered nor selected.
+        _icon (QPixmap): The icon drawn left of the name.
+        _drag (QPixmap): The drag handle drawn right of the name.
+    """
+
+    height = 60
+
+    def __init__(self, padding=5, *args, **kwargs):
+        """
+        Initialize the TaskSetDelegate.
+
+        Args:
+            padding (int, optional): The padding around the bar of a row. Defaults to 5.
+        """
+        super().__init__(*args, **kwargs)
+        self._padding = padding
+        self._icon = fa.icon('fa5.circle', color='black').pixmap(24, 24)
+        self._drag = fa.icon('fa5s.ellipsis-v', color='black').pixmap(24, 24)
+
+    @staticmethod
+    def colors(status: TaskSetStatus) -> tuple:
+        """
+        The colors of the bar of a task set.
+
+        Args:
+            status (TaskSetStatus): The status of the task set.
+
+        Returns:
+            tuple: The background color and the color of the completed portion of the bar.
+        """
+        match (status):
+            case TaskSetStatus.Working:
+                return (QColor(102, 157, 246), QColor(91, 141, 221))
+            case TaskSetStatus.Finished:
+                return (QColor(66, 219, 99), QColor(66, 219, 99))
+            case TaskSetStatus.Error:
+                return (QColor(255, 78, 78), QColor(255, 41, 41))
+        return (QColor(235, 235, 235), QColor(200, 200, 200))
+
+    def _name_rect(self, rect: QRect) -> QRect:
+        """
+        The rectangle of the name in a row, between the icon and the drag handle.
+
+        Args:
+            rect (QRect): The rectangle of the row.
+
+        Returns:
+            QRect: The rectangle of the name.
+        """
+        return rect.adjusted(10 + 24 + 10, 0, -(10 + 20 + 10), 0)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        """
+        Paints a row.
+
+        Args:
+            painter (QPainter): The painter of the view.
+            option (QStyleOptionViewItem): The rectangle and state of the row.
+            index (QModelIndex): The row.
+
+        Returns:
+            None
+        """
+        task_set = index.data(TaskSetQueueModel.TaskSetRole)
+        expanded = bool(option.state & (QStyle.State_MouseOver | QStyle.State_Selected))
+        padding = 0 if expanded else self._padding
+        rect = option.rect.adjusted(padding, padding, -padding, -padding)
+        (background_color, bar_color) = TaskSetDelegate.colors(task_set.status)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+
+        # Background
+        path = QtGui.QPainterPath()
+        path.addRoundedRect(rect, 15, 15)
+        painter.fillPath(path, background_color)
+
+        # Progress Bar
+        progress_rect = QRect(rect)
+        progress_rect.setWidth(rect.width() * max(min(task_set.progress, 1.0), 0.0))
+        path.clear()
+        path.addRoundedRect(progress_rect, 15, 15)
+        painter.fillPath(path, bar_color)
+
+        middle = option.rect.center().y()
+        painter.drawPixmap(option.rect.left() + 10, middle - 12, self._icon)
+        painter.drawPixmap(option.rect.right() - 10 - 20, middle - 12, self._drag)
+
+        name_rect = self._name_rect(option.rect)
+        painter.setPen(Qt.black)
+        painter.drawText(name_rect, Qt.AlignCenter,
+                         option.fontMetrics.elidedText(task_set.name, Qt.TextElideMode.ElideRight, name_rect.width()))
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), TaskSetDelegate.height)
+
+    def createEditor(self, parent: QWidget, option: QStyleOptionViewItem, index: QModelIndex) -> QWidget:
+        editor = TaskSetInput(index.data(Qt.EditRole))
+        editor.setParent(parent)
+        editor.setStyleSheet('QLineEdit { background: transparent; color: black; border: 0px;}')
+        return editor
+
+    def setEditorData(self, editor: QWidget, index: QModelIndex):
+        editor.setText(index.data(Qt.EditRole))
+
+    def setModelData(self, editor: QWidget, model: QAbstractItemModel, index: QModelIndex):
+        model.setData(index, editor._text, Qt.EditRole)
+
+    def updateEditorGeometry(self, editor: QWidget, option: QStyleOptionViewItem, index: QModelIndex):
+        editor.setGeometry(self._name_rect(option.rect).adjusted(0, 15, 0, -15))
@@ -2,10 +2,9 @@ from PySide6 import QtGui
 from PySide6.QtGui import *
 from PySide6.QtCore import *
 from PySide6.QtWidgets import *
-from typing import List
 
 from core.tasksetdata import TaskSetData
-from core.taskdata import TaskData
+from ui.widget.taskset.tasklistmodel import TaskListModel
 
 class TaskSetInfo(QWidget):
     """
@@ -15,21 +14,27 @@ class TaskSetInfo(QWidget):
     It includes details such as bias, set point, size, position, lines per frame, line time,
     repetitions, total tasks, and estimated time remaining.
 
+    The tasks are listed by a QListView over the TaskListModel of the TaskSet, which only draws the rows in view,
+    however many tasks the task set has. The check state of every task lives in the model, so it outlives the widget,
+    which is only made while the TaskSet is expanded.
+
     Attributes:
-        task_items (List[QCheckBox]): A list of QCheckBox widgets representing each task item.
+        model (TaskListModel): The tasks and their check states.
         background (QColor): The background color of the widget.
     """
-    def __init__(self, data: TaskSetData, tasks: List[TaskData], remove_task_set_btn: QPushButton):
+
+    _visible_rows = 10
+
+    def __init__(self, data: TaskSetData, model: TaskListModel, remove_task_set_btn: QPushButton):
         """
         Initialize the TaskSetInfo widget.
 
         Args:
             data (TaskSetData): The TaskSetData containing information about the TaskSet.
-            tasks (List[TaskData]): The list of TaskData representing individual tasks.
+            model (TaskListModel): The tasks and their check states.
             remove_task_set_btn (QPushButton): The button to remove the TaskSet.
         """
-        super().__init__(minimumHeight=0, maximumHeight=0)
-        self.task_items = list()
+        super().__init__()
 
         self.background = QColor(245, 245, 245)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -53,27 +58,32 @@ class TaskSetInfo(QWidget):
         sublayout.addWidget(line_time, 2, 0)
         sublayout.addWidget(lines_per_frame, 2, 1)
 
-        match data.sweep_parameter:
-            case TaskSetData.SweepParameter.bias:
-                bias.setText("Bias: -")
-            case TaskSetData.SweepParameter.size:
-                size.setText("Size: -")
+        for name in model.swept:
+            match name:
+                case 'bias':
+                    bias.setText("Bias: -")
+                case 'set_point':
+                    set_point.setText("Set point: -")
+                case 'size':
+                    size.setText("Size: -")
+                case 'x_offset' | 'y_offset':
+                    position.setText("Position: -")
 
         self._layout.addLayout(sublayout)
         repetitions = QLabel(f"Repetitions: {data.repetitions}")
         self._layout.addWidget(repetitions)
-        self._layout.addWidget(QLabel(f"Total Tasks: {len(tasks)}"))
+        self._layout.addWidget(QLabel(f"Total Tasks: {len(model.tasks)}"))
         self._layout.addWidget(QLabel(f"Time remaining: {data.time_to_finish}"))
         
-        for task in tasks:
-            task_item = QCheckBox(checked=True)
-            match data.sweep_parameter:
-                case TaskSetData.SweepParameter.bias:
-                    task_item.setText(f'Bias: {task.inner.bias}V')
-                case TaskSetData.SweepParameter.size:
-                    task_item.setText(f'Size: {task.inner.size}m')
-            self.task_items.append(task_item)
-            self._layout.addWidget(self.task_items[-1])
+        self.model = model
+        self._task_list = QListView()
+        self._task_list.setModel(self.model)
+        self._task_list.setUniformItemSizes(True)
+        self._task_list.setSelectionMode(QAbstractItemView.NoSelection)
+        self._task_list.setFrameShape(QFrame.NoFrame)
+        row_height = self._task_list.sizeHintForRow(0) if len(model.tasks) > 0 else 0
+        self._task_list.setFixedHeight(row_height * min(len(model.tasks), TaskSetInfo._visible_rows) + 2)
+        self._layout.addWidget(self._task_list)
         self._layout.addWidget(remove_task_set_btn)
 
         self.setLayout(QGridLayout())
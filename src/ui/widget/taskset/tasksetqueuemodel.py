@@ -0,0 +1,174 @@
+from typing import List, Set
+
+from PySide6.QtCore import *
+
+from ui.widget.taskset.taskset import TaskSet
+
+class TaskSetQueueModel(QAbstractListModel):
+    """
+    List model of the queue of task sets, one row per TaskSet in the order they are run.
+
+    Rows can be moved by drag and drop within a view. A drag carries the rows under 'MimeType' rather than the TaskSet
+    objects, which cannot be serialized, and a drop moves the rows with 'moveRows', so the queue order, and with it the
+    order the task sets are run in, is the order shown. Moving or removing rows only updates the index of the task sets
+    whose row changed.
+
+    A row is redrawn when its TaskSet emits 'changed'. Changes are merged and delivered at most once per frame, as a
+    single 'dataChanged' over the changed rows, so many short tasks finishing quickly cost the view one update per
+    frame at most.
+
+    Attributes:
+        TaskSetRole (int): The role giving the TaskSet of a row.
+        MimeType (str): The MIME type of the rows dragged within the queue.
+        frame_interval (int): The shortest time between two deliveries of changes, in milliseconds.
+        task_sets (List[TaskSet]): The task sets, in queue order.
+
+    Methods:
+        append(task_set: TaskSet): Adds a task set at the end of the queue.
+        remove(row: int) -> TaskSet: Removes a task set from the queue.
+    """
+
+    TaskSetRole = Qt.UserRole
+    MimeType = 'application/x-pyxm-taskset-rows'
+
+    frame_interval = 1000 // 30
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize an empty TaskSetQueueModel.
+        """
+        super().__init__(*args, **kwargs)
+        self.task_sets: List[TaskSet] = list()
+        self._changed: Set[TaskSet] = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(TaskSetQueueModel.frame_interval)
+        self._timer.timeout.connect(self._deliver_changes)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.task_sets)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+        task_set = self.task_sets[index.row()]
+        match role:
+            case Qt.DisplayRole | Qt.EditRole | Qt.ToolTipRole:
+                return task_set.name
+            case TaskSetQueueModel.TaskSetRole:
+                return task_set
+        return None
+
+    def setData(self, index: QModelIndex, value: object, role: int = Qt.EditRole) -> bool:
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        self.task_sets[index.row()].setName(str(value))
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self) -> Qt.DropActions:
+        return Qt.MoveAction
+
+    def mimeTypes(self) -> List[str]:
+        return [TaskSetQueueModel.MimeType]
+
+    def mimeData(self, indexes: List[QModelIndex]) -> QMimeData:
+        data = QMimeData()
+        rows = sorted({index.row() for index in indexes if index.isValid()})
+        data.setData(TaskSetQueueModel.MimeType, QByteArray(' '.join(map(str, rows)).encode()))
+        return data
+
+    def canDropMimeData(self, data: QMimeData, action: Qt.DropAction, row: int, column: int, parent: QModelIndex) -> bool:
+        return action == Qt.MoveAction and data.hasFormat(TaskSetQueueModel.MimeType)
+
+    def dropMimeData(self, data: QMimeData, action: Qt.DropAction, row: int, column: int, parent: QModelIndex) -> bool:
+        if not self.canDropMimeData(data, action, row, column, parent):
+            return False
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self.task_sets)
+        dragged = [QPersistentModelIndex(self.index(int(r))) for r in bytes(data.data(TaskSetQueueModel.MimeType)).split()]
+        for index in dragged:
+            if index.isValid() and row not in (index.row(), index.row() + 1):
+                self.moveRows(QModelIndex(), index.row(), 1, QModelIndex(), row)
+            row = index.row() + 1
+        # The rows are moved already; reporting the drop as done would make the view remove the source rows as well
+        return False
+
+    def moveRows(self, sourceParent: QModelIndex, sourceRow: int, count: int, destinationParent: QModelIndex,
+                 destinationChild: int) -> bool:
+        if sourceParent.isValid() or destinationParent.isValid() or count <= 0:
+            return False
+        if not self.beginMoveRows(sourceParent, sourceRow, sourceRow + count - 1, destinationParent, destinationChild):
+            return False
+        moved = self.task_sets[sourceRow:sourceRow + count]
+        del self.task_sets[sourceRow:sourceRow + count]
+        row = destinationChild - count if destinationChild > sourceRow else destinationChild
+        self.task_sets[row:row] = moved
+        self.endMoveRows()
+        self._reindex(min(sourceRow, row), max(sourceRow, row) + count)
+        return True
+
+    def append(self, task_set: TaskSet):
+        """
+        Adds a task set at the end of the queue.
+
+        Args:
+            task_set (TaskSet): The task set, whose index is set to its row.
+        """
+        row = len(self.task_sets)
+        self.beginInsertRows(QModelIndex(), row, row)
+        task_set.setIndex(row)
+        task_set.changed.connect(self._task_set_changed)
+        self.task_sets.append(task_set)
+        self.endInsertRows()
+
+    def remove(self, row: int) -> TaskSet:
+        """
+        Removes a task set from the queue.
+
+        Args:
+            row (int): The row of the task set.
+
+        Returns:
+            TaskSet: The task set removed.
+        """
+        self.beginRemoveRows(QModelIndex(), row, row)
+        task_set = self.task_sets.pop(row)
+        task_set.changed.disconnect(self._task_set_changed)
+        self._changed.discard(task_set)
+        self.endRemoveRows()
+        self._reindex(row, len(self.task_sets))
+        return task_set
+
+    def _reindex(self, start: int, stop: int):
+        """
+        Sets the index of the task sets of a range of rows to their row.
+
+        Args:
+            start (int): The first row.
+            stop (int): The row after the last one.
+        """
+        for row in range(start, stop):
+            self.task_sets[row].setIndex(row)
+
+    def _task_set_changed(self):
+        """
+        Marks the row of the task set that emitted 'changed' to be redrawn with the next delivery of changes.
+        """
+        self._changed.add(self.sender())
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _deliver_changes(self):
+        """
+        Redraws the rows changed since the last delivery, with one 'dataChanged' over all of them.
+        """
+        if not self._changed:
+            return
+        rows = [task_set.index for task_set in self._changed]
+        self._changed.clear()
+        self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
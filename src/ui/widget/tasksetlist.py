@@ -1,27 +1,39 @@
 from typing import List
 
+from PySide6 import QtCore
+from PySide6.QtCore import *
 from PySide6.QtGui import Qt
 from PySide6.QtWidgets import *
 
 from core.tasksetdata import TaskSetData
 from ui.widget.taskset.taskset import TaskSet
+from ui.widget.taskset.tasksetdelegate import TaskSetDelegate
+from ui.widget.taskset.tasksetinfo import TaskSetInfo
+from ui.widget.taskset.tasksetqueuemodel import TaskSetQueueModel
 
 class TaskSetList(QGroupBox):
     """
-        Represents a group box containing a list of task sets.
+        Represents a group box containing the queue of task sets.
 
-        This class extends QGroupBox and provides a visual representation of a list of task sets. Each task set is displayed
-        as a separate TaskSet widget, and users can add new task sets, remove task sets, and interact with individual tasks.
+        The queue is a QListView over a TaskSetQueueModel, whose rows are painted by a TaskSetDelegate, so only the rows
+        in view are drawn and no widget is made per task set. Task sets are reordered by dragging their row and renamed
+        by double clicking it. Clicking a row expands its task set: a TaskSetInfo detailing it, with its tasks and a
+        button to remove it, is shown below the queue until the row is clicked again or another one is expanded.
 
-        Attributes:
-            task_sets (List[TaskSet]): A list of TaskSet objects representing the individual task sets.
-            all_tasks (List): A list containing all the tasks from all the task sets in the TaskSetList.
-            _contents (QWidget): The widget that contains the list of task sets.
-            _scrollarea (QScrollArea): The scroll area used to display the task sets.
-            _layout (QVBoxLayout): The layout used to arrange the task sets in the scroll area.
+        Hovering a row emits the scan areas of its tasks, to preview them in the scan area.
 
+        Attributes:
+            hover_preview (Signal): Emitted with the preview rects of a task set when its row is hovered.
+            remove_preview (Signal): Emitted when no row is hovered anymore.
+            model (TaskSetQueueModel): The queue of task sets.
+            task_sets (List[TaskSet]): The task sets, in queue order.
+            _view (QListView): The view of the queue.
+            _expanded (TaskSet): The expanded task set, or None.
+            _info (TaskSetInfo): The widget detailing the expanded task set, or None.
     """
-    
+    hover_preview = Signal(object)
+    remove_preview = Signal()
+
     def __init__(self, title, objectName) -> None:
         """
             Initialize the TaskSetList.
@@ -31,46 +43,105 @@ class TaskSetList(QGroupBox):
                 objectName: The object name used to identify the group box.
         """
         super().__init__(title, objectName=objectName)
-        self.task_sets: List[TaskSet] = list()
-        # self.all_tasks = list()
-
-        self._contents = QWidget(self)
-        self._scrollarea = QScrollArea()
-        self._scrollarea.setWidget(self._contents)
-        self._scrollarea.setWidgetResizable(True)
-        self._scrollarea.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-
-        self._layout = QVBoxLayout(self)
-        self._layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self._layout.setSpacing(3)
-        self._layout.setContentsMargins(0,0,5,0)
-        self._contents.setLayout(self._layout)
+        self.model = TaskSetQueueModel(self)
+        self._expanded: TaskSet = None
+        self._info: TaskSetInfo = None
+
+        self._view = QListView()
+        self._view.setModel(self.model)
+        self._view.setItemDelegate(TaskSetDelegate(parent=self._view))
+        self._view.setUniformItemSizes(True)
+        self._view.setFrameShape(QFrame.NoFrame)
+        self._view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        self._view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self._view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._view.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self._view.setDragDropMode(QAbstractItemView.InternalMove)
+        self._view.setDefaultDropAction(Qt.MoveAction)
+        self._view.setDropIndicatorShown(True)
+        self._view.setMouseTracking(True)
+        self._view.setStyleSheet('QListView { background: transparent; }')
+        self._view.clicked.connect(self.toggle_expanded)
+        self._view.entered.connect(self.preview)
+        self._view.viewportEntered.connect(self.remove_preview)
+        self._view.viewport().installEventFilter(self)
 
         self.setFlat(True)
         self.setLayout(QVBoxLayout())
-        self.layout().addWidget(self._scrollarea)
+        self.layout().addWidget(self._view)
         self.layout().setContentsMargins(0,0,0,0)
 
+    @property
+    def task_sets(self) -> List[TaskSet]:
+        return self.model.task_sets
+
     def add_task_set(self, data: TaskSetData):
         """
-            Add a new task set to the TaskSetList.
+            Add a new task set at the end of the queue.
 
             Args:
                 data (TaskSetData): The TaskSetData object representing the data for the new task set.
         """
-        task_set = TaskSet(name=data.name, data=data, idx=len(self.task_sets), dropFunc=self.drop_task)
-        task_set.adjustTextWidth()
+        self.model.append(TaskSet(name=data.name, data=data, idx=len(self.task_sets)))
+
+    def toggle_expanded(self, index: QModelIndex):
+        """
+            Expand the task set of a row, or collapse it if it is already expanded.
+
+            Args:
+                index (QModelIndex): The row clicked.
+        """
+        task_set = self.task_sets[index.row()]
+        self.collapse()
+        if task_set is not self._expanded:
+            self._expanded = task_set
+            remove_task_set_btn = QPushButton("Remove Task Set")
+            remove_task_set_btn.clicked.connect(lambda: self.drop_task(task_set.index))
+            self._info = TaskSetInfo(task_set.data, task_set.model, remove_task_set_btn)
+            self.layout().addWidget(self._info)
+        else:
+            self._expanded = None
+            self._view.clearSelection()
+
+    def collapse(self):
+        """
+            Remove the widget detailing the expanded task set, if any.
+        """
+        if self._info is not None:
+            self.layout().removeWidget(self._info)
+            self._info.deleteLater()
+            self._info = None
+
+    def preview(self, index: QModelIndex):
+        """
+            Preview the scan areas of the task set of a hovered row.
+
+            Args:
+                index (QModelIndex): The row hovered.
+        """
+        self.hover_preview.emit(self.task_sets[index.row()].preview_rects)
 
-        self.task_sets.append(task_set)
-        # self.all_tasks.extend(task_set.tasks)
-        self._layout.addWidget(task_set)
+    def eventFilter(self, obj, ev):
+        """
+            Remove the preview when the mouse leaves the queue.
+
+            Args:
+                obj: The object that triggered the event.
+                ev: The event.
+
+            Returns:
+                bool: False, the event is always passed on.
+        """
+        if ev.type() == QtCore.QEvent.Leave:
+            self.remove_preview.emit()
+        return False
 
     def drop_task(self, idx):
         """
             Remove a task set from the TaskSetList.
 
             This method is called when a user requests to remove a task set. It prompts the user for confirmation before
-            removing the task set.
+            removing the task set. Only the task sets after it are re-indexed.
 
             Args:
                 idx (int): The index of the task set to be removed.
@@ -82,8 +153,7 @@ class TaskSetList(QGroupBox):
         dlg.setIcon(QMessageBox.Question)
 
         if dlg.exec_() == QMessageBox.Yes:
-            self.task_sets.pop(idx)
-            for (i, task_set) in enumerate(self.task_sets):
-                task_set.setIndex(i)
-            self._layout.takeAt(idx).widget().deleteLater()
-
+            if self.task_sets[idx] is self._expanded:
+                self.collapse()
+                self._expanded = None
+            self.model.remove(idx)
\ No newline at end of file
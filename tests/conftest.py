@@ -0,0 +1,35 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from lib.stm import STM
+from lib.simulator import STMSimulator, SimulatorConfig
+
+@pytest.fixture
+def simulator(tmp_path):
+    """
+    An STM controller simulator on a free port, with short procedures and small images saved under 'tmp_path'.
+    """
+    sim = STMSimulator(port=0, config=SimulatorConfig(procedure_time=0.05, max_pixels=16, save_path=str(tmp_path))).start()
+    yield sim
+    sim.stop()
+
+@pytest.fixture
+def stm(simulator):
+    """
+    A persistent STM client of 'simulator', using the built-in commands.
+    """
+    stm = STM(port=simulator.port, persistent=True)
+    yield stm
+    stm.drop()
+
+@pytest.fixture(scope='session')
+def qapp():
+    """
+    The Qt application, needed by the models and timers.
+    """
+    return QCoreApplication.instance() or QCoreApplication([])
@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+
+from lib.framecache import FrameCache
+
+def image(tmp_path, name: str) -> str:
+    path = str(tmp_path / name)
+    with open(path, 'wb') as f:
+        f.write(b'image')
+    return path
+
+def test_least_recently_used_frame_is_evicted(tmp_path):
+    cache = FrameCache(budget=250)
+    (a, b, c) = [image(tmp_path, name) for name in 'abc']
+    cache.put(a, 'recipe', np.zeros(100, np.uint8))
+    cache.put(b, 'recipe', np.zeros(100, np.uint8))
+    assert cache.get(a, 'recipe') is not None
+
+    cache.put(c, 'recipe', np.zeros(100, np.uint8))
+    assert cache.get(b, 'recipe') is None
+    assert cache.get(a, 'recipe') is not None
+    assert cache.get(c, 'recipe') is not None
+    assert (len(cache), cache.size) == (2, 200)
+
+def test_frame_larger_than_budget_is_not_cached(tmp_path):
+    cache = FrameCache(budget=50)
+    cache.put(image(tmp_path, 'a'), 'recipe', np.zeros(100, np.uint8))
+    assert (len(cache), cache.size) == (0, 0)
+
+def test_frame_is_recomputed_when_file_or_recipe_changes(tmp_path):
+    cache = FrameCache()
+    path = image(tmp_path, 'a')
+    calls = list()
+    compute = lambda: calls.append(None) or np.zeros(10)
+
+    cache.get_or_compute(path, 'recipe', compute)
+    cache.get_or_compute(path, 'recipe', compute)
+    assert len(calls) == 1
+
+    cache.get_or_compute(path, 'other', compute)
+    assert len(calls) == 2
+
+    mtime = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+    cache.get_or_compute(path, 'recipe', compute)
+    assert len(calls) == 3
+    assert (cache.hits, cache.misses) == (1, 3)
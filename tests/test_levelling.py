@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from lib import levelling
+
+def frames(rows: int = 32, cols: int = 48) -> np.ndarray:
+    """
+    Two frames of a tilted plane with a different offset on every line.
+    """
+    (y, x) = np.mgrid[0:rows, 0:cols]
+    plane = 0.3 * x - 0.2 * y + 5
+    offsets = np.random.default_rng(0).normal(size=(2, rows, 1))
+    return levelling.as_frames(plane + offsets)
+
+@pytest.mark.parametrize('cols', [7, 8])
+def test_median(cols):
+    data = np.random.default_rng(1).normal(size=(3, 5, cols)).astype(np.float32)
+    np.testing.assert_allclose(levelling.median(data), np.median(data, axis=-1), rtol=1e-6)
+
+@pytest.mark.parametrize('baseline', ['median', 'mean', 'poly'])
+def test_align_removes_line_offsets(baseline):
+    data = frames()
+    levelling.align(data, baseline)
+    np.testing.assert_allclose(np.median(data, axis=-1) if baseline == 'median' else data.mean(axis=-1), 0, atol=1e-4)
+
+def test_plane_removes_tilt():
+    data = levelling.as_frames(np.stack([np.add.outer(np.arange(16), np.arange(24)) * 0.5 + 3] * 2))
+    levelling.plane(data)
+    np.testing.assert_allclose(data, 0, atol=1e-4)
+
+def test_plane_ignores_non_finite_pixels():
+    data = levelling.as_frames(np.add.outer(np.arange(16), 2 * np.arange(24)))
+    data[3, 4] = np.nan
+    levelling.plane(data)
+    finite = np.isfinite(data)
+    assert not finite[3, 4]
+    np.testing.assert_allclose(data[finite], 0, atol=1e-3)
+
+def test_level_works_in_place():
+    data = frames()
+    assert levelling.level(data) is data
+    np.testing.assert_allclose(np.median(data, axis=-1), 0, atol=1e-4)
+
+def test_unknown_step():
+    with pytest.raises(ValueError):
+        levelling.level(frames(), ('flatten',))
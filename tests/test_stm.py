@@ -0,0 +1,132 @@
+import time, socket
+from types import SimpleNamespace
+
+import pytest
+
+from lib.stm import STM, STMError, STMBatchError
+
+SAVE_PATH = 'GetSWSubItemParameter, Scan Area Window, MeasureSave, Save Path'
+
+def test_set_and_get(simulator, stm):
+    assert stm.set_bias(0.5) == 'Done'
+    assert simulator.parameters['STM Bias, Value'] == '0.5'
+    assert stm.get_save_path() == simulator.config.save_path
+
+def test_per_command_connection(simulator):
+    stm = STM(port=simulator.port)
+    assert stm.set_setpoint(1e-10) == 'Done'
+    assert not stm.connected
+    assert simulator.connections == 1
+
+def test_unchanged_parameter_is_not_sent(simulator, stm):
+    stm.set_bias(0.5)
+    assert stm.set_bias(0.5) is None
+    assert simulator.commands == 1
+
+    stm.refresh()
+    assert stm.set_bias(0.5) == 'Done'
+    assert simulator.commands == 2
+
+def test_set_params_skips_confirmed_parameters(simulator, stm):
+    params = [('set_bias', 0.1), ('set_setpoint', 1e-10), ('set_scan_size', 1e-7)]
+    assert stm.set_params(params) == ['Done'] * 3
+    assert stm.set_params(params) == []
+    assert stm.set_params(params[:2] + [('set_scan_size', 2e-7)]) == ['Done']
+    assert simulator.commands == 4
+
+def test_batch_failure_reports_index(simulator, stm):
+    msgs = [('SetSWParameter, STM Bias, Value, 1', str), ('Bogus', str), (SAVE_PATH, str)]
+    with pytest.raises(STMBatchError) as e:
+        stm.send_many(msgs)
+    assert [failure.index for failure in e.value.failures] == [1]
+    assert e.value.results == ['Done', None, simulator.config.save_path]
+
+def test_batch_failure_forgets_parameter(stm):
+    with pytest.raises(STMBatchError):
+        with stm.batch():
+            stm.set_bias(1.0)
+            stm.send('Bogus')
+    assert stm.state == {'set_bias': 1.0}
+
+def test_split_and_merged_replies_are_framed(simulator, stm):
+    simulator.config.split_rate = 1.0
+    simulator.config.merge_rate = 1.0
+    sets = [(f'SetSWParameter, P{i}, Value, {i}', str) for i in range(20)]
+    gets = [(f'GetSWSubItemParameter, P{i}, Value', int) for i in range(20)]
+    assert stm.send_many(sets + gets) == ['Done'] * 20 + list(range(20))
+    assert stm.send(SAVE_PATH) == simulator.config.save_path
+
+def test_error_reply(stm):
+    with pytest.raises(STMError) as e:
+        stm.send('Bogus')
+    assert e.value.command == 'Bogus'
+    assert e.value.reply.startswith('ERROR')
+
+def test_conversion_error(stm):
+    with pytest.raises(STMError):
+        stm.send(SAVE_PATH, float)
+
+def test_timed_out_command_is_not_sent_again(monkeypatch, simulator, stm):
+    monkeypatch.setattr(STM, '_timeout', 0.1)
+    simulator.config.latency = 0.3
+    with pytest.raises(STMError):
+        stm.set_bias(1.0)
+    assert not stm.connected
+    assert 'set_bias' not in stm.state
+
+    time.sleep(0.3)
+    simulator.config.latency = 0.0
+    assert stm.set_bias(2.0) == 'Done'
+    assert simulator.commands == 2
+    assert simulator.parameters['STM Bias, Value'] == '2.0'
+
+def test_command_lost_with_connection_is_not_sent_again(simulator, stm):
+    simulator.config.drop_rate = 1.0
+    with pytest.raises(ConnectionError):
+        stm.set_bias(1.0)
+    assert not stm.connected
+
+    simulator.config.drop_rate = 0.0
+    assert simulator.commands == 0
+    assert stm.set_bias(1.0) == 'Done'
+    assert simulator.commands == 1
+
+def test_connection_closed_while_idle_is_reopened(simulator, stm):
+    stm.set_bias(1.0)
+    stm.socket.shutdown(socket.SHUT_WR)
+    time.sleep(0.1)
+    assert stm.set_bias(2.0) == 'Done'
+    assert simulator.connections == 2
+    assert simulator.commands == 2
+
+def test_procedure_single_reply(simulator, stm):
+    result = stm.start_procedure('Scan', timeout=5)
+    assert result.result == 'Done'
+    assert result.finished - result.started >= simulator.config.procedure_time
+    assert simulator.commands == 1
+    assert simulator.images == 1
+
+def test_procedure_single_reply_when_started(simulator, stm):
+    simulator.config.procedure_replies = 'started'
+    result = stm.start_procedure('Scan', timeout=5)
+    assert result.result == 'Started'
+    assert stm.get_save_path() == simulator.config.save_path
+
+def test_procedure_completion_reply(simulator, stm):
+    simulator.config.procedure_replies = 'both'
+    stm.commands = SimpleNamespace(procedure_completion='reply')
+    result = stm.start_procedure('Scan', timeout=5)
+    assert result.result == 'Done'
+    assert result.finished - result.started >= simulator.config.procedure_time
+    assert stm.get_save_path() == simulator.config.save_path
+
+def test_procedure_completion_reply_times_out_without_second_line(simulator, stm):
+    stm.commands = SimpleNamespace(procedure_completion='reply')
+    with pytest.raises(TimeoutError):
+        stm.start_procedure('Scan', timeout=0.3)
+    assert not stm.connected
+
+def test_unknown_procedure_completion(stm):
+    stm.commands = SimpleNamespace(procedure_completion='never')
+    with pytest.raises(ValueError):
+        stm.start_procedure('Scan')
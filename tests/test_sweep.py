@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from core.exponentialnumber import ExponentialNumber
+from core.tasksetdata import TaskSetData
+from core.sweepaxis import SweepAxis
+from core.sweep import Sweep
+
+Parameter = TaskSetData.SweepParameter
+
+def axis(parameter, start, stop, step) -> SweepAxis:
+    return SweepAxis(parameter, *[ExponentialNumber.from_float(value) for value in (start, stop, step)])
+
+@pytest.mark.parametrize('step', [0.1, -0.1])
+def test_axis_runs_from_start_to_stop(step):
+    np.testing.assert_allclose(axis(Parameter.bias, 0, 1, step).values(), np.linspace(0, 1, 11))
+    np.testing.assert_allclose(axis(Parameter.bias, 1, 0, step).values(), np.linspace(1, 0, 11))
+
+def test_axis_stop_off_step():
+    np.testing.assert_allclose(axis(Parameter.bias, 0, 1, 0.3).values(), [0, 0.3, 0.6, 0.9])
+
+def test_axis_single_value():
+    np.testing.assert_allclose(axis(Parameter.bias, 0.5, 0.5, 0.1).values(), [0.5])
+
+def test_axis_zero_step():
+    with pytest.raises(ValueError):
+        axis(Parameter.bias, 0, 1, 0).values()
+
+def test_nested_sweep():
+    sweep = Sweep([axis(Parameter.bias, 1, 3, 1), axis(Parameter.size, 10, 20, 10)])
+    assert sweep.shape == (3, 2)
+    assert len(sweep) == 6
+    columns = sweep.columns(np.arange(len(sweep)))
+    np.testing.assert_allclose(columns['bias'], [1, 1, 2, 2, 3, 3])
+    np.testing.assert_allclose(columns['size'], [10, 20, 10, 20, 10, 20])
+
+def test_zipped_sweep():
+    sweep = Sweep([axis(Parameter.bias, 1, 3, 1), axis(Parameter.size, 10, 20, 10)], TaskSetData.SweepOrder.zipped)
+    assert len(sweep) == 2
+    columns = sweep.columns(np.array([1]))
+    np.testing.assert_allclose(columns['bias'], [2])
+    np.testing.assert_allclose(columns['size'], [20])
+
+def test_empty_sweep():
+    sweep = Sweep([])
+    assert len(sweep) == 1
+    assert sweep.columns(np.array([0])) == {}
+
+def test_parameter_swept_twice():
+    with pytest.raises(ValueError):
+        Sweep([axis(Parameter.bias, 0, 1, 1), axis(Parameter.bias, 0, 1, 1)])
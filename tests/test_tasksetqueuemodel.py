@@ -0,0 +1,53 @@
+import pytest
+from PySide6.QtCore import QEventLoop, QModelIndex, QTimer, Qt
+
+from ui.widget.taskset.taskset import TaskSet
+from ui.widget.taskset.tasksetqueuemodel import TaskSetQueueModel
+
+from test_tasktable import bias_sweep
+
+def wait(ms: int):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+@pytest.fixture
+def model(qapp):
+    model = TaskSetQueueModel()
+    for name in 'ABCD':
+        model.append(TaskSet(name=name, data=bias_sweep(3), idx=0))
+    return model
+
+def names(model: TaskSetQueueModel) -> str:
+    assert [task_set.index for task_set in model.task_sets] == list(range(len(model.task_sets)))
+    return ''.join(task_set.name for task_set in model.task_sets)
+
+def test_changes_are_delivered_once_per_frame(model):
+    changes = list()
+    model.dataChanged.connect(lambda first, last: changes.append((first.row(), last.row())))
+    for _ in range(100):
+        model.task_sets[1].setName('B')
+        model.task_sets[2].update_task_bar()
+    assert changes == []
+
+    wait(3 * TaskSetQueueModel.frame_interval)
+    assert changes == [(1, 2)]
+
+@pytest.mark.parametrize(('row', 'destination', 'order'), [(0, 3, 'BCAD'), (0, 4, 'BCDA'), (3, 0, 'DABC'), (1, 1, 'ABCD')])
+def test_move_rows(model, row, destination, order):
+    model.moveRows(QModelIndex(), row, 1, QModelIndex(), destination)
+    assert names(model) == order
+
+@pytest.mark.parametrize(('row', 'destination', 'parent', 'order'), [(3, 0, None, 'DABC'), (0, -1, None, 'BCDA'),
+                                                                     (0, -1, 2, 'BACD')])
+def test_drop_moves_rows(model, row, destination, parent, order):
+    data = model.mimeData([model.index(row)])
+    assert data.formats() == [TaskSetQueueModel.MimeType]
+    parent = QModelIndex() if parent is None else model.index(parent)
+    # A drop never reports a move, so the view does not remove the source row afterwards
+    assert not model.dropMimeData(data, Qt.MoveAction, destination, 0, parent)
+    assert names(model) == order
+
+def test_remove_reindexes(model):
+    assert model.remove(1).name == 'B'
+    assert names(model) == 'ACD'
@@ -0,0 +1,64 @@
+import numpy as np
+
+from core.exponentialnumber import ExponentialNumber
+from core.tasksetdata import TaskSetData
+from core.sweepaxis import SweepAxis
+from core.sweep import Sweep
+from core.tasktable import TaskTable
+
+def task_set_data(axes) -> TaskSetData:
+    return TaskSetData(name='test',
+                       size=ExponentialNumber(100, -9),
+                       x_offset=ExponentialNumber(0, -9),
+                       y_offset=ExponentialNumber(0, -9),
+                       bias=ExponentialNumber(300, -3),
+                       set_point=ExponentialNumber(100, -12),
+                       line_time=ExponentialNumber(100, -3),
+                       lines_per_frame=64,
+                       repetitions=1,
+                       sweep_parameter=TaskSetData.SweepParameter.none,
+                       sweep_start=ExponentialNumber.default(),
+                       sweep_stop=ExponentialNumber.default(),
+                       sweep_step=ExponentialNumber.default(),
+                       total_tasks=0,
+                       time_to_finish='',
+                       sweep_axes=axes)
+
+def bias_sweep(count: int) -> TaskSetData:
+    return task_set_data([SweepAxis(TaskSetData.SweepParameter.bias, ExponentialNumber(1, -3), ExponentialNumber(count, -3),
+                                    ExponentialNumber(1, -3))])
+
+def table(count: int) -> TaskTable:
+    data = bias_sweep(count)
+    return TaskTable(data, Sweep.from_data(data))
+
+def test_rows_follow_sweep_across_blocks():
+    tasks = table(3000)
+    assert len(tasks) == 3000
+    for i in (0, TaskTable.block_size - 1, TaskTable.block_size, 2999):
+        assert tasks.get('bias', i) == tasks.column('bias')[i]
+        np.testing.assert_allclose(tasks.get('bias', i), (i + 1) * 1e-3)
+    assert tasks[-1].index == 2999
+
+def test_constant_parameters_keep_their_entry():
+    data = bias_sweep(3)
+    tasks = TaskTable(data, Sweep.from_data(data))
+    assert tasks.value('size', 1) is data.size
+    assert tasks.value('lines_per_frame', 2) == 64
+    assert str(tasks.value('bias', 1)) == str(ExponentialNumber.from_float(2e-3))
+
+def test_status_counts_completed_tasks():
+    tasks = table(2000)
+    completed = TaskTable.Status.completed.value
+    for i in (5, 1500, 5):
+        tasks.set('status', i, completed)
+    assert tasks.completed_count() == 2
+    assert tasks.status(1500) is TaskTable.Status.completed
+    assert tasks.status(6) is TaskTable.Status.todo
+    tasks.set('status', 5, TaskTable.Status.error.value)
+    assert tasks.completed_count() == 1
+    np.testing.assert_allclose(tasks.column('bias')[1500], 1.501)
+
+def test_rects():
+    rects = table(2).rects()
+    np.testing.assert_allclose(rects, [[-50, -50, 100], [-50, -50, 100]])
@@ -0,0 +1,35 @@
+from lib.taskworker import TaskWorker
+
+from test_tasktable import table
+
+def test_next_task_is_prefetched_after_finished(simulator, stm):
+    tasks = table(3)
+    lookups = list()
+    finished = list()
+
+    def next_task():
+        lookups.append(simulator.images)
+        return tasks[2]
+
+    worker = TaskWorker(tasks[0], stm, next_task=next_task)
+    worker.signals.finished.connect(lambda save_path: finished.append((save_path, dict(stm.state))))
+    worker.run()
+
+    assert worker.result.result == 'Done'
+    assert finished == [(simulator.config.save_path, dict(TaskWorker.stm_params(tasks[0].inner)))]
+    # Looked up once the image has been taken, and configured once the task has been reported finished
+    assert lookups == [1]
+    assert stm.state == dict(TaskWorker.stm_params(tasks[2].inner))
+
+def test_nothing_is_prefetched_without_next_task(simulator, stm):
+    tasks = table(2)
+    worker = TaskWorker(tasks[0], stm, next_task=lambda: None)
+    worker.run()
+    assert stm.state == dict(TaskWorker.stm_params(tasks[0].inner))
+
+def test_nothing_is_prefetched_when_stopped(simulator, stm):
+    tasks = table(2)
+    worker = TaskWorker(tasks[0], stm, next_task=lambda: tasks[1])
+    stm.stopped = True
+    worker.run()
+    assert stm.state == dict(TaskWorker.stm_params(tasks[0].inner))